@@ -0,0 +1,1301 @@
+"""
+Çevrimdışı performans ölçümü (benchmark).
+
+Hiçbir ölçüm canlı sitelere gitmez. benchmarks/fixtures altındaki kayıtlı
+cevaplar (scx JSON'lu film sayfası, trstx API cevapları, rapidvid hex
+verisi, cizgiduo bePlayer AES verisi, sibnet sayfası, kaynak M3U örneği,
+XMLTV rehberi, Chrome performans logu):
+- requests oturumlarına takılan FixtureAdapter ile (deneme, scraper_bot,
+  hdfilm_kaziyici), ağ yerine doğrudan dosyadan,
+- deneme_async için yerel bir aiohttp sunucusundan (FixtureApp),
+- iptv_converter için yerel bir HTTP sunucusundan
+verilir. stream_probe, kanal adresine göre 200/404/405/501 dönen yerel bir
+HLS sunucusuna karşı çalışır.
+
+İki tür ölçüm yapılır:
+- Fonksiyon maliyeti: decode_scx_link, decrypt_cizgiduo, parse_film_page,
+  parse_and_group_channels, build_new_playlist ... farklı veri boyutlarında
+  (öğe başına µs ve saniyedeki öğe sayısı).
+- Çözücüler: decoders.py kaydındaki her çözücü için tek tek ve toplu
+  (decode_batch) çözme hızı (çözüm/sn), anahtar önbelleğinin etkisi.
+- Sayfa ayıklama: html_extract şablonları ile eski yöntem (BeautifulSoup /
+  DOTALL regex) aynı kayıtlı sayfalarda; sayfa başına süre ve Python
+  tarafındaki en yüksek bellek kullanımı (tracemalloc, KB/sayfa).
+- EPG: guide_sample.xml ile epg.build_index / attach (+N zaman kaydırmalı
+  kanallar dahil) / write_trimmed_epg zaman aralığı doğrulanır, ardından
+  kanal eşleştirme hızı ölçülür.
+- hdfilm ağ yakalama: kayıtlı Chrome performans logu (hdfilm_perf_log.json)
+  ve linki çalışma anında üreten oynatıcı sayfası ile NetworkCapture.poll()
+  ve find_player_links(capture=True) doğrulanır (sahte sürücü, Chrome gerekmez);
+  açılamayan sürücünün BrowserPool'da tekrar denenmediği kontrol edilir.
+- Birleştirme: playlist_merge ile canlı kanalların listeler arası ve dizi
+  bölümlerinin yalnızca kendi dizisi içinde birleştiği doğrulanır, ardından
+  birleştirme hızı (kayıt/sn; 100 bin kayıtlık tek ve üç liste, yaklaşık
+  eşleşmeli ve birebir) ölçülür.
+- Sunucu modu: playlist_server önbelleğinden cevap verme (istek başına µs;
+  gzip, 304, Range, grup) ve yenilemede tam listelerin yeniden üretimi.
+- Uçtan uca: deneme.build_m3u (film/sn), deneme_async.AsyncFilmCrawler
+  (yerel aiohttp fixture sunucusuna karşı, film/sn), CizgiMax bölüm çözme (bölüm/sn),
+  hdfilm HTTP hızlı yolu (film/sn), iptv_converter.convert (kanal/sn),
+  stream_probe.probe_playlist (yerel HLS sunucusuna karşı, kanal/sn; HEAD
+  desteklemeyen sunucular için GET geçişi ve önbellek de doğrulanır).
+  Bu ölçümlerde metrics.py aşama süreleri de rapora eklenir.
+
+Sonuçlar benchmarks/baseline.json ile karşılaştırılır; eşikten fazla
+yavaşlayan ölçümler işaretlenir. Temel sonuçlar makineye bağlıdır, aynı
+makinede alınmış sonuçlarla karşılaştırın.
+
+Kullanım:
+    python benchmark.py                   # ölç ve temel sonuçlarla karşılaştır
+    python benchmark.py --quick           # boyutları 10'a bölerek hızlı çalıştır
+    python benchmark.py --save-baseline   # sonuçları yeni temel olarak kaydet
+    python benchmark.py --only scx,cizgiduo --latency-ms 20
+    python benchmark.py --make-fixtures   # fixture dosyalarını yeniden üret
+"""
+import argparse
+import asyncio
+import base64
+import codecs
+import collections
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+
+import metrics
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+# (yöntem, adres kalıbı, fixture dosyası). İlk eşleşen kullanılır; None boş sayfa demektir.
+ROUTES = [
+    ("GET", r"https://www\.fullhdfilmizlesene\.nl/yeni-filmler/1$", "fullhd_listing.html"),
+    ("GET", r"https://www\.fullhdfilmizlesene\.nl/yeni-filmler/\d+$", None),
+    ("GET", r"https://www\.fullhdfilmizlesene\.nl/film/[^/]+/?$", "fullhd_film.html"),
+    ("GET", r"https://trstx\.org/v/", "trstx_player.html"),
+    ("POST", r"https://trstx\.org/playlist/", "trstx_playlist.txt"),
+    ("POST", r"https://trstx\.org/", "trstx_api.json"),
+    ("GET", r"https://rapidvid\.net/", "rapidvid.html"),
+    ("GET", r"https://cdn\.example\.com/.*\.m3u8$", "master.m3u8"),
+    ("GET", r"https://cizgimax\.online/", "cizgimax_episode.html"),
+    ("GET", r"https://cizgiduo\.online/", "cizgiduo.html"),
+    ("GET", r"https://video\.sibnet\.ru/", "sibnet.html"),
+    ("GET", r"https://www\.hdfilmizle\.to/", "hdfilm_detail.html"),
+    ("GET", r"https://vidrame\.pro/", "hdfilm_iframe.html"),
+]
+_ROUTES = [(method, re.compile(pattern), name) for method, pattern, name in ROUTES]
+
+# Varsayılan veri boyutları (--quick ile 10'a bölünür)
+SIZES = {
+    "scx": (1000, 10000, 100000),
+    "cizgiduo": (100, 1000, 10000),
+    "film_page": (100, 1000),
+    "playlist": (1000, 10000, 100000),
+    "extract": (200,),
+    "decoders": (1000, 10000),
+    "serve": (10000,),
+    "epg": (10000,),
+    "merge": (10000, 100000),
+}
+E2E_SIZES = {"deneme": 48, "deneme_async": 48, "cizgimax": 200, "hdfilm": 200, "converter": 100000,
+             "stream_probe": 4000}
+
+BENCHMARKS = ("scx", "cizgiduo", "decoders", "film_page", "playlist", "extract", "serve", "epg", "merge", "deneme",
+              "deneme_async", "cizgimax", "hdfilm", "converter", "stream_probe")
+# Sunucu modu ölçümünde hafızadaki listenin kanal sayısı
+SERVE_CHANNELS = 20000
+
+
+# --- Fixture Sunumu ---
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+        return f.read()
+
+
+def match_route(method, url):
+    """ROUTES'ta ilk eşleşen kaydı (bulundu mu, fixture adı) olarak döndürür."""
+    for route_method, pattern, name in _ROUTES:
+        if route_method == method and pattern.match(url):
+            return True, name
+    return False, None
+
+
+class FixtureAdapter(BaseAdapter):
+    """
+    requests için ağ yerine fixture dosyalarından cevap veren taşıma katmanı.
+    latency: Her isteğe eklenen yapay gecikme (saniye); eşzamanlılık
+    davranışını ölçmek için kullanılır.
+    """
+
+    def __init__(self, latency=0.0):
+        super().__init__()
+        self.latency = latency
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def body(self, name):
+        if name is None:
+            return b""
+        body = self.cache.get(name)
+        if body is None:
+            body = self.cache[name] = load_fixture(name)
+        return body
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.encoding = "utf-8"
+        found, name = match_route(request.method, request.url)
+        if found:
+            response.status_code = 200
+            response.reason = "OK"
+            response._content = self.body(name)
+        else:
+            response.status_code = 404
+            response.reason = "Not Found"
+            response._content = b""
+        response.headers["Content-Length"] = str(len(response._content))
+        # stream=True isteklerde iter_content / close gövdeyi buradan okur
+        response.raw = io.BytesIO(response._content)
+        response._content_consumed = True
+        return response
+
+    def close(self):
+        pass
+
+
+def mount_fixtures(session, adapter):
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class _PlaylistHandler(BaseHTTPRequestHandler):
+    """Yerel sunucu: /list.m3u8 adresinden sunucuya verilen kaynak listeyi döndürür."""
+
+    def do_GET(self):
+        body = self.server.playlist
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def playlist_server(body):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PlaylistHandler)
+    server.playlist = body
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/list.m3u8"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextlib.contextmanager
+def hls_stub_server(latency=0.0):
+    """
+    stream_probe için yerel HLS sunucusu (aiohttp, ayrı iş parçacığında).
+    /live/N/index.m3u8 adreslerinde N'nin son hanesine göre: 7 -> 404,
+    3 -> HEAD'e 405, 5 -> HEAD'e 501 (GET çalışır), diğerleri -> 200.
+    Yöntem başına istek sayıları 'stats' sayacına yazılır.
+    """
+    from aiohttp import web
+    stats = collections.Counter()
+    body = load_fixture("master.m3u8")
+
+    async def handle(request):
+        kind = int(request.match_info["n"]) % 10
+        stats[request.method] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        if kind == 7:
+            return web.Response(status=404)
+        if request.method == "HEAD":
+            return web.Response(status={3: 405, 5: 501}.get(kind, 200))
+        if request.headers.get("Range"):
+            stats["range"] += 1
+            return web.Response(status=206, body=body[:1024])
+        return web.Response(body=body)
+
+    app = web.Application()
+    app.router.add_route("*", r"/live/{n:\d+}/index.m3u8", handle)
+    runner = web.AppRunner(app, access_log=None)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", 0).start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{runner.addresses[0][1]}", stats
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+
+class FixtureApp:
+    """
+    Fixture'ları gerçek bir yerel HTTP sunucusundan (aiohttp) verir. İstemci
+    https://sunucu/yol adresini local_url ile http://127.0.0.1:port/sunucu/yol
+    olarak ister; sunucu orijinal adresi ROUTES ile eşleştirir.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.adapter = FixtureAdapter()
+        self.runner = None
+        self.port = None
+        self.requests = 0
+
+    async def handle(self, request):
+        from aiohttp import web
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        url = f"https://{request.match_info['host']}/{request.match_info['path']}"
+        if request.query_string:
+            url += f"?{request.query_string}"
+        found, name = match_route(request.method, url)
+        if not found:
+            return web.Response(status=404)
+        return web.Response(body=self.adapter.body(name))
+
+    async def start(self):
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_route("*", "/{host}/{path:.*}", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def local_url(self, url):
+        parts = urlsplit(url)
+        local = f"http://127.0.0.1:{self.port}/{parts.netloc}{parts.path}"
+        return f"{local}?{parts.query}" if parts.query else local
+
+
+# --- Fixture Üretimi ---
+
+def scx_encode(url):
+    """decode_scx_link'in tersi: Base64 ve ardından ROT13."""
+    return codecs.encode(base64.b64encode(url.encode()).decode(), "rot_13")
+
+
+def cizgiduo_encrypt(plaintext, password, salt):
+    """decrypt_cizgiduo'nun tersi: OpenSSL uyumlu "Salted__" + AES-256-CBC (EVP_BytesToKey/MD5)."""
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import pad
+
+    key_iv = b""
+    block = b""
+    while len(key_iv) < 48:
+        block = hashlib.md5(block + password.encode() + salt).digest()
+        key_iv += block
+    cipher = AES.new(key_iv[:32], AES.MODE_CBC, key_iv[32:48])
+    encrypted = cipher.encrypt(pad(plaintext.encode(), AES.block_size))
+    return base64.b64encode(b"Salted__" + salt + encrypted).decode()
+
+
+def make_fixtures(directory=FIXTURE_DIR):
+    """
+    Sitelerin cevap biçimlerini birebir taklit eden fixture dosyalarını üretir.
+    Çıktı her seferinde aynıdır (sabit tohum), depoya eklenebilir.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(2024)
+    files = {}
+
+    files["fullhd_listing.html"] = "\n".join(
+        ['<div class="film-list">']
+        + [f'<li><a href="https://www.fullhdfilmizlesene.nl/film/ornek-film-{i}/" title="Örnek Film {i}">'
+           f'<img data-src="https://img.example.com/{i}.jpg"></a></li>' for i in range(1, 49)]
+        + ["</div>"]
+    )
+
+    scx = {
+        "atom": {"sx": {"t": [scx_encode("https://trstx.org/v/abc123def")]}},
+        "advid": {"sx": {"t": {"0": scx_encode("https://rapidvid.net/vod/v1a2b3c")}}},
+        "proton": {"sx": {"t": [scx_encode("https://cdn.example.com/direct/film/master.m3u8")]}},
+        "fast": {"sx": {"t": [scx_encode("https://unknown-player.example.com/e/1")]}},
+    }
+    filler = "\n".join(f'<div class="comment"><p>Yorum {i}: ' + "çok güzel bir film " * 8 + "</p></div>"
+                       for i in range(120))
+    files["fullhd_film.html"] = (
+        '<html><head><title>Örnek Film izle</title></head><body>\n'
+        '<div class="izle-titles"><div class="sub"><h1>Örnek Film Full HD izle</h1></div></div>\n'
+        '<div class="film-poster"><a href="#"><img class="lazy" alt="Örnek Film" '
+        'data-src="https://img.example.com/poster/ornek-film.jpg"></a></div>\n'
+        '<ul class="film-info"><li><span class="dt">Yıl</span><a href="/yil/2024">2024</a></li>\n'
+        '<li><span class="dt">Tür</span><a href="/tur/aksiyon">Aksiyon</a>, '
+        '<a href="/tur/macera">Macera</a></li></ul>\n'
+        f'{filler}\n'
+        f'<script>var scx = {json.dumps(scx)};</script>\n'
+        '</body></html>\n'
+    )
+
+    files["trstx_player.html"] = ('<script>var player = new Playerjs({"id":"player",'
+                                  '"file":"\\/list\\/abc123def.json","poster":""});</script>')
+    files["trstx_api.json"] = json.dumps([
+        {"title": "Seçiniz"},
+        {"title": "1080p", "file": "~abc123def-1080"},
+        {"title": "720p", "file": "~abc123def-720"},
+    ])
+    files["trstx_playlist.txt"] = "https://cdn.example.com/trstx/abc123def/master.m3u8"
+
+    rapid_url = "https://cdn.example.com/rapid/v1a2b3c/master.m3u8"
+    files["rapidvid.html"] = ('<script>jwplayer("vplayer").setup({"file": "'
+                              + "".join(f"\\x{byte:02x}" for byte in rapid_url.encode())
+                              + '", "type": "hls"});</script>')
+
+    files["master.m3u8"] = (
+        "#EXTM3U\n#EXT-X-VERSION:3\n"
+        "#EXT-X-STREAM-INF:BANDWIDTH=5000000,RESOLUTION=1920x1080\n1080/index.m3u8\n"
+        "#EXT-X-STREAM-INF:BANDWIDTH=2800000,RESOLUTION=1280x720\n720/index.m3u8\n"
+        "#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360\n360/index.m3u8\n"
+    )
+
+    menu = "\n".join(f'<li class="menu-item"><a href="https://cizgimax.online/kategori/{i}/">Kategori {i}</a></li>'
+                      for i in range(40))
+    scripts = "\n".join(f"<script>window.ayar{i} = {json.dumps({'id': i, 'veri': 'x' * 200})};</script>"
+                         for i in range(10))
+    files["cizgimax_listing.html"] = (
+        f'<html><head><title>CizgiMax</title>{scripts}</head><body>\n<ul class="menu">{menu}</ul>\n'
+        '<ul class="filter-results">\n'
+        + "\n".join(f'<li><div class="poster"><img src="https://img.example.com/dizi/{i}.jpg" alt="Dizi {i}">'
+                    f'</div><div class="poster-subject"><a href="https://cizgimax.online/diziler/dizi-{i}/">'
+                    f'<h2 class="truncate">Örnek Dizi {i}</h2></a><span class="year">20{10 + i % 15}</span></div></li>'
+                    for i in range(36))
+        + '\n</ul>\n<div class="footer">' + "Alt bilgi " * 300 + "</div></body></html>\n"
+    )
+    files["cizgimax_series.html"] = (
+        f'<html><head><title>Örnek Dizi</title>{scripts}</head><body>\n<ul class="menu">{menu}</ul>\n'
+        '<div class="asisotope">\n'
+        + "\n".join(f'<div class="ajax_post"><a href="https://cizgimax.online/bolum/ornek-dizi-{i}/">'
+                    f'<img src="https://img.example.com/bolum/{i}.jpg"></a>'
+                    f'<span class="episode-names">{1 + i // 26}. Sezon {1 + i % 26}. Bölüm</span>'
+                    f'<span class="date">01.01.2024</span></div>'
+                    for i in range(120))
+        + '\n</div>\n<div class="footer">' + "Alt bilgi " * 300 + "</div></body></html>\n"
+    )
+
+    files["cizgimax_episode.html"] = (
+        '<html><body><div class="video-player"></div>\n<ul class="linkler">\n'
+        '<li><a href="#" data-frame="https://cizgiduo.online/embed/x7k2p9">CizgiDuo</a></li>\n'
+        '<li><a href="#" data-frame="https://video.sibnet.ru/shell.php?videoid=4812345">SibNet</a></li>\n'
+        '<li><a href="#" data-frame="">Boş</a></li>\n</ul></body></html>\n'
+    )
+    player_config = json.dumps({"file": "https://cdn.example.com/cizgiduo/x7k2p9/master.m3u8",
+                                "label": "HD", "type": "hls"}, separators=(",", ":")).replace("/", "\\/")
+    salt = bytes(rng.randrange(256) for _ in range(8))
+    blob = cizgiduo_encrypt(player_config, "cizgi-sifre-2024", salt)
+    sources = json.dumps({"sources": [{"file": blob}], "tracks": []})
+    files["cizgiduo.html"] = f"<script>bePlayer('cizgi-sifre-2024', '{sources}');</script>"
+    files["sibnet.html"] = ('<script>player.src([{src: "/v/d1e2f3/4812345.mp4", type: "video/mp4"}]);'
+                            '</script>')
+
+    files["hdfilm_detail.html"] = (
+        '<html><body><div class="film-detail"><h1>Örnek Film</h1>\n'
+        '<iframe class="vpx" data-src="https://vidrame.pro/vr/r4nd0m" allowfullscreen></iframe>\n'
+        '</div></body></html>\n'
+    )
+    files["hdfilm_iframe.html"] = (
+        '<script>var player = new Clappr.Player({source: "https://cdn.example.com/hd/r4nd0m/master.m3u8",'
+        ' subtitles: [{src: "https://cdn.example.com/hd/r4nd0m/tr.vtt", lang: "tr"}]});</script>'
+    )
+
+    groups = ["Türk Ulusal", "TR Spor", "Türk Haber", "Belgesel", "Çocuk", "Müzik", "Sinema",
+              "Россия | Федеральные", "Россия | Кино", "Deutschland", "UK | Sports", "XXX"]
+    names = ["Первый канал", "Россия 1", "НТВ", "ТНТ", "TRT 1", "Show TV", "Kanal D", "ATV",
+             "Discovery Channel", "National Geographic", "Sky Sports F1", "beIN Sports 1", "Матч ТВ"]
+    lines = ["#EXTM3U"]
+    for i in range(500):
+        name = f"{rng.choice(names)} {rng.choice(['', 'HD', 'FHD', '+2', '(Алтай)'])}".strip()
+        lines.append(f'#EXTINF:-1 tvg-id="ch{i}" tvg-name="{name}" tvg-logo="http://logo.example.com/{i}.png" '
+                     f'tvg-rec="{rng.choice([0, 1, 3, 7])}" group-title="{rng.choice(groups)}",{name}')
+        lines.append(f"http://source.example.com:8080/iptv/TOKEN123/{10000 + i}/index.m3u8")
+    files["source_sample.m3u"] = "\n".join(lines) + "\n"
+
+    # Rehber: EPG_NOW (2024-01-01 12:00 UTC) etrafında, zaman aralığının iki
+    # kenarına denk gelen programlarla; "Россия 1 +2" rehberde ayrı kanal
+    files["guide_sample.xml"] = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<tv generator-info-name="fixture">\n'
+        '<channel id="perviy.ru"><display-name>Первый канал</display-name>'
+        '<display-name>Perviy Kanal HD</display-name></channel>\n'
+        '<channel id="russia1.ru"><display-name>Россия 1</display-name></channel>\n'
+        '<channel id="russia1plus2.ru"><display-name>Россия 1 +2</display-name></channel>\n'
+        '<channel id="ntv.tr"><display-name>NTV</display-name></channel>\n'
+        '<channel id="trt1.tr"><display-name>TRT 1</display-name></channel>\n'
+        '<channel id="bos.tv"><display-name>Listede Olmayan</display-name></channel>\n'
+        # Pencere öncesinde biter: atlanır
+        '<programme start="20240101000000 +0000" stop="20240101050000 +0000" channel="perviy.ru">'
+        '<title>Gece</title></programme>\n'
+        # Pencere başlangıcını (06:00 UTC) kapsar: yazılır
+        '<programme start="20240101050000 +0000" stop="20240101070000 +0000" channel="perviy.ru">'
+        '<title>Sabah</title></programme>\n'
+        # 14:00 +0300 = 11:00 UTC: yazılır
+        '<programme start="20240101140000 +0300" stop="20240101160000 +0300" channel="perviy.ru">'
+        '<title>Öğle</title></programme>\n'
+        # Tam pencere sonunda (2024-01-03 12:00 UTC) başlar: atlanır
+        '<programme start="20240103120000 +0000" stop="20240103140000 +0000" channel="perviy.ru">'
+        '<title>Sonra</title></programme>\n'
+        # 14:00 +0300 = 11:00 UTC, pencere içinde: yazılır
+        '<programme start="20240103140000 +0300" stop="20240103150000 +0300" channel="perviy.ru">'
+        '<title>Akşam</title></programme>\n'
+        '<programme start="20240102000000 +0000" stop="20240102010000 +0000" channel="ntv.tr">'
+        '<title>Haber</title></programme>\n'
+        # Geçersiz zaman: atlanır
+        '<programme start="bozuk" stop="20240102010000 +0000" channel="ntv.tr"><title>?</title></programme>\n'
+        # Listede olmayan kanal: atlanır
+        '<programme start="20240101120000 +0000" stop="20240101130000 +0000" channel="bos.tv">'
+        '<title>Yok</title></programme>\n'
+        '</tv>\n'
+    )
+
+    # Linki çalışma anında üreten oynatıcı: kaynakta m3u8/vtt adresi yoktur,
+    # ancak ağ trafiğinden (performans logları) yakalanabilir
+    files["hdfilm_player.html"] = (
+        '<html><body><div id="player"></div>\n<script>\n'
+        'fetch("/api/source/r4nd0m").then(function (r) { return r.json(); }).then(function (d) {\n'
+        '  new Clappr.Player({parentId: "#player", source: d.file, subtitles: d.tracks});\n'
+        '});\n</script></body></html>\n'
+    )
+
+    def log(method, **params):
+        # Chrome performans log kaydı: asıl mesaj JSON metni olarak gelir
+        message = json.dumps({"message": {"method": method, "params": params}, "webview": "F1"})
+        return {"level": "INFO", "message": message, "timestamp": 1704110400000}
+
+    def request(url):
+        return log("Network.requestWillBeSent", requestId=url.rsplit("/", 1)[-1], request={"url": url})
+
+    def finished(length):
+        return log("Network.loadingFinished", requestId="x", encodedDataLength=length)
+
+    # Her liste bir get_log('performance') çağrısının cevabıdır; ilki önceki
+    # filmden kalan kayıtlardır ve NetworkCapture açılırken boşaltılır
+    files["hdfilm_perf_log.json"] = json.dumps([
+        [request("https://cdn.example.com/hd/onceki/master.m3u8"), finished(5000)],
+        [request("https://vidrame.pro/vr/r4nd0m"), finished(12000),
+         request("https://vidrame.pro/static/player.js"), finished(48000),
+         {"level": "INFO", "message": "bozuk", "timestamp": 1704110400001},
+         {"level": "INFO", "message": json.dumps({"webview": "F1"}), "timestamp": 1704110400002},
+         log("Network.responseReceived", requestId="x", response={"url": "https://cdn.example.com/a.m3u8"})],
+        [request("https://cdn.example.com/hd/r4nd0m/seg-0.ts"),
+         request("https://cdn.example.com/hd/r4nd0m/seg-1.ts?src=master.m3u8"),
+         request("https://cdn.example.com/hd/r4nd0m/master.m3u8?token=abc&e=1704114000"),
+         request("https://cdn.example.com/hd/r4nd0m/720p/index.m3u8?token=abc"),
+         request("https://cdn.example.com/hd/r4nd0m/seg-2.m4s"),
+         request("https://cdn.example.com/hd/r4nd0m/tr.vtt?v=2"),
+         request("https://cdn.example.com/hd/r4nd0m/en.vtt"),
+         finished(900), finished(1800), finished(188000), finished(None),
+         log("Network.loadingFinished", requestId="y")],
+    ], indent=1) + "\n"
+
+    for name, content in files.items():
+        with open(os.path.join(directory, name), "w", encoding="utf-8", newline="\n") as f:
+            f.write(content)
+    print(f"{len(files)} fixture dosyası '{directory}' dizinine yazıldı.")
+
+
+# --- Veri Setleri ---
+
+def scaled_playlist(count):
+    """Kayıtlı kaynak M3U örneğini 'count' kanala çoğaltır (her kanal yeni bir ID alır)."""
+    sample = load_fixture("source_sample.m3u").decode("utf-8").splitlines()[1:]
+    pairs = list(zip(sample[0::2], sample[1::2]))
+    lines = ["#EXTM3U"]
+    for i in range(count):
+        extinf, url = pairs[i % len(pairs)]
+        lines.append(extinf)
+        lines.append(url.rsplit("/", 2)[0] + f"/{100000 + i}/index.m3u8")
+    return "\n".join(lines) + "\n"
+
+
+def cizgiduo_blobs(count):
+    """Farklı tuz (salt) ve 10 farklı parola ile şifrelenmiş 'count' adet (veri, parola) çifti."""
+    rng = random.Random(count)
+    blobs = []
+    for i in range(count):
+        password = f"parola-{i % 10}"
+        salt = bytes(rng.randrange(256) for _ in range(8))
+        text = '{"file":"https:\\/\\/cdn.example.com\\/cizgiduo\\/' + str(i) + '\\/master.m3u8"}'
+        blobs.append((cizgiduo_encrypt(text, password, salt), password))
+    return blobs
+
+
+# --- Ölçüm ---
+
+@contextlib.contextmanager
+def quiet():
+    """Ölçülen fonksiyonların print / logging çıktılarını bastırır."""
+    level = logging.getLogger().level
+    logging.getLogger().setLevel(logging.WARNING)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            yield
+        finally:
+            logging.getLogger().setLevel(level)
+
+
+def measure(func, items, repeat=5):
+    """func()'u 'repeat' kez çalıştırır; medyan süreden öğe başına maliyeti hesaplar."""
+    timings = []
+    for _ in range(repeat):
+        with quiet():
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    seconds = statistics.median(timings)
+    return {
+        "items": items,
+        "seconds": round(seconds, 6),
+        "min_seconds": round(min(timings), 6),
+        "per_item_us": round(seconds / items * 1e6, 3),
+        "items_per_s": round(items / seconds, 1),
+    }
+
+
+def stage_summary():
+    """Son uçtan uca çalışmadaki metrics.py aşamalarının sayı ve p50/p95 süreleri."""
+    report = metrics.metrics.report()
+    return {name: {"count": stat["count"], "p50_ms": stat["p50_ms"], "p95_ms": stat["p95_ms"]}
+            for name, stat in report["stages"].items()}
+
+
+def bench_scx(results, sizes, repeat):
+    import deneme
+    rng = random.Random(1)
+    hosts = ["https://trstx.org/v/", "https://rapidvid.net/vod/", "https://cdn.example.com/direct/"]
+    for size in sizes:
+        links = [scx_encode(f"{rng.choice(hosts)}{rng.getrandbits(64):x}/master.m3u8") for _ in range(size)]
+        decode = deneme.decode_scx_link
+        results[f"decode_scx_link[{size}]"] = measure(lambda: [decode(link) for link in links], size, repeat)
+
+
+def bench_cizgiduo(results, sizes, repeat):
+    import scraper_bot
+    for size in sizes:
+        blobs = cizgiduo_blobs(size)
+        decrypt = scraper_bot.decrypt_cizgiduo
+        assert decrypt(*blobs[0]), "decrypt_cizgiduo fixture verisini çözemedi"
+        results[f"decrypt_cizgiduo[{size}]"] = measure(lambda: [decrypt(*blob) for blob in blobs], size, repeat)
+
+
+def bench_decoders(results, sizes, repeat):
+    """
+    decoders.py kaydındaki çözücüler: tek tek (decode), toplu (decode_batch)
+    ve aynı (parola, tuz) çiftlerinin tekrar çözülmesi (anahtar önbelleği).
+    """
+    import decoders
+    rng = random.Random(2)
+    for size in sizes:
+        payloads = {
+            "scx": [scx_encode(f"https://trstx.org/v/{rng.getrandbits(64):x}") for _ in range(size)],
+            "rapidvid": ["".join(f"\\x{byte:02x}" for byte in
+                                 f"https://cdn.example.com/rapid/{rng.getrandbits(64):x}/master.m3u8".encode())
+                         for _ in range(size)],
+            "cizgiduo": cizgiduo_blobs(size),
+        }
+        for name, items in payloads.items():
+            assert decoders.decode(name, items[0]), f"{name} çözücüsü fixture verisini çözemedi"
+            # Toplu çözüm tek tek çözümle aynı olmalı (bozuk veri None, diğerleri etkilenmez)
+            sample = items[:3] + [("bozuk", "x") if name == "cizgiduo" else "%%bozuk%%"] + items[3:6]
+            assert decoders.decode_batch(name, sample) == [decoders.decode(name, item) for item in sample], \
+                f"{name} toplu çözümü tek tek çözümden farklı"
+            decoders.evp_bytes_to_key.cache_clear()
+            results[f"decode_{name}_tek[{size}]"] = measure(
+                lambda: [decoders.decode(name, item) for item in items], size, repeat)
+            if name in decoders.BATCH_DECODERS:
+                results[f"decode_{name}_toplu[{size}]"] = measure(
+                    lambda: decoders.decode_batch(name, items), size, repeat)
+        # Aynı kaynaklar tekrar çözülürken MD5 döngüsü önbellekten atlanır
+        blobs = payloads["cizgiduo"][:100] * (size // 100)
+        decoders.evp_bytes_to_key.cache_clear()
+        results[f"decode_cizgiduo_tekrar[{len(blobs)}]"] = measure(
+            lambda: [decoders.decode("cizgiduo", blob) for blob in blobs], len(blobs), repeat)
+
+
+def bench_film_page(results, sizes, repeat):
+    import deneme
+    doc = load_fixture("fullhd_film.html").decode("utf-8")
+    rapid = load_fixture("rapidvid.html").decode("utf-8")
+    film = deneme.parse_film_page(doc, "ornek-film")
+    assert film.title and film.player_urls, "Film sayfası fixture'ı ayrıştırılamadı"
+    for size in sizes:
+        results[f"parse_film_page[{size}]"] = measure(
+            lambda: [deneme.parse_film_page(doc, "ornek-film") for _ in range(size)], size, repeat)
+        results[f"parse_rapidvid_link[{size}]"] = measure(
+            lambda: [deneme.parse_rapidvid_link(rapid) for _ in range(size)], size, repeat)
+
+
+# Eski ayıklama yöntemleri (html_extract öncesi), sadece karşılaştırma için
+def legacy_film_details(doc):
+    title = re.search(r'<div class="izle-titles">.*?<h1>(.*?)</h1>', doc, re.DOTALL).group(1).strip()
+    poster = re.search(r'<div class="film-poster">.*?<img.*?data-src="(.*?)".*?>', doc, re.DOTALL).group(1)
+    genre = re.search(r'<span class="dt">Tür</span>.*?<a.*?>(.*?)</a>', doc, re.DOTALL)
+    return {"title": title, "poster": poster, "genre": genre.group(1) if genre else ""}
+
+
+def legacy_cizgimax(page, html):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "lxml")
+    if page == "listing":
+        return [{"title": item.select_one("h2.truncate").text.strip(),
+                 "url": item.select_one("div.poster-subject a").get("href")}
+                for item in soup.select("ul.filter-results li")
+                if item.select_one("h2.truncate") and item.select_one("div.poster-subject a")]
+    if page == "series":
+        return [{"name": el.find("span", class_="episode-names").text.strip(), "url": el.find("a")["href"]}
+                for el in soup.select("div.asisotope div.ajax_post")
+                if el.find("a") and el.find("span", class_="episode-names")]
+    return [{"frame": link.get("data-frame")} for link in soup.select("ul.linkler li a") if link.get("data-frame")]
+
+
+def peak_kb(func):
+    """func()'un Python tarafındaki en yüksek bellek kullanımı (KB). lxml'in C tahsisleri sayılmaz."""
+    tracemalloc.start()
+    try:
+        func()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def bench_extract(results, sizes, repeat):
+    """Aynı sayfalarda eski yöntem ile html_extract şablonlarını karşılaştırır."""
+    import html_extract
+    pages = {
+        "fullhd_film": ("fullhd_film.html", legacy_film_details,
+                        lambda doc: html_extract.extract("fullhdfilmizlesene", "film", doc)),
+    }
+    for page in ("listing", "series", "episode"):
+        pages[f"cizgimax_{page}"] = (f"cizgimax_{page}.html", lambda doc, page=page: legacy_cizgimax(page, doc),
+                                     lambda doc, page=page: html_extract.extract("cizgimax", page, doc))
+    for name, (fixture, old, new) in pages.items():
+        doc = load_fixture(fixture).decode("utf-8")
+        assert old(doc) == new(doc), f"{name}: html_extract eski yöntemle aynı sonucu vermedi"
+        for size in sizes:
+            for label, func in (("eski", old), ("yeni", new)):
+                result = measure(lambda: [func(doc) for _ in range(size)], size, repeat)
+                result["peak_kb"] = peak_kb(lambda: func(doc))
+                results[f"extract_{name}_{label}[{size}]"] = result
+
+
+# guide_sample.xml programlarının göreli olduğu an ve beklenen eşleşmeler
+EPG_NOW = (2024, 1, 1, 12)
+EPG_EXPECTED = {
+    "Первый канал HD": ("perviy.ru", None),
+    "Первый канал +4": ("perviy.ru", "4"),
+    "Первый канал (+4)": ("perviy.ru", "4"),
+    "NTV +2": ("ntv.tr", "2"),
+    "TRT 1 -1": ("trt1.tr", "-1"),
+    "Россия 1 +2": ("russia1plus2.ru", None),
+    "Россия 1 +4": ("russia1.ru", "4"),
+    "Bilinmeyen Kanal +2": (None, None),
+}
+
+
+def check_epg(tmp):
+    """
+    guide_sample.xml ile epg.build_index, attach (+N kanallar dahil) ve
+    write_trimmed_epg'nin zaman aralığını kontrol eder. Dizini döndürür.
+    """
+    import epg
+    from datetime import datetime, timezone
+    from m3u import parse_extinf, format_extinf
+    guide = os.path.join(FIXTURE_DIR, "guide_sample.xml")
+    with quiet():
+        index = epg.build_index(guide)
+    assert index.ids == {"perviy.ru", "russia1.ru", "russia1plus2.ru", "ntv.tr", "trt1.tr", "bos.tv"}, index.ids
+    for name, (channel_id, shift) in EPG_EXPECTED.items():
+        entry = parse_extinf(f'#EXTINF:-1 group-title="Test",{name}')
+        # Kayıt sadece eşleşince değişir (EXTINF satırı yeniden yazılır)
+        assert index.attach(entry) == bool(channel_id), f"attach dönüşü yanlış: {name}"
+        got = (entry.tvg_id, (entry.extra or {}).get("tvg-shift"))
+        assert got == (channel_id, shift), f"EPG eşleşmesi yanlış: {name}: {got} != {(channel_id, shift)}"
+        if shift:
+            assert f'tvg-shift="{shift}"' in format_extinf(entry), format_extinf(entry)
+
+    output = os.path.join(tmp, "epg.xml")
+    with quiet():
+        counts = epg.write_trimmed_epg(guide, output, {"perviy.ru", "ntv.tr"}, past_hours=6, future_hours=48,
+                                       now=datetime(*EPG_NOW, tzinfo=timezone.utc))
+    titles = re.findall(r"<title>([^<]*)</title>", open(output, encoding="utf-8").read())
+    assert counts == (2, 4) and titles == ["Sabah", "Öğle", "Akşam", "Haber"], f"EPG kırpma yanlış: {counts} {titles}"
+    return index
+
+
+def bench_epg(results, sizes, repeat):
+    """EPG: Fixture ile doğruluk kontrolü, ardından kanal eşleştirme hızı (kanal/sn)."""
+    from m3u import iter_entries
+    with tempfile.TemporaryDirectory() as tmp:
+        index = check_epg(tmp)
+    for size in sizes:
+        lines = scaled_playlist(size).splitlines()
+        results[f"epg_attach[{size}]"] = measure(lambda: [index.attach(entry) for entry in iter_entries(lines)],
+                                                 size, repeat)
+
+
+def merge_playlist(count, seed):
+    """
+    Birleştirme ölçümü için 'count' kanallı liste: adlar aynı havuzdan seçilir
+    (listeler arası ortak kanallar), bir kısmı kalite/zaman kaydırma eki veya
+    tek harf eksik yazımla gelir. URL'ler her listede farklıdır.
+    """
+    pool_rng = random.Random(count)
+    syllables = ["ka", "nal", "tv", "spor", "film", "bel", "ge", "sel", "ha", "ber", "mu", "zik", "ci", "zgi",
+                 "пер", "вый", "рос", "сия", "кино", "дом", "sky", "star", "max", "plus", "ne", "ws"]
+    names = ["".join(pool_rng.choice(syllables) for _ in range(pool_rng.randint(2, 4))).title()
+             + f" {pool_rng.choice(['', 'TV', 'Channel', 'Канал', 'Türk'])}" for _ in range(count)]
+    rng = random.Random(seed)
+    lines = ["#EXTM3U"]
+    for i in range(count):
+        name = rng.choice(names).strip()
+        roll = rng.random()
+        if roll < 0.2:
+            name += f" {rng.choice(['HD', 'FHD', '4K', 'SD'])}"
+        elif roll < 0.25:
+            name += f" +{rng.choice([2, 4, 6])}"
+        elif roll < 0.3 and len(name) > 8:
+            cut = rng.randrange(3, len(name))
+            name = name[:cut] + name[cut + 1:]
+        lines.append(f'#EXTINF:-1 group-title="Grup {i % 40}",{name}')
+        lines.append(f"http://kaynak{seed}.example.com/live/{i}/index.m3u8")
+    return "\n".join(lines) + "\n"
+
+
+def check_merge(tmp):
+    """
+    playlist_merge: Canlı kanallar listeler arasında (kalite eki, tek harf
+    eksik yazım) birleşir; farklı dizilerin aynı adlı bölümleri ("1. Sezon
+    1. Bölüm - CizgiDuo") birleşmez, aynı dizinin başka listedeki bölümleri
+    yedek olur.
+    """
+    import playlist_merge
+    from m3u import iter_entries
+    files = {
+        "canli_a.m3u": [("Первый канал HD", "Россия"), ("Discovery Channel", "Belgesel"), ("TRT 1", "Ulusal")],
+        "canli_b.m3u": [("Первый канал", "RU | Federal"), ("Discovery Chanel", "Docs"), ("TRT 2", "Ulusal")],
+    }
+    series = ["Kral Sakir", "Rafadan Tayfa", "Pepee"]
+    for title in series:
+        files[f"{title}.m3u"] = [(f"1. Sezon {n}. Bölüm - CizgiDuo", title) for n in (1, 2, 3)]
+    files["Kral Şakir (yedek).m3u"] = [(f"1. Sezon {n}. Bölüm - CizgiDuo", "Kral Şakir") for n in (1, 2, 3)]
+    paths = []
+    for number, (name, entries) in enumerate(files.items()):
+        path = os.path.join(tmp, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("#EXTM3U\n")
+            for position, (title, group) in enumerate(entries):
+                f.write(f'#EXTINF:-1 group-title="{group}",{title}\n'
+                        f"http://kaynak{number}.example.com/{position}.m3u8\n")
+        paths.append(path)
+    output = os.path.join(tmp, "birlesik.m3u")
+    with quiet():
+        index = playlist_merge.merge_playlists(paths, output, alternates=2)
+    with open(output, encoding="utf-8") as f:
+        written = [(entry.name, entry.group_title) for entry in iter_entries(f)]
+    assert len(index.channels) == 13 and index.stats["fuzzy"] == 1, f"Birleştirme yanlış: {index.stats}"
+    for title in series:
+        episodes = [name for name, group in written if group == title and "Bölüm" in name]
+        expected = 6 if title == "Kral Sakir" else 3
+        assert len(episodes) == expected, f"'{title}' bölümleri yanlış birleşti: {episodes}"
+    assert ("Первый канал HD (Yedek 1)", "Россия") in written, written
+
+
+def bench_merge(results, sizes, repeat):
+    """
+    playlist_merge: Fixture ile doğruluk kontrolü, ardından tek listede
+    (yaklaşık eşleşmeli ve birebir) ve üç listede birleştirme hızı (kayıt/sn).
+    """
+    import playlist_merge
+    # Büyük listelerde tek tekrar saniyeler sürer
+    repeat = min(repeat, 3)
+    with tempfile.TemporaryDirectory() as tmp:
+        check_merge(tmp)
+        output = os.path.join(tmp, "birlesik.m3u")
+        for size in sizes:
+            paths = []
+            for seed in (1, 2, 3):
+                paths.append(os.path.join(tmp, f"liste_{seed}_{size}.m3u"))
+                with open(paths[-1], "w", encoding="utf-8") as f:
+                    f.write(merge_playlist(size, seed))
+            cases = {"merge": (paths[:1], True), "merge_birebir": (paths[:1], False),
+                     "merge_3_liste": (paths, True)}
+            for name, (inputs, fuzzy) in cases.items():
+                playlist_merge.title_key.cache_clear()
+                results[f"{name}[{size}]"] = measure(
+                    lambda: playlist_merge.merge_playlists(inputs, output, fuzzy=fuzzy), size * len(inputs), repeat)
+
+
+def bench_playlist(results, sizes, repeat):
+    import iptv_converter
+    for size in sizes:
+        content = scaled_playlist(size)
+        results[f"parse_and_group_channels[{size}]"] = measure(
+            lambda: iptv_converter.parse_and_group_channels(content), size, repeat)
+        with quiet():
+            grouped = iptv_converter.parse_and_group_channels(content)
+        results[f"build_new_playlist[{size}]"] = measure(
+            lambda: iptv_converter.build_new_playlist(grouped, "http://yeni.example.com/iptv/X/"), size, repeat)
+
+
+def bench_serve(results, sizes, repeat):
+    """playlist_server: Önbellekteki listeden cevap (istek/sn) ve yenilemede ön üretim (kanal/sn)."""
+    import iptv_converter
+    import playlist_server
+    config = {"base_url": "http://yeni.example.com/iptv/X/", "profiles": [
+        {"name": "ana", "output_file": "liste.m3u8"},
+        {"name": "spor", "output_file": "spor.m3u8", "include_groups": ["spor"], "channel_sort": ["name"]},
+    ]}
+    server = playlist_server.PlaylistServer("config.yml")
+    server.profiles = playlist_server.profile_routes(iptv_converter.load_profiles(config))
+    server.spool = iptv_converter.GroupSpool(None)
+    with quiet():
+        iptv_converter.spool_channels(scaled_playlist(SERVE_CHANNELS).splitlines(), server.spool)
+    server.loaded_at = "Thu, 01 Jan 2026 00:00:00 GMT"
+    results[f"serve_prerender[{SERVE_CHANNELS}]"] = measure(
+        lambda: server.prerender(server.profiles, server.spool, server.loaded_at), SERVE_CHANNELS, repeat)
+    server.cache, server.groups = server.prerender(server.profiles, server.spool, server.loaded_at)
+    group = server.groups[server.profiles["spor"]["render_key"]][0]
+    etag = server.lookup("ana").etag
+    cases = {
+        "gzip": ("ana", None, {"Accept-Encoding": "gzip, deflate"}),
+        "304": ("ana", None, {"If-None-Match": etag}),
+        "range": ("ana", None, {"Range": "bytes=1000-65535"}),
+        "grup": ("spor", group, {"Accept-Encoding": "gzip"}),
+    }
+    respond = playlist_server.respond
+    for size in sizes:
+        for name, (profile, group_name, headers) in cases.items():
+            results[f"serve_{name}[{size}]"] = measure(
+                lambda: [respond(server.lookup(profile, group_name), headers) for _ in range(size)], size, repeat)
+
+
+def bench_deneme(results, size, latency):
+    """deneme.build_m3u: liste sayfası -> film sayfası -> trstx/rapidvid -> M3U8 sıralama -> dosya."""
+    import deneme
+    adapter = FixtureAdapter(latency)
+    mount_fixtures(deneme.session, adapter)
+    # Liste sayfaları arasındaki nezaket beklemesi ölçülmez
+    deneme.sleep = lambda seconds: None
+    deneme.link_cache = None
+    metrics.metrics.reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        result = measure(lambda: deneme.build_m3u(pages=2, output_file=os.path.join(tmp, "yelon.m3u")),
+                         size, repeat=3)
+    result["requests_per_item"] = round(adapter.requests / 3 / size, 2)
+    result["stages"] = stage_summary()
+    results[f"e2e_deneme_build_m3u[{size}]"] = result
+
+
+def bench_deneme_async(results, size, latency):
+    """
+    deneme_async.AsyncFilmCrawler: aynı fixture'lar yerel bir aiohttp sunucusundan,
+    gerçek bağlantılarla verilir. Sonuç AsyncFilmCrawler.run()'ın film/sn değeridir.
+    """
+    import deneme_async
+
+    app = FixtureApp(latency)
+
+    class LocalCrawler(deneme_async.AsyncFilmCrawler):
+        # Sunucu sınırları orijinal adrese göre uygulanır, istek yerel sunucuya gider
+        async def request(self, method, url, as_json=False):
+            return await super().request(method, app.local_url(url), as_json)
+
+        async def fetch_hls_info(self, url, max_bytes=65536):
+            return await super().fetch_hls_info(app.local_url(url), max_bytes)
+
+    # Bütün istekler aynı yerel sunucuya gider; sunucu bazındaki hız sınırları ölçülmez
+    limits = {"127.0.0.1": (40, 100000.0)}
+    loop = asyncio.new_event_loop()
+    rates = []
+    try:
+        loop.run_until_complete(app.start())
+        with tempfile.TemporaryDirectory() as tmp:
+            output_file = os.path.join(tmp, "yelon.m3u")
+
+            def crawl():
+                crawler = LocalCrawler(pages=2, output_file=output_file, max_workers=20, host_limits=limits)
+                rates.append(loop.run_until_complete(crawler.run()))
+                assert crawler.film_count == size and len(crawler.results) == size, \
+                    f"Async tarayıcı {len(crawler.results)}/{size} filmi yazdı"
+
+            metrics.metrics.reset()
+            result = measure(crawl, size, repeat=3)
+
+            # Tarama beklenmedik bir hatayla biterse işçiler çıkar, run() takılmadan hatayı verir
+            parse_listing_slugs = deneme_async.deneme.parse_listing_slugs
+            deneme_async.deneme.parse_listing_slugs = lambda html: 1 / 0
+            try:
+                crawler = LocalCrawler(pages=2, output_file=output_file, max_workers=20, host_limits=limits)
+                with quiet():
+                    loop.run_until_complete(asyncio.wait_for(crawler.run(), timeout=10))
+                raise AssertionError("Tarama hatası run()'dan çıkmadı")
+            except ZeroDivisionError:
+                pass
+            finally:
+                deneme_async.deneme.parse_listing_slugs = parse_listing_slugs
+            workers = [task for task in asyncio.all_tasks(loop) if "worker" in task.get_coro().__qualname__]
+            assert not workers, f"Tarama hatasından sonra {len(workers)} işçi kuyrukta bekliyor"
+    finally:
+        loop.run_until_complete(app.stop())
+        loop.close()
+    result["films_per_s"] = round(statistics.median(rates), 1)
+    result["requests_per_item"] = round(app.requests / 3 / size, 2)
+    result["stages"] = stage_summary()
+    results[f"e2e_deneme_async[{size}]"] = result
+
+
+def bench_cizgimax(results, size, latency):
+    """CizgiMax bölüm çözme: bölüm sayfası -> cizgiduo (AES) + sibnet iframe'leri."""
+    import scraper_bot
+    adapter = FixtureAdapter(latency)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Sınıf çalışma dizininde m3u_playlists klasörü açar
+        os.chdir(tmp)
+        try:
+            scraper = scraper_bot.CizgiMaxFullScraper(cache_path=None, journal_path=None, rate=0)
+        finally:
+            os.chdir(cwd)
+        mount_fixtures(scraper.scraper.scraper, adapter)
+        episodes = [{"name": f"Bölüm {i}", "url": f"https://cizgimax.online/bolum-{i}/"} for i in range(size)]
+        metrics.metrics.reset()
+
+        def run():
+            with ThreadPoolExecutor(max_workers=scraper.max_workers) as executor:
+                found = sum(len(sources) for sources in executor.map(scraper.resolve_episode, episodes))
+            assert found == 2 * size, f"Beklenen {2 * size} kaynak, bulunan {found}"
+
+        result = measure(run, size, repeat=3)
+    result["stages"] = stage_summary()
+    results[f"e2e_cizgimax_episodes[{size}]"] = result
+
+
+# hdfilm_perf_log.json'dan beklenen: ilk manifest ve altyazı (sorgu dahil),
+# önceki filmin kayıtları hariç indirilen bayt toplamı
+HDFILM_CAPTURE_EXPECTED = ("https://cdn.example.com/hd/r4nd0m/master.m3u8?token=abc&e=1704114000",
+                           "https://cdn.example.com/hd/r4nd0m/tr.vtt?v=2", 250700)
+
+
+class FakeDriver:
+    """
+    Selenium sürücüsü yerine: sayfaları fixture'lardan, performans loglarını
+    hdfilm_perf_log.json'daki sırayla verir. IFRAME'ler sayfa kaynağından bulunur.
+    """
+
+    def __init__(self, pages, log_batches):
+        self.pages = pages
+        self.log_batches = list(log_batches)
+        self.page_source = ""
+        self.scripts = 0
+
+    def get(self, url):
+        self.page_source = self.pages[url]
+
+    def get_log(self, kind):
+        return self.log_batches.pop(0) if self.log_batches else []
+
+    def execute_script(self, script):
+        self.scripts += 1
+
+    def find_elements(self, by, value):
+        tags = re.findall(r"<iframe\b[^>]*>", self.page_source)
+        if value == "iframe.vpx":
+            tags = [tag for tag in tags if re.search(r'class="[^"]*\bvpx\b', tag)]
+        return [FakeElement(tag) for tag in tags]
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(value)
+        return elements[0]
+
+
+class FakeElement:
+    def __init__(self, tag):
+        self.tag = tag
+
+    def get_attribute(self, name):
+        match = re.search(r'\b(?:data-)?%s="([^"]+)"' % name, self.tag)
+        return match.group(1) if match else None
+
+
+def check_hdfilm_capture(hdfilm_kaziyici):
+    """
+    hdfilm_player.html ve hdfilm_perf_log.json ile NetworkCapture.poll()'u
+    (ilk manifest/altyazı, parça istekleri atlanır, encodedDataLength toplamı)
+    ve find_player_links(capture=True) akışını kontrol eder.
+    """
+    with open(os.path.join(FIXTURE_DIR, "hdfilm_perf_log.json"), encoding="utf-8") as f:
+        log_batches = json.load(f)
+    pages = {"https://www.hdfilmizle.to/film/ornek/": load_fixture("hdfilm_detail.html").decode("utf-8"),
+             "https://vidrame.pro/vr/r4nd0m": load_fixture("hdfilm_player.html").decode("utf-8")}
+    video, subtitle, received = HDFILM_CAPTURE_EXPECTED
+    assert hdfilm_kaziyici.extract_media_links(pages["https://vidrame.pro/vr/r4nd0m"]) == (None, None), \
+        "hdfilm_player.html linki kaynakta içermemeli"
+
+    capture = hdfilm_kaziyici.NetworkCapture(FakeDriver(pages, log_batches))
+    assert capture.poll() is False and capture.video_link is None, "Manifest isteğinden önce link yakalandı"
+    assert capture.poll() is True, "Manifest isteği yakalanmadı"
+    got = (capture.video_link, capture.subtitle_link, capture.bytes_received)
+    assert got == HDFILM_CAPTURE_EXPECTED, f"Ağ yakalama yanlış: {got}"
+
+    driver = FakeDriver(pages, log_batches)
+    metrics.metrics.reset()
+    with quiet():
+        links = hdfilm_kaziyici.find_player_links(driver, "https://www.hdfilmizle.to/film/ornek/", capture=True)
+    assert links == (video, subtitle) and driver.scripts == 1, f"Yakalama akışı yanlış: {links}"
+    assert metrics.metrics.report()["counters"]["selenium_bytes"] == received
+
+
+def check_browser_pool(hdfilm_kaziyici):
+    """Sürücü açılamazsa BrowserPool her iş parçacığında setup_driver'ı bir kez dener."""
+    calls = []
+    setup_driver = hdfilm_kaziyici.setup_driver
+    hdfilm_kaziyici.setup_driver = lambda capture=False: calls.append(threading.get_ident())
+    try:
+        pool = hdfilm_kaziyici.BrowserPool()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            drivers = list(executor.map(lambda _: pool.get_driver(), range(20)))
+    finally:
+        hdfilm_kaziyici.setup_driver = setup_driver
+    assert drivers == [None] * 20 and len(calls) == len(set(calls)) <= 2, \
+        f"Açılamayan sürücü tekrar denendi: {len(calls)} deneme"
+
+
+def bench_hdfilm(results, size, latency):
+    """
+    hdfilm_kaziyici: Fixture'larla ağ yakalama kontrolü, ardından HTTP hızlı yolu:
+    detay sayfası -> oynatıcı iframe'i -> m3u8/vtt.
+    """
+    try:
+        import hdfilm_kaziyici
+    except ImportError as e:
+        print(f"Uyarı: hdfilm_kaziyici yüklenemedi ({e}), ölçüm atlandı.")
+        return
+    check_hdfilm_capture(hdfilm_kaziyici)
+    check_browser_pool(hdfilm_kaziyici)
+    adapter = FixtureAdapter(latency)
+    mount_fixtures(hdfilm_kaziyici.http, adapter)
+    urls = [f"https://www.hdfilmizle.to/film/ornek-{i}/" for i in range(size)]
+    metrics.metrics.reset()
+
+    def run():
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            links = list(executor.map(hdfilm_kaziyici.find_player_links_http, urls))
+        assert all(video for video, _ in links), "hdfilm fixture'ından link çıkmadı"
+
+    result = measure(run, size, repeat=3)
+    result["stages"] = stage_summary()
+    results[f"e2e_hdfilm_http[{size}]"] = result
+
+
+def bench_stream_probe(results, size, latency):
+    """
+    stream_probe.probe_playlist: yerel HLS sunucusuna karşı kanal/sn. Önce
+    HEAD 405/501 -> Range'li GET geçişi, 404'lerin ayrılması, başlık ve
+    EXTINF satırlarının korunması ve önbellek TTL'i kontrol edilir.
+    """
+    import stream_probe
+    with hls_stub_server(latency) as (base, stats), tempfile.TemporaryDirectory() as tmp:
+        playlist = os.path.join(tmp, "liste.m3u8")
+        with open(playlist, "w", encoding="utf-8") as f:
+            f.write('#EXTM3U url-tvg="http://epg.example.com/guide.xml.gz"\n')
+            for n in range(size):
+                f.write(f"#EXTINF:-1 tvg-id='ch{n}' group-title=\"Test\",Kanal {n}\n{base}/live/{n}/index.m3u8\n")
+        live_file, dead_file = os.path.join(tmp, "canli.m3u8"), os.path.join(tmp, "olu.m3u8")
+        dead = sum(1 for n in range(size) if n % 10 == 7)
+        fallback = sum(1 for n in range(size) if n % 10 in (3, 5))
+
+        cache_file = os.path.join(tmp, "probe_cache.json")
+        with quiet():
+            counts = stream_probe.probe_playlist(playlist, live_file, dead_file, cache_file=cache_file)
+        assert counts == (size - dead, dead), f"Yayın kontrolü yanlış: {counts}"
+        assert stats == {"HEAD": size, "GET": fallback, "range": fallback}, f"HEAD -> GET geçişi yanlış: {stats}"
+        with open(cache_file, encoding="utf-8") as f:
+            cached = json.load(f)
+        assert cached[f"{base}/live/3/index.m3u8"]["status"] == 206, "GET geçişinin sonucu önbelleğe yazılmadı"
+        # Başlık (url-tvg) ve EXTINF satırları kaynaktaki gibi kalır
+        with open(live_file, encoding="utf-8") as f:
+            header, extinf = f.readline(), f.readline()
+        assert header == '#EXTM3U url-tvg="http://epg.example.com/guide.xml.gz"\n', header
+        assert extinf == "#EXTINF:-1 tvg-id='ch0' group-title=\"Test\",Kanal 0\n", extinf
+        with quiet():
+            stream_probe.probe_playlist(playlist, live_file, dead_file, cache_file=cache_file)
+        assert stats["HEAD"] == size, "TTL süresi dolmamış kanallar yeniden kontrol edildi"
+
+        # Önbelleksiz: her tekrarda bütün kanallar gerçekten kontrol edilir
+        result = measure(lambda: stream_probe.probe_playlist(playlist, live_file, cache_file=None), size, repeat=3)
+    results[f"e2e_stream_probe[{size}]"] = result
+
+
+def bench_converter(results, size, latency):
+    """iptv_converter.convert: yerel sunucudan indirme, ayrıştırma ve yazma (bellek ve akış modu)."""
+    import iptv_converter
+    body = scaled_playlist(size).encode("utf-8")
+    with playlist_server(body) as url, tempfile.TemporaryDirectory() as tmp:
+        for stream in (False, True):
+            config = {"source_playlist_url": url, "base_url": "http://yeni.example.com/iptv/X/",
+                      "output_file": os.path.join(tmp, "liste.m3u8"),
+                      "state_file": os.path.join(tmp, "durum.json")}
+            metrics.metrics.reset()
+            result = measure(lambda: iptv_converter.convert(config, force=True, stream=stream), size, repeat=3)
+            result["stages"] = stage_summary()
+            results[f"e2e_converter_{'stream' if stream else 'memory'}[{size}]"] = result
+
+
+# --- Raporlama ---
+
+def machine_info():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count()}
+
+
+def load_baseline(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """
+    Sonuçları yazdırır, temel sonuca göre 'threshold' oranından fazla
+    yavaşlayan ölçümlerin adlarını döndürür.
+    """
+    previous = (baseline or {}).get("results", {})
+    regressions = []
+    print(f"\n{'Ölçüm':<42} {'µs/öğe':>12} {'öğe/sn':>14} {'KB/öğe':>8}  {'Temel ile fark':>16}")
+    for name, result in results.items():
+        change = ""
+        before = previous.get(name)
+        if before:
+            # Gürültüye en az duyarlı olan en iyi (min) süreler karşılaştırılır
+            ratio = result["min_seconds"] / before["min_seconds"] - 1 if before["min_seconds"] else 0.0
+            change = f"{ratio:+.1%}"
+            if ratio > threshold:
+                change += "  YAVAŞLADI"
+                regressions.append(name)
+        peak = f"{result['peak_kb']:,.1f}" if "peak_kb" in result else ""
+        print(f"{name:<42} {result['per_item_us']:>12,.2f} {result['items_per_s']:>14,.0f} {peak:>8}  {change:>16}")
+    if baseline and baseline.get("machine") != machine_info():
+        print("Not: Temel sonuçlar farklı bir makinede/Python sürümünde alınmış, karşılaştırma yaklaşıktır.")
+    return regressions
+
+
+def save_results(path, results):
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "machine": machine_info(), "results": results}
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_file, path)
+    print(f"Sonuçlar '{path}' dosyasına yazıldı.")
+
+
+def run_benchmarks(only=None, quick=False, repeat=5, latency=0.0):
+    selected = only or BENCHMARKS
+    divisor = 10 if quick else 1
+    results = {}
+    micro = {"scx": bench_scx, "cizgiduo": bench_cizgiduo, "decoders": bench_decoders, "film_page": bench_film_page,
+             "playlist": bench_playlist, "extract": bench_extract, "serve": bench_serve, "epg": bench_epg,
+             "merge": bench_merge}
+    e2e = {"deneme": bench_deneme, "deneme_async": bench_deneme_async, "cizgimax": bench_cizgimax,
+           "hdfilm": bench_hdfilm, "converter": bench_converter, "stream_probe": bench_stream_probe}
+    for name in selected:
+        start = time.perf_counter()
+        if name in micro:
+            micro[name](results, [max(1, size // divisor) for size in SIZES[name]], repeat)
+        else:
+            # Liste sayfasındaki film sayısı sabittir
+            size = E2E_SIZES[name] if name in ("deneme", "deneme_async") else max(1, E2E_SIZES[name] // divisor)
+            e2e[name](results, size, latency)
+        print(f"[{name}] {time.perf_counter() - start:.1f} sn")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Kayıtlı fixture'larla çevrimdışı performans ölçümü.")
+    parser.add_argument("--only", default=None,
+                        help=f"Virgülle ayrılmış ölçümler: {','.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="Veri boyutlarını 10'a bölerek hızlı çalıştır")
+    parser.add_argument("--repeat", type=int, default=5, help="Fonksiyon ölçümlerinde tekrar sayısı")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Uçtan uca ölçümlerde her isteğe eklenecek yapay gecikme")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Temel sonuç dosyası")
+    parser.add_argument("--save-baseline", action="store_true", help="Sonuçları yeni temel olarak kaydet")
+    parser.add_argument("--output", default=None, help="Sonuçları ayrıca bu JSON dosyasına yaz")
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="Bu orandan fazla yavaşlama gerileme sayılır (0.3 = %%30)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Gerileme varsa 1 çıkış koduyla bit (CI için)")
+    parser.add_argument("--make-fixtures", action="store_true", help="Fixture dosyalarını yeniden üret")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    if args.make_fixtures:
+        make_fixtures()
+        return
+    only = [name.strip() for name in args.only.split(",")] if args.only else None
+    for name in only or ():
+        if name not in BENCHMARKS:
+            sys.exit(f"HATA: Bilinmeyen ölçüm: {name}")
+
+    print(f"--- Çevrimdışı benchmark ({'hızlı' if args.quick else 'tam'}) ---")
+    results = run_benchmarks(only, args.quick, args.repeat, args.latency_ms / 1000)
+    regressions = compare(results, load_baseline(args.baseline), args.threshold)
+
+    if args.output:
+        save_results(args.output, results)
+    if args.save_baseline:
+        save_results(args.baseline, results)
+    if regressions:
+        print(f"\n{len(regressions)} ölçümde %{args.threshold * 100:.0f}'den fazla yavaşlama: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
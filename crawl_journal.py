@@ -0,0 +1,116 @@
+"""
+scraper_bot.py için kalıcı tarama günlüğü (SQLite).
+
+Hangi kategori sayfalarının, serilerin ve bölümlerin tamamlandığını ve
+bölümlerin çözülmüş kaynaklarını saklar. Çalışma yarıda kesilirse bir
+sonraki çalışma kaldığı yerden devam eder.
+"""
+import json
+import sqlite3
+import time
+
+
+class CrawlJournal:
+    """Sayfa / seri / bölüm düzeyinde ilerleme kaydı tutar."""
+
+    def __init__(self, path="crawl_journal.sqlite"):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, started_at REAL NOT NULL, finished_at REAL);"
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " run_id INTEGER NOT NULL, category TEXT NOT NULL, page INTEGER NOT NULL,"
+            " finished_at REAL NOT NULL, PRIMARY KEY (run_id, category, page));"
+            "CREATE TABLE IF NOT EXISTS series ("
+            " url TEXT PRIMARY KEY, title TEXT, episode_count INTEGER,"
+            " run_id INTEGER NOT NULL, completed_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS episodes ("
+            " url TEXT PRIMARY KEY, series_url TEXT NOT NULL, name TEXT, sources TEXT NOT NULL,"
+            " run_id INTEGER NOT NULL, resolved_at REAL NOT NULL);"
+        )
+        self.db.commit()
+        self.run_id = None
+        self.resuming = False
+
+    def begin_run(self, fresh=False):
+        """
+        Yarım kalmış bir çalışma varsa ona devam eder, yoksa yeni çalışma başlatır.
+        'fresh' verilirse yarım kalan çalışma kapatılıp yenisi açılır.
+        """
+        row = self.db.execute(
+            "SELECT id FROM runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row and not fresh:
+            self.run_id = row[0]
+            self.resuming = True
+        else:
+            if row:
+                self.db.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), row[0]))
+            cursor = self.db.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),))
+            self.run_id = cursor.lastrowid
+            self.resuming = False
+        self.db.commit()
+        return self.run_id, self.resuming
+
+    def finish_run(self):
+        self.db.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), self.run_id))
+        self.db.commit()
+
+    def next_page(self, category):
+        """Bu çalışmada kategorinin tamamlanmış son sayfasından sonraki sayfa numarası."""
+        row = self.db.execute(
+            "SELECT MAX(page) FROM pages WHERE run_id = ? AND category = ?", (self.run_id, category)
+        ).fetchone()
+        return (row[0] or 0) + 1
+
+    def complete_page(self, category, page):
+        self.db.execute(
+            "INSERT OR REPLACE INTO pages (run_id, category, page, finished_at) VALUES (?, ?, ?, ?)",
+            (self.run_id, category, page, time.time()),
+        )
+        self.db.commit()
+
+    def series_done_in_run(self, series_url):
+        """Seri bu çalışmada (devam edilen çalışma dahil) tamamlandı mı?"""
+        row = self.db.execute(
+            "SELECT 1 FROM series WHERE url = ? AND run_id = ?", (series_url, self.run_id)
+        ).fetchone()
+        return row is not None
+
+    def series_fully_processed(self, series_url, episodes):
+        """Seri daha önce tamamlanmış ve sitedeki tüm bölümleri günlükte var mı?"""
+        row = self.db.execute("SELECT 1 FROM series WHERE url = ?", (series_url,)).fetchone()
+        if row is None:
+            return False
+        known = self.known_episodes(series_url)
+        return all(episode["url"] in known for episode in episodes)
+
+    def complete_series(self, series_url, title, episode_count):
+        self.db.execute(
+            "INSERT OR REPLACE INTO series (url, title, episode_count, run_id, completed_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (series_url, title, episode_count, self.run_id, time.time()),
+        )
+        self.db.commit()
+
+    def known_episodes(self, series_url, this_run_only=False):
+        """Serinin günlükteki bölümlerini {bölüm_url: kaynak_listesi} olarak döndürür."""
+        query = "SELECT url, sources FROM episodes WHERE series_url = ?"
+        params = [series_url]
+        if this_run_only:
+            query += " AND run_id = ?"
+            params.append(self.run_id)
+        return {url: json.loads(sources) for url, sources in self.db.execute(query, params)}
+
+    def record_episode(self, series_url, episode, sources):
+        self.db.execute(
+            "INSERT OR REPLACE INTO episodes (url, series_url, name, sources, run_id, resolved_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (episode["url"], series_url, episode["name"], json.dumps(sources, ensure_ascii=False),
+             self.run_id, time.time()),
+        )
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,126 @@
+"""
+Oynatıcı verilerini çözen (decode/decrypt) CPU ağırlıklı işlemlerin kaydı.
+
+Her çözücü DECODERS tablosuna @register ile bir adla eklenir:
+- "scx": fullhdfilmizlesene 'scx' linkleri (ROT13 + Base64)
+- "rapidvid": RapidVid/VidMoxy sayfalarındaki "\\x68\\x74..." hex dizileri
+- "cizgiduo": CizgiDuo bePlayer verisi, (şifreli veri, parola) çifti
+  (OpenSSL "Salted__" + AES-256-CBC, anahtar EVP_BytesToKey/MD5 ile)
+
+decode(ad, veri) tek bir veriyi çalışan iş parçacığında çözer.
+decode_batch(ad, veriler) bir sayfadaki verileri birlikte çözer: çözücünün
+@register_batch ile eklenmiş toplu hali varsa (scx) metin dönüşümü tüm
+veriler birleştirilerek tek çağrıda yapılır, yoksa veriler tek tek çözülür.
+Süreç havuzu bilerek kullanılmaz: bir veri en fazla ~30 µs sürer ve bir
+sayfada birkaç veri bulunur, süreçler arası kopyalama bundan pahalıdır.
+
+Çözülemeyen verilerde None döner (çağıranlar bunu "link yok" sayar).
+"""
+import base64
+import codecs
+import hashlib
+from functools import lru_cache
+
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import unpad
+
+DECODERS = {}
+BATCH_DECODERS = {}
+
+# Toplu çözmede veriler bu karakterle birleştirilir (kodlanmış verilerde bulunmaz)
+_SEPARATOR = "\n"
+_ROT13 = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz",
+    "NOPQRSTUVWXYZABCDEFGHIJKLMnopqrstuvwxyzabcdefghijklm",
+)
+
+
+def register(name):
+    """Çözücü fonksiyonu DECODERS tablosuna 'name' adıyla ekler."""
+    def decorator(func):
+        DECODERS[name] = func
+        return func
+    return decorator
+
+
+def register_batch(name):
+    """
+    Çözücünün toplu halini BATCH_DECODERS tablosuna ekler. Toplu çözücü
+    veri listesini alır, sıralı sonuç listesini (çözülemeyenler None) döndürür.
+    """
+    def decorator(func):
+        BATCH_DECODERS[name] = func
+        return func
+    return decorator
+
+
+@register("scx")
+def decode_scx(encoded_link):
+    """ROT13 ve ardından Base64 ile kodlanmış linki çözer."""
+    return base64.b64decode(codecs.decode(encoded_link, 'rot_13')).decode('utf-8')
+
+
+@register_batch("scx")
+def decode_scx_batch(encoded_links):
+    """ROT13 tüm linklere tek translate çağrısıyla uygulanır, Base64 link başına çözülür."""
+    if not all(isinstance(link, str) and _SEPARATOR not in link for link in encoded_links):
+        return [decode("scx", link) for link in encoded_links]
+    rotated = _SEPARATOR.join(encoded_links).translate(_ROT13).split(_SEPARATOR)
+    results = []
+    for link in rotated:
+        try:
+            results.append(base64.b64decode(link).decode('utf-8'))
+        except Exception:
+            results.append(None)
+    return results
+
+
+@register("rapidvid")
+def decode_hex(hex_string):
+    """'\\x68\\x74...' biçimindeki (veya düz) hex diziyi metne çevirir."""
+    return bytes.fromhex(hex_string.replace("\\x", "")).decode('utf-8')
+
+
+@lru_cache(maxsize=4096)
+def evp_bytes_to_key(password, salt):
+    """
+    OpenSSL EVP_BytesToKey (MD5, tek tur): 32 bayt anahtar + 16 bayt IV.
+    Aynı (parola, tuz) çifti tekrar geldiğinde (aynı kaynağın yeniden
+    çözülmesi) MD5 döngüsü çalışmaz; sınırlı LRU önbelleği kullanılır.
+    """
+    key_iv = b''
+    block = b''
+    while len(key_iv) < 48:
+        block = hashlib.md5(block + password + salt).digest()
+        key_iv += block
+    return key_iv[:32], key_iv[32:48]
+
+
+@register("cizgiduo")
+def decrypt_cizgiduo(payload):
+    """Kotlin kodundaki AesHelper.cryptoAESHandler karşılığı. payload: (şifreli veri, parola)."""
+    encrypted_data, password = payload
+    encrypted_bytes = base64.b64decode(encrypted_data)
+    key, iv = evp_bytes_to_key(password.encode(), encrypted_bytes[8:16])
+    cipher = AES.new(key, AES.MODE_CBC, iv)
+    return unpad(cipher.decrypt(encrypted_bytes[16:]), AES.block_size).decode('utf-8')
+
+
+def decode(name, payload):
+    """Tek bir veriyi çözer; çözülemezse None döndürür."""
+    try:
+        return DECODERS[name](payload)
+    except Exception:
+        return None
+
+
+def decode_batch(name, payloads):
+    """
+    Verileri çözer, sonuç listesini aynı sırada döndürür. Toplu çözücüsü
+    olmayan çözücülerde veriler tek tek çözülür.
+    """
+    payloads = list(payloads)
+    batch = BATCH_DECODERS.get(name)
+    if batch is None or len(payloads) < 2:
+        return [decode(name, payload) for payload in payloads]
+    return batch(payloads)
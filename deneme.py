@@ -1,13 +1,17 @@
-import requests
 import re
-import base64
 import json
 import logging
+import time
 from concurrent.futures import ThreadPoolExecutor
 from requests.exceptions import RequestException
 from time import sleep
-import codecs # ROT13 için eklendi
 import urllib3 # SSL uyarısını kapatmak için eklendi
+from m3u import M3UEntry, OrderedM3UWriter
+import decoders
+import discovery
+import html_extract
+import http_transport
+import metrics
 
 # --- SSL UYARILARINI KAPAT ---
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -18,150 +22,462 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # --- YENİ SİTE ADRESİ ---
 BASE_URL = "https://www.fullhdfilmizlesene.nl"
 
-# Ana Session objesi
-session = requests.Session()
-session.headers.update({
+# Ana Session objesi (tekrar deneme, sunucu bazında hız ve devre kesici: http_transport.py)
+session = http_transport.create_session(headers={
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
     "Referer": f"{BASE_URL}/"
 })
 # --- SSL DOĞRULAMASINI ATLA ---
 session.verify = False
+# Her istek sunucu bazında ölçülür (metrics.py, --metrics ile raporlanır)
+metrics.instrument_session(session)
+
+# Çözülmüş linkler için kalıcı önbellek (link_cache.LinkCache). None ise kapalı.
+link_cache = None
+
+# Aday M3U8 linkleri indirilip kaliteye ve hıza göre sıralansın mı?
+inspect_sources = True
 
 # --- YENİ DECODE FONKSİYONU ---
+@metrics.timed("scx_decode", count_empty=True)
 def decode_scx_link(encoded_link):
-    """ROT13 ve Base64 ile şifrelenmiş linki çözer."""
-    try:
-        rot13_decoded = codecs.decode(encoded_link, 'rot_13')
-        return base64.b64decode(rot13_decoded).decode('utf-8')
-    except Exception as e:
-        logging.error(f"SCX link decode edilemedi: {e}")
+    """ROT13 ve Base64 ile şifrelenmiş linki çözer (decoders.py)."""
+    decoded = decoders.decode("scx", encoded_link)
+    if decoded is None:
+        logging.error(f"SCX link decode edilemedi: {encoded_link[:40]}")
+    return decoded
+
+# --- SAYFA AYRIŞTIRMA FONKSİYONLARI (Ağ erişimi yapmaz) ---
+def parse_listing_slugs(html):
+    """Liste sayfasındaki film slug'larını sayfa sırasıyla ve tekrarsız döndürür."""
+    slugs = re.findall(r'<a href="' + re.escape(BASE_URL) + r'/film/([^/]+)/"', html)
+    return list(dict.fromkeys(slugs))
+
+def parse_film_details(doc, slug):
+    """
+    Film sayfası HTML'inden başlık, poster ve türü ayıklar (html_extract şablonu).
+    Başlık bulunamazsa slug'dan üretilir.
+    """
+    details = html_extract.extract("fullhdfilmizlesene", "film", doc)
+    if not details["title"]:
+        return slug.replace("-", " ").title(), None, "Bilinmeyen"
+    return details["title"], details["poster"] or None, details["genre"] or "Bilinmeyen"
+
+def parse_scx_links(doc):
+    """
+    Film sayfasındaki 'scx' JSON'undan çözülmüş oynatıcı linklerini döndürür.
+    SCX verisi yoksa None döner.
+    """
+    scx_match = re.search(r'scx = (\{.*?\});', doc)
+    if not scx_match:
         return None
 
+    scx_data = json.loads(scx_match.group(1))
+    links_to_process = []
+    for source_key, source_data in scx_data.items():
+        if isinstance(source_data, dict) and 'sx' in source_data and 't' in source_data['sx']:
+            encoded_links = source_data['sx']['t']
+            if isinstance(encoded_links, list):
+                links_to_process.extend(encoded_links)
+            elif isinstance(encoded_links, dict):
+                links_to_process.extend(encoded_links.values())
+
+    # Sayfadaki tüm linkler tek seferde çözülür
+    decoded_urls = []
+    for encoded_link, decoded_url in zip(links_to_process, decoders.decode_batch("scx", links_to_process)):
+        if decoded_url:
+            decoded_urls.append(decoded_url)
+        else:
+            logging.error(f"SCX link decode edilemedi: {encoded_link[:40]}")
+    return decoded_urls
+
+def classify_player(url):
+    """Çözülmüş linkin hangi oynatıcıya ait olduğunu döndürür."""
+    if "trstx.org" in url:
+        return "trstx"
+    if "rapidvid.net" in url or "vidmoxy.com" in url:
+        return "rapidvid"
+    if url.endswith('.m3u8'):
+        return "direct"
+    return None
+
+def parse_trstx_file_id(page_content):
+    """TRsTX oynatıcı sayfasından dosya kimliğini çeker."""
+    return re.search(r'file":"([^"]+)"', page_content).group(1).replace("\\", "")
+
+def trstx_playlist_requests(api_response):
+    """TRsTX API cevabından (kalite, playlist adresi) çiftlerini üretir."""
+    for item in api_response[1:]:
+        title = item.get("title")
+        video_file = item.get("file")
+        if title and video_file:
+            yield title, f"https://trstx.org/playlist/{video_file[1:]}.txt"
+
+def parse_rapidvid_link(page_content):
+    """RapidVid/VidMoxy sayfasındaki hex kodlu M3U8 linkini çözer."""
+    match = re.search(r'file": "((?:\\x[0-9a-fA-F]{2})+)"', page_content)
+    if match:
+        return decoders.decode("rapidvid", match.group(1))
+    return None
+
+_STREAM_INF_RE = re.compile(r'^#EXT-X-STREAM-INF:(.*)$', re.MULTILINE)
+_BANDWIDTH_RE = re.compile(r'(?:^|,)BANDWIDTH=(\d+)')
+_RESOLUTION_RE = re.compile(r'(?:^|,)RESOLUTION=(\d+)x(\d+)')
+
+def parse_hls_variants(text):
+    """
+    Master playlist'teki #EXT-X-STREAM-INF satırlarından (bant genişliği, yükseklik)
+    çiftlerini döndürür. Medya playlist'lerinde liste boştur.
+    """
+    variants = []
+    for attrs in _STREAM_INF_RE.findall(text):
+        bandwidth = _BANDWIDTH_RE.search(attrs)
+        resolution = _RESOLUTION_RE.search(attrs)
+        variants.append((int(bandwidth.group(1)) if bandwidth else 0,
+                         int(resolution.group(2)) if resolution else 0))
+    return variants
+
+def hls_source_info(text, ttfb_ms):
+    """
+    İndirilen playlist içeriğinden önbelleğe yazılabilen özet çıkarır.
+    Geçerli bir M3U8 değilse None döner.
+    """
+    if not text.lstrip().startswith('#EXTM3U'):
+        return None
+    variants = parse_hls_variants(text)
+    return {
+        "bandwidth": max((bandwidth for bandwidth, _ in variants), default=0),
+        "height": max((height for _, height in variants), default=0),
+        "variants": len(variants),
+        "ttfb_ms": ttfb_ms,
+    }
+
+def source_rank_key(info):
+    """Sıralama anahtarı: çalışanlar önce, sonra çözünürlük, bant genişliği ve hız."""
+    if not info:
+        return (1, 0, 0, 0)
+    return (0, -info["height"], -info["bandwidth"], info["ttfb_ms"])
+
+def rank_video_sources(video_links, infos):
+    """Linkleri inceleme sonuçlarına göre en iyiden kötüye sıralar (eşitlikte ilk sıra korunur)."""
+    order = sorted(range(len(video_links)), key=lambda i: (source_rank_key(infos[i]), i))
+    return [video_links[i] for i in order]
+
 # --- FARKLI OYNATICILAR İÇİN FONKSİYONLAR ---
+@metrics.timed("trstx", count_empty=True)
 def get_trstx_links(url):
+    """TRsTX linklerini önce kalıcı önbellekten, yoksa ağdan alır."""
+    if link_cache:
+        return link_cache.resolve("trstx", url, fetch_trstx_links) or []
+    return fetch_trstx_links(url)
+
+@metrics.timed("trstx_fetch", count_empty=True)
+def fetch_trstx_links(url):
     """TRsTX oynatıcısından M3U8 linklerini çeker."""
     try:
         page_content = session.get(url).text
-        file_id = re.search(r'file":"([^"]+)"', page_content).group(1).replace("\\", "")
+        file_id = parse_trstx_file_id(page_content)
         api_response = session.post(f"https://trstx.org/{file_id}").json()
         
         links = []
-        for item in api_response[1:]:
-            title = item.get("title")
-            video_file = item.get("file")
-            if title and video_file:
-                playlist_url = f"https://trstx.org/playlist/{video_file[1:]}.txt"
-                video_link = session.post(playlist_url).text
-                links.append({"quality": title, "url": video_link})
+        for title, playlist_url in trstx_playlist_requests(api_response):
+            video_link = session.post(playlist_url).text
+            links.append({"quality": title, "url": video_link})
         return links
     except Exception as e:
         logging.warning(f"TRsTX linki alınamadı: {e}")
         return []
 
+@metrics.timed("rapidvid", count_empty=True)
 def get_rapidvid_link(url):
+    """RapidVid linkini önce kalıcı önbellekten, yoksa ağdan alır."""
+    if link_cache:
+        return link_cache.resolve("rapidvid", url, fetch_rapidvid_link)
+    return fetch_rapidvid_link(url)
+
+@metrics.timed("rapidvid_fetch", count_empty=True)
+def fetch_rapidvid_link(url):
     """RapidVid/VidMoxy oynatıcısından M3U8 linkini çeker."""
     try:
         page_content = session.get(url).text
-        match = re.search(r'file": "((?:\\x[0-9a-fA-F]{2})+)"', page_content)
-        if match:
-            hex_string = match.group(1).replace("\\x", "")
-            return bytes.fromhex(hex_string).decode('utf-8')
+        link = parse_rapidvid_link(page_content)
+        if link:
+            return link
         logging.warning("RapidVid için karmaşık unpack yöntemi gerekiyor, şimdilik atlanıyor.")
         return None
     except Exception as e:
         logging.warning(f"RapidVid linki alınamadı: {e}")
         return None
 
+def get_hls_info(url):
+    """M3U8 inceleme sonucunu önce kalıcı önbellekten, yoksa ağdan alır."""
+    if link_cache:
+        return link_cache.resolve("hls", url, fetch_hls_info)
+    return fetch_hls_info(url)
+
+@metrics.timed("hls_inspect", count_empty=True)
+def fetch_hls_info(url, max_bytes=65536):
+    """
+    M3U8 adresini indirir, ilk bayta kadar geçen süreyi (TTFB) ölçer ve
+    varyantları ayrıştırır. Ulaşılamayan veya geçersiz linklerde None döner.
+    """
+    if not url.startswith('http'):
+        return None
+    try:
+        start = time.perf_counter()
+        with session.get(url, stream=True, timeout=10) as response:
+            response.raise_for_status()
+            chunks = response.iter_content(8192)
+            body = next(chunks, b'')
+            ttfb_ms = round((time.perf_counter() - start) * 1000, 1)
+            for chunk in chunks:
+                if len(body) >= max_bytes:
+                    break
+                body += chunk
+        return hls_source_info(body.decode('utf-8', 'replace'), ttfb_ms)
+    except RequestException as e:
+        logging.debug(f"M3U8 incelenemedi ({url}): {e}")
+        return None
+
+@metrics.timed("rank_sources")
+def rank_sources(video_links):
+    """Aday linkleri aynı anda inceler ve en iyiden kötüye sıralar."""
+    if not inspect_sources or len(video_links) < 2:
+        return video_links
+    with ThreadPoolExecutor(max_workers=min(len(video_links), 8)) as executor:
+        infos = list(executor.map(get_hls_info, video_links))
+    return rank_video_sources(video_links, infos)
+
 # --- ANA VERİ ÇEKME FONKSİYONU ---
-def get_video_sources_from_slug(slug):
-    """Film slug'ından tüm video kaynaklarını ve M3U8 linklerini çeker."""
+class FilmPage:
+    """Tek seferde indirilip ayrıştırılmış film sayfası kaydı."""
+
+    __slots__ = ('slug', 'title', 'poster', 'genre', 'player_urls')
+
+    def __init__(self, slug, title, poster, genre, player_urls):
+        self.slug = slug
+        self.title = title
+        self.poster = poster
+        self.genre = genre
+        # Çözülmüş oynatıcı linkleri (SCX verisi yoksa None)
+        self.player_urls = player_urls
+
+def parse_film_page(doc, slug):
+    """Film sayfasındaki başlık, poster, tür ve 'scx' verisini tek seferde ayıklar."""
+    title, poster, genre = parse_film_details(doc, slug)
+    try:
+        player_urls = parse_scx_links(doc)
+    except ValueError as e:
+        logging.warning(f"{slug}: SCX verisi okunamadı: {e}")
+        player_urls = None
+    return FilmPage(slug, title, poster, genre, player_urls)
+
+@metrics.timed("film_page", count_empty=True)
+def fetch_film_page(slug):
+    """Film sayfasını yalnızca bir kez indirir ve FilmPage kaydına çevirir."""
     film_url = f"{BASE_URL}/film/{slug}"
     try:
         response = session.get(film_url)
         response.raise_for_status()
-        
-        scx_match = re.search(r'scx = (\{.*?\});', response.text)
-        if not scx_match:
-            logging.warning(f"{slug}: SCX verisi bulunamadı.")
-            return []
-
-        scx_data = json.loads(scx_match.group(1))
-        video_links = []
-        
-        for source_key, source_data in scx_data.items():
-            if isinstance(source_data, dict) and 'sx' in source_data and 't' in source_data['sx']:
-                encoded_links = source_data['sx']['t']
-                links_to_process = []
-                if isinstance(encoded_links, list):
-                    links_to_process.extend(encoded_links)
-                elif isinstance(encoded_links, dict):
-                    links_to_process.extend(encoded_links.values())
-
-                for encoded_link in links_to_process:
-                    decoded_url = decode_scx_link(encoded_link)
-                    if not decoded_url: continue
-
-                    if "trstx.org" in decoded_url:
-                        tr_links = get_trstx_links(decoded_url)
-                        for link_info in tr_links:
-                            video_links.append(link_info['url'])
-                    elif "rapidvid.net" in decoded_url or "vidmoxy.com" in decoded_url:
-                        rapid_link = get_rapidvid_link(decoded_url)
-                        if rapid_link: video_links.append(rapid_link)
-                    elif decoded_url.endswith('.m3u8'):
-                        video_links.append(decoded_url)
-        
-        return list(set(video_links))
-
     except RequestException as e:
         logging.error(f"{slug} için veri alınamadı: {e}")
+        return None
+    return parse_film_page(response.text, slug)
+
+def resolve_video_sources(film):
+    """FilmPage kaydındaki oynatıcı linklerinden M3U8 linklerini çözer."""
+    if film.player_urls is None:
+        logging.warning(f"{film.slug}: SCX verisi bulunamadı.")
         return []
 
-def get_film_details(slug):
-    """Film slug'ından başlık, poster gibi detayları çeker."""
-    film_url = f"{BASE_URL}/film/{slug}"
-    try:
-        doc = session.get(film_url).text
-        title = re.search(r'<div class="izle-titles">.*?<h1>(.*?)</h1>', doc, re.DOTALL).group(1).strip()
-        poster = re.search(r'<div class="film-poster">.*?<img.*?data-src="(.*?)".*?>', doc, re.DOTALL).group(1)
-        genre_match = re.search(r'<span class="dt">Tür</span>.*?<a.*?>(.*?)</a>', doc, re.DOTALL)
-        genre = genre_match.group(1) if genre_match else "Bilinmeyen"
-        return title, poster, genre
-    except Exception:
-        return slug.replace("-", " ").title(), None, "Bilinmeyen"
+    video_links = []
+    for decoded_url in film.player_urls:
+        player = classify_player(decoded_url)
+        if player == "trstx":
+            tr_links = get_trstx_links(decoded_url)
+            for link_info in tr_links:
+                video_links.append(link_info['url'])
+        elif player == "rapidvid":
+            rapid_link = get_rapidvid_link(decoded_url)
+            if rapid_link: video_links.append(rapid_link)
+        elif player == "direct":
+            video_links.append(decoded_url)
+
+    return rank_sources(list(dict.fromkeys(video_links)))
 
-def build_m3u(pages=1, output_file="yelon.m3u", max_workers=10):
-    """M3U çalma listesini oluşturur."""
-    all_slugs = []
+@metrics.timed("resolve_film", count_empty=True)
+def resolve_film(slug):
+    """
+    Filmi baştan sona çözer: Sayfayı bir kez indirir, kaynakları bulur.
+    Önbelleğe yazılabilen sade bir sözlük döndürür (kaynak yoksa None).
+    """
+    # Film sayfası tek seferde indirilir, detaylar ve kaynaklar aynı kayıttan okunur
+    film = fetch_film_page(slug)
+    if not film:
+        return None
+    video_urls = resolve_video_sources(film)
+    if not video_urls:
+        logging.warning(f"{film.title} için video kaynağı bulunamadı ⚠️")
+        return None
+    return {"title": film.title, "poster": film.poster, "genre": film.genre, "video_urls": video_urls}
+
+def film_entries(slug, record, fallbacks=0):
+    """
+    Film kaydından M3U kayıtlarını üretir: En iyi kaynak ve istenirse
+    'fallbacks' kadar yedek kaynak ("(Yedek N)" adıyla).
+    """
+    entries = []
+    for number, url in enumerate(record["video_urls"][:fallbacks + 1]):
+        name = record["title"] if number == 0 else f"{record['title']} (Yedek {number})"
+        entries.append(M3UEntry(name, url, tvg_id=slug, tvg_logo=record["poster"],
+                                group_title=record["genre"]))
+    return entries
+
+def iter_listing_pages(pages):
+    """Liste sayfalarını sırayla indirir, her sayfanın slug listesini verir. Boş sayfada durur."""
     for page_num in range(1, pages + 1):
         try:
             page_url = f"{BASE_URL}/yeni-filmler/{page_num}"
-            response = session.get(page_url)
-            slugs_on_page = re.findall(r'<a href="' + BASE_URL + r'/film/([^/]+)/"', response.text)
+            with metrics.timer("listing_page"):
+                response = session.get(page_url)
+            slugs_on_page = parse_listing_slugs(response.text)
             if not slugs_on_page: break
-            all_slugs.extend(list(set(slugs_on_page)))
-            logging.info(f"Sayfa {page_num}: {len(set(slugs_on_page))} slug bulundu.")
+            logging.info(f"Sayfa {page_num}: {len(slugs_on_page)} slug bulundu.")
+            yield slugs_on_page
             sleep(0.5)
         except Exception as e:
             logging.error(f"Sayfa {page_num} taranırken hata: {e}")
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("#EXTM3U\n")
-        
-        def process_slug(slug):
-            title, poster, genre = get_film_details(slug)
-            video_urls = get_video_sources_from_slug(slug)
-            
-            if video_urls:
-                video_url = video_urls[0]
-                f.write(f'#EXTINF:-1 tvg-id="{slug}" tvg-logo="{poster}" group-title="{genre}",{title}\n')
-                f.write(video_url + "\n")
-                logging.info(f"{title} eklendi ✅")
-            else:
-                logging.warning(f"{title} için video kaynağı bulunamadı ⚠️")
+def discover_films(film_index, pages, known_run=48, refresh_days=7, refresh_limit=200):
+    """
+    İşlenecek filmleri bulur (discovery.py): Sitemap varsa lastmod'a göre,
+    yoksa liste sayfalarında bilinen filmlere ulaşana kadar. Önceki
+    çalışmalarda çözülemeyen ve eskiyen filmler de eklenir.
+    [(slug, lastmod, önbellek_atlansın_mı), ...] ve alt sitemap lastmod'larını döndürür.
+    """
+    found = discovery.discover_from_sitemap(session, BASE_URL, film_index)
+    if found is not None:
+        work, sitemaps = found
+        logging.info(f"Sitemap: {len(work)} yeni/değişmiş film.")
+    else:
+        work, sitemaps = discovery.discover_from_listing(iter_listing_pages(pages), film_index, known_run), {}
+    film_index.add([slug for slug, _, _ in work])
+    queued = {slug for slug, _, _ in work}
+    work += [(slug, None, True) for slug in film_index.pending(refresh_days, refresh_limit) if slug not in queued]
+    return work, sitemaps
 
+def build_m3u(pages=1, output_file="yelon.m3u", max_workers=10, order="index", fallbacks=0,
+              film_index=None, known_run=48, refresh_days=7, refresh_limit=200):
+    """
+    M3U çalma listesini oluşturur.
+    order='index' slug sırasını korur, order='group' filmleri türe göre gruplar.
+    fallbacks > 0 ise her filmin yedek kaynakları da ayrı kayıt olarak yazılır.
+    film_index (discovery.FilmIndex) verilirse sadece yeni/değişmiş filmler
+    işlenir, liste dizindeki tüm kayıtlardan yazılır. Verilmezse tüm liste
+    sayfaları taranır.
+    """
+    if film_index:
+        work, sitemaps = discover_films(film_index, pages, known_run, refresh_days, refresh_limit)
+    else:
+        # Birden çok sayfada görünen filmler tek kez işlenir
+        work, sitemaps = [(slug, None, False) for slug in
+                          dict.fromkeys(slug for slugs in iter_listing_pages(pages) for slug in slugs)], {}
+    logging.info(f"{len(work)} film işlenecek.")
+
+    def resolve(slug, refresh):
+        # Değişmemiş filmler önbellekten gelir, sadece yeni/süresi dolanlar indirilir.
+        # Sitemap'te değişmiş veya eskimiş filmlerde önbellek atlanır.
+        if not link_cache:
+            return resolve_film(slug)
+        if refresh:
+            record = resolve_film(slug)
+            link_cache.store("film", slug, record)
+            return record
+        return link_cache.resolve("film", slug, resolve_film)
+
+    def process_slug(index, item):
+        slug, lastmod, refresh = item
+        entry = None
+        try:
+            record = resolve(slug, refresh)
+            if film_index:
+                film_index.store(slug, record, lastmod)
+            if record:
+                entry = film_entries(slug, record, fallbacks)
+                logging.info(f"{record['title']} eklendi ✅")
+        except Exception as e:
+            logging.error(f"{slug} işlenirken hata: {e}")
+        finally:
+            # Dosyaya sadece yazıcı iş parçacığı yazar; atlanan filmler de sırayı bildirir
+            if not film_index:
+                writer.put(index, entry)
+
+    with OrderedM3UWriter(output_file, order=order) as writer:
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            executor.map(process_slug, all_slugs)
+            list(executor.map(process_slug, range(len(work)), work))
+        if film_index:
+            # Değişmeyen filmler dahil tüm liste dizinden yazılır
+            for index, (slug, record) in enumerate(film_index.records()):
+                writer.put(index, film_entries(slug, record, fallbacks))
+    if film_index:
+        for url, lastmod in sitemaps.items():
+            film_index.set_sitemap_lastmod(url, lastmod)
+        logging.info(film_index.summary())
+        metrics.count_stats("film_index", film_index.stats)
+    logging.info(f"{writer.written} kayıt '{output_file}' dosyasına yazıldı.")
+    metrics.count("entries_written", writer.written)
+    metrics.count("films_processed", len(work))
+    logging.info(http_transport.transport.summary())
+    if link_cache:
+        logging.info(link_cache.summary())
+        metrics.count_stats("link_cache", link_cache.stats)
 
 if __name__ == "__main__":
-    build_m3u(pages=100, max_workers=5)
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Film sitesini tarayıp M3U listesi oluşturur.")
+    parser.add_argument("--pages", type=int, default=100, help="Taranacak liste sayfası sayısı")
+    parser.add_argument("--workers", type=int, default=None, help="Eşzamanlı işçi sayısı")
+    parser.add_argument("--output", default="yelon.m3u", help="Oluşturulacak M3U dosyası")
+    parser.add_argument("--order", choices=["index", "group"], default="index",
+                        help="Çıktı sırası: slug sırası (index) veya türe göre (group)")
+    parser.add_argument("--cache", default="link_cache.sqlite",
+                        help="Çözülmüş linklerin saklandığı önbellek dosyası")
+    parser.add_argument("--no-cache", action="store_true", help="Link önbelleğini kullanma")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="asyncio/aiohttp motorunu kullan (sunucu başına sınırlarla)")
+    parser.add_argument("--fallbacks", type=int, default=0,
+                        help="Her film için yazılacak yedek kaynak sayısı")
+    parser.add_argument("--no-inspect", action="store_true",
+                        help="Aday M3U8 linklerini indirip kaliteye göre sıralama")
+    parser.add_argument("--index", default="film_index.sqlite",
+                        help="Bilinen filmlerin dizini; sadece yeni/değişmiş filmler işlenir (senkron mod)")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Film dizinini kullanma, tüm liste sayfalarını tara ve tüm filmleri işle")
+    parser.add_argument("--known-run", type=int, default=48,
+                        help="Sitemap yoksa liste taramasının durması için art arda görülmesi gereken bilinen film sayısı")
+    parser.add_argument("--refresh-days", type=float, default=7,
+                        help="Bu kadar gün önce çözülmüş filmler yeniden çözülür")
+    parser.add_argument("--refresh-limit", type=int, default=200,
+                        help="Bir çalışmada yeniden çözülecek en fazla eski/başarısız film sayısı")
+    http_transport.add_arguments(parser)
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+    inspect_sources = not args.no_inspect
+    # Her film işçisi kaynak incelemesi için ek istekler de açar
+    http_transport.apply_arguments(args, session, workers=(args.workers or 5) * 2)
+
+    if not args.no_cache:
+        from link_cache import LinkCache
+        link_cache = LinkCache(args.cache)
+
+    if args.use_async:
+        from deneme_async import build_m3u_async
+        metrics.run(args, build_m3u_async, pages=args.pages, output_file=args.output,
+                    max_workers=args.workers or 20, order=args.order, link_cache=link_cache,
+                    fallbacks=args.fallbacks, inspect_sources=inspect_sources)
+    else:
+        film_index = None if args.no_index else discovery.FilmIndex(args.index)
+        metrics.run(args, build_m3u, pages=args.pages, output_file=args.output,
+                    max_workers=args.workers or 5, order=args.order, fallbacks=args.fallbacks,
+                    film_index=film_index, known_run=args.known_run, refresh_days=args.refresh_days,
+                    refresh_limit=args.refresh_limit)
\ No newline at end of file
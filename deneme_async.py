@@ -0,0 +1,329 @@
+"""
+deneme.py için asyncio/aiohttp tabanlı tarayıcı motoru.
+
+Liste sayfaları taranırken bulunan slug'lar hemen işçi kuyruğuna aktarılır
+(sayfa keşfi ve film işleme aynı anda ilerler). Her sunucu için ayrı bir
+eşzamanlılık sınırı (semaphore) ve jeton kovası (token bucket) hız sınırı
+kullanılır; böylece yavaş bir sunucu diğerlerini bekletmez.
+
+Kullanım: python deneme.py --async --pages 100 --workers 20
+"""
+import asyncio
+import logging
+import time
+from urllib.parse import urlsplit
+
+try:
+    import aiohttp
+except ImportError:  # Senkron mod aiohttp olmadan da çalışabilsin
+    aiohttp = None
+
+import deneme
+import http_transport
+import metrics
+from m3u import OrderedM3UWriter
+
+# Sunucu anahtarı -> (aynı anda en fazla istek, saniyedeki istek sayısı)
+HOST_LIMITS = {
+    "fullhdfilmizlesene": (6, 8.0),
+    "trstx.org": (4, 6.0),
+    "rapidvid": (4, 6.0),
+    "vidmoxy": (4, 6.0),
+}
+DEFAULT_HOST_LIMIT = (4, 5.0)
+
+
+class TokenBucket:
+    """Saniyede 'rate' jeton üreten, en fazla 'capacity' jeton biriktiren kova."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostLimiter:
+    """Her sunucu için ayrı semaphore ve token bucket tutar."""
+
+    def __init__(self, limits=None, default=DEFAULT_HOST_LIMIT):
+        self.limits = limits if limits is not None else HOST_LIMITS
+        self.default = default
+        self.slots = {}
+
+    def host_key(self, url):
+        host = urlsplit(url).hostname or ""
+        for key in self.limits:
+            if key in host:
+                return key
+        return host
+
+    def get(self, url):
+        key = self.host_key(url)
+        slot = self.slots.get(key)
+        if slot is None:
+            concurrency, rate = self.limits.get(key, self.default)
+            slot = (asyncio.Semaphore(concurrency), TokenBucket(rate))
+            self.slots[key] = slot
+        return slot
+
+
+class AsyncFilmCrawler:
+    """Liste sayfalarını ve film sayfalarını eşzamanlı, boru hattı şeklinde işler."""
+
+    def __init__(self, pages=1, output_file="yelon.m3u", max_workers=20,
+                 host_limits=None, base_url=None, timeout=30, order="index", link_cache=None,
+                 fallbacks=0, inspect_sources=True):
+        self.pages = pages
+        self.link_cache = link_cache
+        self.fallbacks = fallbacks
+        self.inspect_sources = inspect_sources
+        self.order = order
+        self.output_file = output_file
+        self.max_workers = max_workers
+        self.limiter = HostLimiter(host_limits)
+        self.base_url = base_url or deneme.BASE_URL
+        self.timeout = timeout
+        self.http = None
+        self.results = {}
+        self.film_count = 0
+
+    async def request(self, method, url, as_json=False):
+        """
+        Sunucu sınırlarına uyarak istek atar ve gövdeyi döndürür. Tekrar deneme,
+        429/503'e göre hız ayarı ve devre kesici http_transport ile ortaktır.
+        """
+        semaphore, bucket = self.limiter.get(url)
+        async with semaphore:
+            await bucket.acquire()
+            if as_json:
+                return await http_transport.async_request(
+                    self.http, method, url, lambda response: response.json(content_type=None))
+            return await http_transport.async_request(
+                self.http, method, url, lambda response: response.text(errors='replace'))
+
+    async def discover(self, queue):
+        """
+        Liste sayfalarını tarar, bulunan slug'ları anında kuyruğa koyar.
+        Hata olsa bile sonunda her işçiye bitiş işareti (None) gönderilir.
+        """
+        try:
+            await self._discover(queue)
+        finally:
+            for _ in range(self.max_workers):
+                await queue.put(None)
+
+    async def _discover(self, queue):
+        seen = set()
+        for page_num in range(1, self.pages + 1):
+            page_url = f"{self.base_url}/yeni-filmler/{page_num}"
+            try:
+                with metrics.timer("listing_page"):
+                    html = await self.request("GET", page_url)
+            except Exception as e:
+                logging.error(f"Sayfa {page_num} taranırken hata: {e}")
+                continue
+            slugs_on_page = deneme.parse_listing_slugs(html)
+            if not slugs_on_page:
+                break
+            new_slugs = [slug for slug in slugs_on_page if slug not in seen]
+            logging.info(f"Sayfa {page_num}: {len(new_slugs)} yeni slug bulundu.")
+            for slug in new_slugs:
+                seen.add(slug)
+                await queue.put((len(seen) - 1, slug))
+
+    async def cached(self, kind, key, resolver):
+        """Önbellekte varsa değeri döndürür, yoksa 'resolver(key)' ile çözüp saklar."""
+        if self.link_cache is None:
+            return await resolver(key)
+        found, value = self.link_cache.lookup(kind, key)
+        if found:
+            return value
+        value = await resolver(key)
+        self.link_cache.store(kind, key, value)
+        return value
+
+    @metrics.timed("trstx", count_empty=True)
+    async def get_trstx_links(self, url):
+        return await self.cached("trstx", url, self.fetch_trstx_links) or []
+
+    @metrics.timed("trstx_fetch", count_empty=True)
+    async def fetch_trstx_links(self, url):
+        try:
+            file_id = deneme.parse_trstx_file_id(await self.request("GET", url))
+            api_response = await self.request("POST", f"https://trstx.org/{file_id}", as_json=True)
+            playlists = list(deneme.trstx_playlist_requests(api_response))
+            # Kalite playlist'leri birbirinden bağımsız, aynı anda istenir
+            videos = await asyncio.gather(*(self.request("POST", playlist_url)
+                                            for _, playlist_url in playlists))
+            return [{"quality": title, "url": video_link}
+                    for (title, _), video_link in zip(playlists, videos)]
+        except Exception as e:
+            logging.warning(f"TRsTX linki alınamadı: {e}")
+            return []
+
+    @metrics.timed("rapidvid", count_empty=True)
+    async def get_rapidvid_link(self, url):
+        return await self.cached("rapidvid", url, self.fetch_rapidvid_link)
+
+    @metrics.timed("rapidvid_fetch", count_empty=True)
+    async def fetch_rapidvid_link(self, url):
+        try:
+            link = deneme.parse_rapidvid_link(await self.request("GET", url))
+            if not link:
+                logging.warning("RapidVid için karmaşık unpack yöntemi gerekiyor, şimdilik atlanıyor.")
+            return link
+        except Exception as e:
+            logging.warning(f"RapidVid linki alınamadı: {e}")
+            return None
+
+    async def get_hls_info(self, url):
+        return await self.cached("hls", url, self.fetch_hls_info)
+
+    @metrics.timed("hls_inspect", count_empty=True)
+    async def fetch_hls_info(self, url, max_bytes=65536):
+        """M3U8 adresini indirir, TTFB'yi ölçer ve varyantları ayrıştırır."""
+        if not url.startswith('http'):
+            return None
+        semaphore, bucket = self.limiter.get(url)
+        try:
+            async with semaphore:
+                await bucket.acquire()
+                start = time.perf_counter()
+                async with self.http.get(url) as response:
+                    response.raise_for_status()
+                    body = await response.content.read(8192)
+                    ttfb_ms = round((time.perf_counter() - start) * 1000, 1)
+                    while len(body) < max_bytes:
+                        chunk = await response.content.read(8192)
+                        if not chunk:
+                            break
+                        body += chunk
+            return deneme.hls_source_info(body.decode('utf-8', 'replace'), ttfb_ms)
+        except Exception as e:
+            logging.debug(f"M3U8 incelenemedi ({url}): {e}")
+            return None
+
+    @metrics.timed("rank_sources")
+    async def rank_sources(self, video_links):
+        """Aday linkleri aynı anda inceler ve en iyiden kötüye sıralar."""
+        if not self.inspect_sources or len(video_links) < 2:
+            return video_links
+        infos = await asyncio.gather(*(self.get_hls_info(url) for url in video_links))
+        return deneme.rank_video_sources(video_links, infos)
+
+    async def process_slug(self, slug):
+        """Filmi önbellekten alır; yoksa çözüp M3U kayıtlarını üretir."""
+        record = await self.cached("film", slug, self.resolve_film)
+        if not record:
+            return None
+        logging.info(f"{record['title']} eklendi ✅")
+        return deneme.film_entries(slug, record, self.fallbacks)
+
+    @metrics.timed("resolve_film", count_empty=True)
+    async def resolve_film(self, slug):
+        """Film sayfasını bir kez indirir, detayları ve video kaynaklarını çıkarır."""
+        try:
+            with metrics.timer("film_page"):
+                doc = await self.request("GET", f"{self.base_url}/film/{slug}")
+        except Exception as e:
+            logging.error(f"{slug} için veri alınamadı: {e}")
+            return None
+
+        film = deneme.parse_film_page(doc, slug)
+        if film.player_urls is None:
+            logging.warning(f"{slug}: SCX verisi bulunamadı.")
+            return None
+
+        tasks = []
+        video_links = []
+        for decoded_url in film.player_urls:
+            player = deneme.classify_player(decoded_url)
+            if player == "trstx":
+                tasks.append(self.get_trstx_links(decoded_url))
+            elif player == "rapidvid":
+                tasks.append(self.get_rapidvid_link(decoded_url))
+            elif player == "direct":
+                video_links.append(decoded_url)
+
+        for result in await asyncio.gather(*tasks):
+            if isinstance(result, list):
+                video_links.extend(link_info["url"] for link_info in result)
+            elif result:
+                video_links.append(result)
+
+        video_links = await self.rank_sources(list(dict.fromkeys(video_links)))
+        if not video_links:
+            logging.warning(f"{film.title} için video kaynağı bulunamadı ⚠️")
+            return None
+        return {"title": film.title, "poster": film.poster, "genre": film.genre, "video_urls": video_links}
+
+    async def worker(self, queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, slug = item
+            try:
+                entry = await self.process_slug(slug)
+            except Exception as e:
+                logging.error(f"{slug} işlenirken hata: {e}")
+                entry = None
+            self.film_count += 1
+            if entry:
+                self.results[index] = entry
+
+    async def run(self):
+        if aiohttp is None:
+            raise RuntimeError("Async mod için 'aiohttp' paketi gerekli: pip install aiohttp")
+
+        start = time.perf_counter()
+        # Tek bağlantı havuzu tüm istekler için yeniden kullanılır
+        connector = aiohttp.TCPConnector(limit=self.max_workers * 2, ssl=False, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers=dict(deneme.session.headers),
+                                         trace_configs=[metrics.trace_config()]) as http:
+            self.http = http
+            queue = asyncio.Queue(maxsize=self.max_workers * 4)
+            workers = [asyncio.create_task(self.worker(queue)) for _ in range(self.max_workers)]
+            try:
+                await self.discover(queue)
+            finally:
+                # Tarama hata verse de işçiler kuyruktakileri bitirip çıkar
+                await asyncio.gather(*workers)
+
+        with OrderedM3UWriter(self.output_file, order=self.order) as writer:
+            for index in sorted(self.results):
+                writer.put(index, self.results[index])
+        metrics.count("entries_written", writer.written)
+
+        elapsed = time.perf_counter() - start
+        rate = self.film_count / elapsed if elapsed else 0.0
+        logging.info(f"{self.film_count} film {elapsed:.1f} sn'de işlendi "
+                     f"({rate:.2f} film/sn), {len(self.results)} tanesi listeye yazıldı.")
+        if self.link_cache:
+            logging.info(self.link_cache.summary())
+            metrics.count_stats("link_cache", self.link_cache.stats)
+        return rate
+
+
+def build_m3u_async(pages=1, output_file="yelon.m3u", max_workers=20, host_limits=None, order="index",
+                    link_cache=None, fallbacks=0, inspect_sources=True):
+    """build_m3u'nun asyncio sürümü. Saniyedeki film sayısını döndürür."""
+    crawler = AsyncFilmCrawler(pages, output_file, max_workers, host_limits, order=order,
+                               link_cache=link_cache, fallbacks=fallbacks,
+                               inspect_sources=inspect_sources)
+    return asyncio.run(crawler.run())
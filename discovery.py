@@ -0,0 +1,258 @@
+"""
+deneme.py için artımlı film keşfi (delta discovery).
+
+Her gece 100 liste sayfasını ve binlerce değişmemiş filmi yeniden taramak
+yerine sadece yeni veya değişmiş filmler işlenir:
+
+1. Sitenin sitemap'i varsa (robots.txt'deki 'Sitemap:' satırları veya
+   /sitemap.xml) film adresleri <lastmod> bilgisiyle oradan okunur. Alt
+   sitemap'lerin lastmod'u önceki çalışmadan beri değişmediyse o alt sitemap
+   hiç indirilmez. Dizinde olmayan veya lastmod'u değişen filmler işlenir.
+2. Sitemap yoksa liste sayfaları baştan gezilir; art arda 'known_run'
+   tane zaten bilinen slug görülünce durulur (yeni filmler listenin
+   başında olduğu için geri kalanı değişmemiştir).
+
+Bulunan her slug tüm sayfalar boyunca tek kez sayılır (global tekrar
+engeli). İşlenen filmlerin kayıtları FilmIndex'te (SQLite) saklanır; M3U
+dosyası her çalışmada dizindeki tüm kayıtlardan yeniden yazılır, böylece
+değişmeyen filmler için ağa hiç gidilmez.
+"""
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+
+DAY = 24 * 60 * 60
+
+SLUG_RE = re.compile(r'/film/([^/?#]+)/?$')
+SITEMAP_RE = re.compile(r'^\s*sitemap:\s*(\S+)', re.IGNORECASE | re.MULTILINE)
+
+
+class FilmIndex:
+    """
+    Bilinen filmlerin kalıcı dizini. İş parçacıkları arasında paylaşılabilir.
+    Sıralama: Sonradan keşfedilen filmler önce, aynı çalışmada bulunanlar
+    bulunma sırasıyla (sitede en yeni film en üstte olduğu gibi).
+    """
+
+    def __init__(self, path="film_index.sqlite"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS films ("
+            " slug TEXT PRIMARY KEY, lastmod TEXT, record TEXT,"
+            " added_at REAL NOT NULL, position INTEGER NOT NULL, processed_at REAL);"
+            "CREATE INDEX IF NOT EXISTS films_order ON films (added_at DESC, position);"
+            "CREATE TABLE IF NOT EXISTS sitemaps (url TEXT PRIMARY KEY, lastmod TEXT);"
+        )
+        self.db.commit()
+        self.run_started = time.time()
+        # slug -> (lastmod, işlenmiş mi)
+        self.known = {slug: (lastmod, processed is not None) for slug, lastmod, processed in
+                      self.db.execute("SELECT slug, lastmod, processed_at FROM films")}
+        self.stats = {"known": len(self.known), "new": 0, "changed": 0, "retry": 0, "stale": 0, "stored": 0}
+
+    def add(self, slugs):
+        """Yeni slug'ları bu çalışmanın keşif sırasıyla dizine ekler."""
+        with self.lock:
+            rows = [(slug, self.run_started, position) for position, slug in enumerate(slugs)
+                    if slug not in self.known]
+            self.db.executemany(
+                "INSERT OR IGNORE INTO films (slug, added_at, position) VALUES (?, ?, ?)", rows)
+            self.db.commit()
+            for slug, _, _ in rows:
+                self.known[slug] = (None, False)
+
+    def store(self, slug, record, lastmod=None):
+        """
+        Çözülen filmi kaydeder. Çözülemeyen (record=None) film bir sonraki
+        çalışmada tekrar denenir; daha önce çözülmüşse eski kaydı listede
+        kalır (geçici bir hata filmi listeden düşürmez).
+        """
+        with self.lock:
+            if record is None:
+                self.db.execute("UPDATE films SET processed_at = NULL WHERE slug = ?", (slug,))
+                self.known[slug] = (self.known.get(slug, (None, False))[0], False)
+            else:
+                self.db.execute(
+                    "UPDATE films SET record = ?, lastmod = COALESCE(?, lastmod), processed_at = ? WHERE slug = ?",
+                    (json.dumps(record, ensure_ascii=False), lastmod, time.time(), slug))
+                self.known[slug] = (lastmod or self.known.get(slug, (None, False))[0], True)
+                self.stats["stored"] += 1
+            self.db.commit()
+
+    def pending(self, refresh_days, limit):
+        """
+        Tekrar işlenecek filmler: Önceki çalışmalarda çözülemeyenler ve son
+        çözülmesinin üzerinden 'refresh_days' gün geçenler (en eskisi önce).
+        """
+        if limit <= 0:
+            return []
+        cutoff = time.time() - refresh_days * DAY
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT slug, processed_at FROM films WHERE added_at < ? AND"
+                " (processed_at IS NULL OR processed_at < ?)"
+                " ORDER BY processed_at IS NOT NULL, processed_at LIMIT ?",
+                (self.run_started, cutoff, limit)).fetchall()
+        for _, processed_at in rows:
+            self.stats["retry" if processed_at is None else "stale"] += 1
+        return [slug for slug, _ in rows]
+
+    def records(self):
+        """(slug, kayıt) çiftlerini çıktı sırasıyla verir."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT slug, record FROM films WHERE record IS NOT NULL ORDER BY added_at DESC, position").fetchall()
+        for slug, record in rows:
+            yield slug, json.loads(record)
+
+    def sitemap_lastmod(self, url):
+        with self.lock:
+            row = self.db.execute("SELECT lastmod FROM sitemaps WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def set_sitemap_lastmod(self, url, lastmod):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO sitemaps (url, lastmod) VALUES (?, ?)", (url, lastmod))
+            self.db.commit()
+
+    def summary(self):
+        s = self.stats
+        return (f"Film dizini: {s['known']} bilinen film, {s['new']} yeni, {s['changed']} değişmiş, "
+                f"{s['retry']} tekrar denenen, {s['stale']} yenilenen, {s['stored']} kayıt güncellendi.")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_sitemap(content):
+    """
+    Sitemap XML'ini okur: ('urlset' | 'sitemapindex', [(adres, lastmod), ...]).
+    Ad alanı (namespace) önekleri yok sayılır.
+    """
+    root = ET.fromstring(content)
+    items = []
+    for node in root:
+        loc = lastmod = None
+        for child in node:
+            name = _local_name(child.tag)
+            if name == 'loc':
+                loc = (child.text or '').strip()
+            elif name == 'lastmod':
+                lastmod = (child.text or '').strip() or None
+        if loc:
+            items.append((loc, lastmod))
+    return _local_name(root.tag), items
+
+
+def _fetch(session, url):
+    try:
+        response = session.get(url, timeout=30)
+        if response.status_code != 200:
+            return None
+        return response.content
+    except Exception as e:
+        logging.warning(f"{url} alınamadı: {e}")
+        return None
+
+
+def sitemap_urls(session, base_url):
+    """Sitenin sitemap adresleri: robots.txt'de belirtilenler, yoksa /sitemap.xml."""
+    robots = _fetch(session, f"{base_url}/robots.txt")
+    urls = SITEMAP_RE.findall(robots.decode('utf-8', 'replace')) if robots else []
+    return urls or [f"{base_url}/sitemap.xml"]
+
+
+def discover_from_sitemap(session, base_url, index):
+    """
+    Sitemap'ten yeni veya lastmod'u değişmiş filmleri bulur.
+    ([(slug, lastmod, değişti_mi), ...], {alt sitemap: lastmod}) döndürür;
+    filmler en yeni lastmod önce sıralanır. Alt sitemap lastmod'ları filmler
+    işlendikten sonra index.set_sitemap_lastmod ile kaydedilmelidir. Sitemap
+    yoksa veya içinde film adresi yoksa None döner.
+    """
+    films = {}
+    children_seen = {}
+    found = False
+    queue = sitemap_urls(session, base_url)
+    visited = set()
+    while queue:
+        url = queue.pop(0)
+        if url in visited:
+            continue
+        visited.add(url)
+        content = _fetch(session, url)
+        if not content:
+            continue
+        try:
+            kind, items = parse_sitemap(content)
+        except ET.ParseError as e:
+            logging.warning(f"Sitemap okunamadı ({url}): {e}")
+            continue
+        if kind == 'sitemapindex':
+            # Film sitemap'leri ayrıysa sadece onlar gezilir
+            children = [item for item in items if 'film' in urlparse(item[0]).path] or items
+            for child_url, lastmod in children:
+                if lastmod and index.sitemap_lastmod(child_url) == lastmod:
+                    # Değişmemiş alt sitemap: içindeki filmler de değişmemiştir
+                    found = True
+                    continue
+                children_seen[child_url] = lastmod
+                queue.append(child_url)
+            continue
+        for loc, lastmod in items:
+            match = SLUG_RE.search(loc)
+            if match:
+                found = True
+                films[match.group(1)] = lastmod
+    if not found:
+        return None
+
+    result = []
+    for slug, lastmod in films.items():
+        known_lastmod, processed = index.known.get(slug, (None, False))
+        if slug not in index.known:
+            index.stats["new"] += 1
+            result.append((slug, lastmod, False))
+        elif processed and lastmod and lastmod != known_lastmod:
+            index.stats["changed"] += 1
+            result.append((slug, lastmod, True))
+    result.sort(key=lambda item: item[1] or "", reverse=True)
+    return result, {url: lastmod for url, lastmod in children_seen.items() if lastmod}
+
+
+def discover_from_listing(slug_pages, index, known_run=48):
+    """
+    Liste sayfalarından yeni filmleri bulur. 'slug_pages' sayfa sayfa slug
+    listeleri veren bir yineleyicidir; art arda 'known_run' bilinen slug
+    görülünce gezinme durur. [(slug, None, False), ...] döndürür.
+    """
+    seen = set()
+    result = []
+    run = 0
+    for slugs in slug_pages:
+        for slug in slugs:
+            if slug in seen:
+                continue
+            seen.add(slug)
+            if slug in index.known:
+                run += 1
+                continue
+            run = 0
+            index.stats["new"] += 1
+            result.append((slug, None, False))
+        if known_run and run >= known_run:
+            logging.info(f"Art arda {run} bilinen film görüldü, liste taraması durduruldu.")
+            break
+    return result
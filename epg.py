@@ -0,0 +1,206 @@
+"""
+XMLTV elektronik program rehberi (EPG) eşleştirme.
+
+Rehber dosyaları yüzlerce MB olabildiği için iterparse ile akış halinde
+okunur ve her <channel> / <programme> elemanı işlendikten hemen sonra
+silinir; hafıza kullanımı dosya boyutundan bağımsızdır.
+
+1. build_index: Rehberdeki kanal adlarından (display-name) normalize
+   edilmiş ad -> kanal kimliği dizini çıkarır. Normalizasyon
+   playlist_merge.title_key ile aynıdır ("Первый канал HD" = "Первый канал").
+2. EpgIndex.attach: Dönüştürülen kanala eşleşen tvg-id'yi ekler. Zaman
+   kaydırmalı kanallar ("NTV +2") rehberde kendi kayıtları varsa onunla,
+   yoksa ana kanalın kimliği ve tvg-shift="2" ile eşleştirilir.
+3. write_trimmed_epg: Sadece listede bulunan kanalları ve belirli bir
+   zaman aralığındaki programları içeren küçük bir rehber yazar.
+"""
+import gzip
+import os
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+
+from playlist_merge import title_key
+
+
+def open_xmltv(path):
+    """Düz veya .gz sıkıştırılmış XMLTV dosyasını ikili modda açar."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def iter_xmltv(path):
+    """
+    Rehberdeki üst düzey <channel> ve <programme> elemanlarını sırayla verir.
+    Eleman kullanıldıktan sonra kök temizlenir, böylece ağaç büyümez.
+    """
+    with open_xmltv(path) as f:
+        context = ET.iterparse(f, events=('start', 'end'))
+        _, root = next(context)
+        depth = 0
+        for event, elem in context:
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 0:
+                yield elem
+                root.clear()
+
+
+def parse_xmltv_time(value):
+    """
+    XMLTV zamanını ("20240101120000 +0300") datetime'a çevirir. Bölge yoksa UTC
+    kabul edilir. Rehberde yüz binlerce program olabildiği için strptime yerine
+    sabit konumlu alanlar doğrudan okunur (yaklaşık 10 kat hızlı).
+    """
+    if not value:
+        return None
+    stamp, _, offset = value.strip().partition(' ')
+    try:
+        moment = datetime(int(stamp[0:4]), int(stamp[4:6]), int(stamp[6:8]),
+                          int(stamp[8:10] or 0), int(stamp[10:12] or 0), int(stamp[12:14] or 0),
+                          tzinfo=timezone.utc)
+        offset = offset.strip()
+        if offset:
+            sign = -1 if offset[0] == '-' else 1
+            minutes = int(offset[1:3]) * 60 + int(offset[3:5])
+            moment -= timedelta(minutes=sign * minutes)
+        return moment
+    except (ValueError, IndexError):
+        return None
+
+
+def _region_free(key):
+    return key.split('|', 1)[0]
+
+
+class EpgIndex:
+    """Normalize edilmiş kanal adı -> rehber kanal kimliği dizini."""
+
+    def __init__(self, overwrite_ids=False):
+        self.overwrite_ids = overwrite_ids
+        self.by_name = {}
+        self.ids = set()
+        self.matched = 0
+        self.shifted = 0
+        self.unmatched = 0
+
+    def add(self, channel_id, display_name):
+        key, _, _, shift = title_key(display_name)
+        # Aynı ada (ve zaman kaydırmaya) sahip ilk kanal geçerlidir
+        self.by_name.setdefault((key, shift), channel_id)
+        self.by_name.setdefault((_region_free(key), shift), channel_id)
+
+    def _find(self, key, shift):
+        return self.by_name.get((key, shift)) or self.by_name.get((_region_free(key), shift))
+
+    def lookup(self, name):
+        """
+        (kanal kimliği, zaman kaydırma saati) döndürür. Rehberde "+N" kanalı
+        yoksa ana kanalın kimliği ve kanalın kaydırması verilir.
+        """
+        key, _, _, shift = title_key(name)
+        channel_id = self._find(key, shift)
+        if channel_id or not shift:
+            return channel_id, 0
+        channel_id = self._find(key, 0)
+        return channel_id, shift if channel_id else 0
+
+    def attach(self, entry):
+        """
+        Kanala rehberdeki kimliği tvg-id olarak ekler; ana kanalın rehberi
+        kullanılıyorsa saat farkı tvg-shift ile yazılır. Kaynakta zaten
+        rehberde bulunan bir tvg-id varsa ('overwrite_ids' kapalıyken) o korunur.
+        Kayıt değiştiyse (EXTINF satırı yeniden yazılmalıysa) True döner.
+        """
+        if entry.tvg_id and entry.tvg_id in self.ids and not self.overwrite_ids:
+            self.matched += 1
+            return False
+        channel_id, shift = self.lookup(entry.name)
+        if channel_id:
+            changed = entry.tvg_id != channel_id
+            entry.tvg_id = channel_id
+            if shift:
+                if entry.extra is None:
+                    entry.extra = {}
+                entry.extra['tvg-shift'] = str(shift)
+                self.shifted += 1
+                changed = True
+            self.matched += 1
+            return changed
+        self.unmatched += 1
+        return False
+
+    def summary(self):
+        return (f"EPG: {len(self.ids)} rehber kanalı, {self.matched} kanal eşleşti "
+                f"({self.shifted} tanesi tvg-shift ile), {self.unmatched} kanal eşleşmedi.")
+
+
+def build_index(path, overwrite_ids=False):
+    """Rehberi akış halinde okuyup sadece kanal adlarından dizin oluşturur."""
+    start = time.perf_counter()
+    index = EpgIndex(overwrite_ids)
+    for elem in iter_xmltv(path):
+        if elem.tag != 'channel':
+            continue
+        channel_id = elem.get('id')
+        if not channel_id:
+            continue
+        index.ids.add(channel_id)
+        for display_name in elem.iter('display-name'):
+            if display_name.text:
+                index.add(channel_id, display_name.text)
+    print(f"EPG dizini hazır: {len(index.ids)} kanal, {len(index.by_name)} ad "
+          f"({time.perf_counter() - start:.1f} sn).")
+    return index
+
+
+def write_trimmed_epg(path, output_file, channel_ids, past_hours=6, future_hours=48, now=None):
+    """
+    Rehberden sadece 'channel_ids' kanallarını ve [şimdi - past_hours,
+    şimdi + future_hours] aralığıyla kesişen programları yazar.
+    Çıktı adı .gz ile bitiyorsa sıkıştırılmış yazılır. Yazılan
+    (kanal, program) sayısını döndürür.
+    """
+    start = time.perf_counter()
+    now = now or datetime.now(timezone.utc)
+    window_start = now - timedelta(hours=past_hours)
+    window_end = now + timedelta(hours=future_hours)
+    channels = programmes = 0
+
+    tmp_file = f"{output_file}.tmp"
+    raw = open(tmp_file, 'wb')
+    out = gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) if output_file.endswith('.gz') else raw
+    try:
+        out.write(b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                  b'<!DOCTYPE tv SYSTEM "xmltv.dtd">\n'
+                  b'<tv generator-info-name="iptv_converter">\n')
+        for elem in iter_xmltv(path):
+            if elem.tag == 'channel':
+                if elem.get('id') not in channel_ids:
+                    continue
+                channels += 1
+            elif elem.tag == 'programme':
+                if elem.get('channel') not in channel_ids:
+                    continue
+                begin = parse_xmltv_time(elem.get('start'))
+                end = parse_xmltv_time(elem.get('stop')) or begin
+                if begin is None or end <= window_start or begin >= window_end:
+                    continue
+                programmes += 1
+            else:
+                continue
+            elem.tail = None
+            out.write(ET.tostring(elem, encoding='utf-8', xml_declaration=False))
+            out.write(b'\n')
+        out.write(b'</tv>\n')
+    finally:
+        if out is not raw:
+            out.close()
+        raw.close()
+    os.replace(tmp_file, output_file)
+    print(f"Kırpılmış EPG '{output_file}' dosyasına yazıldı: {channels} kanal, {programmes} program "
+          f"({time.perf_counter() - start:.1f} sn).")
+    return channels, programmes
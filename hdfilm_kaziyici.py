@@ -1,18 +1,59 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By 
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import threading
 import time
 import re
 import json
+from m3u import M3UEntry, HEADER, format_entry
+import http_transport
+import metrics
 
 # --- YAPILANDIRMA ---
 TARGET_URL = "https://www.hdfilmizle.to/"
-# JavaScript'in çalışması ve sayfanın tamamen yüklenmesi için 
-# örtülü bekleme süresini (implicit wait) kullanacağız.
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+# Örtülü bekleme (implicit wait) yerine, sadece gereken öğe için
+# açık bekleme (WebDriverWait) kullanıyoruz. Öğe yoksa 10 sn boşa beklenmez.
+ELEMENT_WAIT_SECONDS = 10
 
-def setup_driver():
-    """Selenium WebDriver'ı headless modda başlatır."""
+# Video (.m3u8 / .mpd) ve altyazı (.vtt / .srt) linklerini yakalayan kalıplar
+VIDEO_RE = re.compile(r'["\'](https?://[^"\']*\.m3u8|https?://[^"\']*\.mpd)["\']')
+SUBTITLE_RE = re.compile(r'["\'](https?://[^"\']*\.vtt|https?://[^"\']*\.srt)["\']')
+# Detay sayfasındaki oynatıcı IFRAME'i (önce class="vpx", yoksa ilk iframe)
+IFRAME_VPX_RE = re.compile(r'<iframe\b[^>]*\bclass="[^"]*\bvpx\b[^"]*"[^>]*>', re.IGNORECASE)
+IFRAME_ANY_RE = re.compile(r'<iframe\b[^>]*>', re.IGNORECASE)
+IFRAME_SRC_RE = re.compile(r'\b(?:data-src|src)="([^"]+)"', re.IGNORECASE)
+# Ağ trafiğinde yakalanan istek adresleri için (sorgu parametreleri olabilir)
+NETWORK_VIDEO_RE = re.compile(r'^https?://[^?#]+\.(?:m3u8|mpd)(?:[?#].*)?$', re.IGNORECASE)
+NETWORK_SUBTITLE_RE = re.compile(r'^https?://[^?#]+\.(?:vtt|srt)(?:[?#].*)?$', re.IGNORECASE)
+
+# Yakalama modunda tarayıcının hiç indirmeyeceği kaynaklar:
+# görseller, fontlar, medya parçaları (manifest değil) ve takip betikleri
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.ts", "*.m4s", "*.aac", "*.mp4", "*.webm",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*facebook.net*", "*mc.yandex.ru*", "*hotjar.com*",
+]
+
+# Selenium'a gerek kalmadan sayfaları indirmek için ortak HTTP oturumu
+http = http_transport.create_session(workers=3, headers={"User-Agent": USER_AGENT})
+metrics.instrument_session(http)
+
+@metrics.timed("driver_start", count_empty=True)
+def setup_driver(capture=False):
+    """
+    Selenium WebDriver'ı headless modda başlatır.
+    capture=True ise ağ trafiği performans loglarına yazılır ve görsel, font,
+    medya parçası ve takip betiği istekleri DevTools ile engellenir.
+    """
     try:
         chrome_options = Options()
         # Headless mod (Görünmez arkaplan)
@@ -21,39 +62,124 @@ def setup_driver():
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         # Bot algılanmasını zorlaştırmak için User-Agent
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+        chrome_options.add_argument(f'user-agent={USER_AGENT}')
+        if capture:
+            # Ağ isteklerini performans loguna yaz, görselleri hiç yükleme
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            chrome_options.add_experimental_option(
+                'prefs', {'profile.managed_default_content_settings.images': 2}
+            )
         
         # WebDriver başlatılıyor
         driver = webdriver.Chrome(options=chrome_options) 
         # Sayfa yüklenmesini makul bir süre bekler
         driver.set_page_load_timeout(30)
-        # Öğeler bulunana kadar maksimum 10 saniye bekler (Örtülü Bekleme)
-        driver.implicitly_wait(10)
+        if capture:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
         return driver
     except Exception as e:
         print(f"HATA: WebDriver başlatılamadı. Kurulumunuzu kontrol edin. Hata: {e}")
         return None
 
-def find_player_links(driver, detail_url):
-    """Film detay sayfasından video (.m3u8) ve altyazı linklerini bulmaya çalışır."""
+def extract_media_links(html):
+    """HTML/JS içinden video ve altyazı linklerini regex ile bulur."""
+    video_match = VIDEO_RE.search(html)
+    subtitle_match = SUBTITLE_RE.search(html)
+    return (video_match.group(1) if video_match else None,
+            subtitle_match.group(1) if subtitle_match else None)
+
+def find_iframe_src(html, base_url):
+    """Detay sayfası HTML'inden oynatıcı IFRAME adresini çıkarır."""
+    tag = IFRAME_VPX_RE.search(html) or IFRAME_ANY_RE.search(html)
+    if not tag:
+        return None
+    src = IFRAME_SRC_RE.search(tag.group(0))
+    return urljoin(base_url, src.group(1)) if src else None
+
+@metrics.timed("find_player_links_http", count_empty=True)
+def find_player_links_http(detail_url):
+    """
+    Hızlı yol: Detay sayfasını ve oynatıcı IFRAME'ini düz HTTP ile indirir.
+    Linkler regex ile bulunamazsa (None, None) döner ve Selenium'a geçilir.
+    """
+    try:
+        detail_html = http.get(detail_url, timeout=15).text
+        iframe_src = find_iframe_src(detail_html, detail_url)
+        if iframe_src:
+            iframe_html = http.get(iframe_src, timeout=15, headers={"Referer": detail_url}).text
+            video_link, subtitle_link = extract_media_links(iframe_html)
+            if video_link:
+                return video_link, subtitle_link
+        # IFRAME yoksa veya linki içermiyorsa detay sayfasının kendisine bak
+        video_link, subtitle_link = extract_media_links(detail_html)
+        if video_link:
+            return video_link, subtitle_link
+    except Exception as e:
+        print(f"  -> HTTP hızlı yol başarısız, Selenium denenecek: {e}")
+    return None, None
+
+class NetworkCapture:
+    """Performans loglarından oynatıcının yaptığı manifest/altyazı isteklerini toplar."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.video_link = None
+        self.subtitle_link = None
+        self.bytes_received = 0
+        # Önceki filmden kalan log kayıtlarını boşalt
+        self.driver.get_log('performance')
+
+    def poll(self):
+        """Yeni log kayıtlarını okur; video linki yakalandıysa True döner."""
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                url = params.get('request', {}).get('url', '')
+                if not self.video_link and NETWORK_VIDEO_RE.match(url):
+                    self.video_link = url
+                elif not self.subtitle_link and NETWORK_SUBTITLE_RE.match(url):
+                    self.subtitle_link = url
+            elif method == 'Network.loadingFinished':
+                self.bytes_received += int(params.get('encodedDataLength') or 0)
+        return self.video_link is not None
+
+@metrics.timed("find_player_links", count_empty=True)
+def find_player_links(driver, detail_url, capture=False):
+    """
+    Film detay sayfasından video (.m3u8) ve altyazı linklerini bulmaya çalışır.
+    capture=True ise (sürücü setup_driver(capture=True) ile açılmış olmalı)
+    oynatıcının çalışma anında yaptığı istekler de ağ trafiğinden yakalanır.
+    """
     video_link = None
     subtitle_link = None
+    network = NetworkCapture(driver) if capture else None
     
     # print(f"  -> Detay Sayfası Yükleniyor: {detail_url}")
     
     try:
-        driver.get(detail_url)
+        with metrics.timer("selenium_page_load"):
+            driver.get(detail_url)
         
-        # Oynatıcıyı içeren IFRAME'i spesifik olarak bulmaya çalış (class="vpx" kullanılarak)
+        # Oynatıcıyı içeren IFRAME'i açık bekleme ile bul (önce class="vpx", yoksa ilk iframe)
         iframe_element = None
         try:
-            # iframe.vpx seçicisi ile IFRAME'i bul
-            iframe_element = driver.find_element(By.CSS_SELECTOR, 'iframe.vpx')
-        except:
-            # Bulamazsa, tüm iframe'ler arasında ara (yedek)
-            iframe_elements = driver.find_elements(By.TAG_NAME, 'iframe')
+            WebDriverWait(driver, ELEMENT_WAIT_SECONDS).until(
+                EC.presence_of_element_located((By.TAG_NAME, 'iframe'))
+            )
+            vpx_elements = driver.find_elements(By.CSS_SELECTOR, 'iframe.vpx')
+            iframe_elements = vpx_elements or driver.find_elements(By.TAG_NAME, 'iframe')
             iframe_element = iframe_elements[0] if iframe_elements else None
+        except TimeoutException:
+            pass
 
+        # Yedek arama için detay sayfasının kaynağı, iframe'e geçmeden önce saklanır
+        detail_source = driver.page_source
         
         if iframe_element:
             # IFRAME src adresini çekiyoruz (örn: https://vidrame.pro/vr/...)
@@ -62,62 +188,111 @@ def find_player_links(driver, detail_url):
                 # print(f"  -> IFRAME Kaynağı Bulundu: {iframe_src}")
                 
                 # Sürücüyü iframe'in kaynağına yönlendir (2. Aşama Kazıma)
-                driver.get(iframe_src)
+                with metrics.timer("selenium_page_load"):
+                    driver.get(iframe_src)
                 
                 # Yeni sayfadaki (iframe içeriği) kaynak kodu al
                 iframe_html = driver.page_source
                 
                 # 1. Video Linkini Bulma (.m3u8 veya .mpd)
-                # Oynatıcı kodunda video linkini regex ile arıyoruz
-                m3u8_match = re.search(r'["\'](https?://[^"\']*\.m3u8|https?://[^"\']*\.mpd)["\']', iframe_html)
-                if m3u8_match:
-                    video_link = m3u8_match.group(1)
-                
                 # 2. Altyazı Linkini Bulma (.vtt veya .srt)
-                vtt_match = re.search(r'["\'](https?://[^"\']*\.vtt|https?://[^"\']*\.srt)["\']', iframe_html)
-                if vtt_match:
-                    subtitle_link = vtt_match.group(1)
+                # Oynatıcı kodunda linkleri regex ile arıyoruz
+                video_link, subtitle_link = extract_media_links(iframe_html)
                 
-                # Video bulunamazsa sayfayı HTML parser ile de kontrol et
-                if not video_link:
-                    soup_iframe = BeautifulSoup(iframe_html, 'html.parser')
-                    # Bu noktada, eğer linkler bir JS değişkeni içine gömülüyse, 
-                    # o değişkeni bulmak için daha fazla regex gerekebilir.
-
-                # Önceki film sayfasına geri dön (Sonraki filme geçmeden önce temizlik)
-                driver.back()
+                # Linki çalışma anında üreten oynatıcılar için ağ trafiğini izle
+                if network:
+                    # Oynatıcıyı sessizce başlatmayı dene, manifest isteği tetiklensin
+                    driver.execute_script(
+                        "document.querySelectorAll('video').forEach(function (v) {"
+                        " v.muted = true; var p = v.play && v.play(); if (p && p.catch) p.catch(function () {}); });"
+                    )
+                    try:
+                        WebDriverWait(driver, ELEMENT_WAIT_SECONDS, poll_frequency=0.25).until(
+                            lambda _: network.poll()
+                        )
+                    except TimeoutException:
+                        pass
+                    # Ağda yakalanan gerçek istek, sayfa kaynağındaki tahminden önceliklidir
+                    video_link = network.video_link or video_link
+                    subtitle_link = network.subtitle_link or subtitle_link
 
         # Eğer iframe yoluyla bulunamazsa, kaynak kodun tamamında arama yap (Yedek)
         if not video_link:
-             page_source = driver.page_source
-             m3u8_match_direct = re.search(r'["\'](https?://[^"\']*\.m3u8|https?://[^"\']*\.mpd)["\']', page_source)
-             if m3u8_match_direct:
-                video_link = m3u8_match_direct.group(1)
+             video_link, _ = extract_media_links(detail_source)
 
 
     except Exception as e:
         print(f"  -> Video linki çekilirken hata oluştu: {e}")
+
+    if network:
+        print(f"  -> Ağ trafiği: ~{network.bytes_received / 1024:.0f} KB indirildi")
+        metrics.count("selenium_bytes", network.bytes_received)
         
     return video_link, subtitle_link
 
+# --- TARAYICI HAVUZU ---
+
+# Sürücüsü açılamayan iş parçacığının işareti
+_DRIVER_FAILED = object()
+
+class BrowserPool:
+    """
+    Uzun ömürlü headless Chrome sürücülerinden oluşan havuz.
+    Her işçi iş parçacığı kendi sürücüsünü ilk ihtiyaçta açar ve
+    tüm çalışma boyunca yeniden kullanır. Sürücü açılamazsa bu iş
+    parçacığında tekrar denenmez, Selenium adımı atlanır.
+    """
+
+    def __init__(self, capture=False):
+        self.capture = capture
+        self.local = threading.local()
+        self.drivers = []
+        self.lock = threading.Lock()
+
+    def get_driver(self):
+        driver = getattr(self.local, 'driver', None)
+        if driver is _DRIVER_FAILED:
+            return None
+        if driver is None:
+            driver = setup_driver(capture=self.capture)
+            if driver is None:
+                # Chrome her filmde yeniden başlatılmaya çalışılmaz
+                self.local.driver = _DRIVER_FAILED
+                return None
+            self.local.driver = driver
+            with self.lock:
+                self.drivers.append(driver)
+        return driver
+
+    def close(self):
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+@metrics.timed("write_m3u")
 def create_m3u_file(film_list):
     """Veri listesini M3U çalma listesi formatına dönüştürür ve dosyaya yazar. Posteri tvg-logo olarak kullanır."""
-    m3u_content = "#EXTM3U\n"
+    m3u_content = HEADER + "\n"
     
     for film in film_list:
         if film['Video_Link']:
             # M3U formatı: #EXTINF:-1, [Türler] Film Adı (Yıl)
             title = f"{film['Türleri']} {film['Adı']} ({film['Yılı']})"
             
-            # #EXTINF satırı: Poster (tvg-logo) ve diğer meta veriler buraya eklenir.
-            m3u_content += f'#EXTINF:-1 tvg-id="{film["Adı"]}" tvg-logo="{film["Poster"]}" group-title="{film["Türleri"]}",{title}\n'
-            
             # Altyazı linkini referans olarak yorum satırı veya özel etiket olarak ekle
+            extra_lines = None
             if film['Altyazı_Link']:
-                 m3u_content += f'#EXTM3U_SUBTITLE:{film["Altyazı_Link"]}\n'
+                 extra_lines = [f'#EXTM3U_SUBTITLE:{film["Altyazı_Link"]}']
                  
-            # Klasik M3U8 linki (Orijinal içerik)
-            m3u_content += f"{film['Video_Link']}\n"
+            # #EXTINF satırı: Poster (tvg-logo) ve diğer meta veriler buraya eklenir.
+            # Ardından klasik M3U8 linki (Orijinal içerik) yazılır.
+            m3u_content += format_entry(M3UEntry(
+                title, film['Video_Link'],
+                tvg_id=film["Adı"], tvg_logo=film["Poster"], group_title=film["Türleri"],
+                extra_lines=extra_lines,
+            ))
     
     file_path = "hdfilmizle_playlist.m3u"
     with open(file_path, "w", encoding="utf-8") as f:
@@ -126,19 +301,92 @@ def create_m3u_file(film_list):
     print(f"\n[BAŞARILI] {len(film_list)} filmlik M3U dosyası oluşturuldu: {file_path}")
     return file_path
 
-def main_scraper():
-    """Ana kazıma sürecini yönetir."""
-    driver = setup_driver()
+def fetch_homepage_html(pool):
+    """Ana sayfayı önce düz HTTP ile, film kartı bulunamazsa Selenium ile indirir."""
+    try:
+        html = http.get(TARGET_URL, timeout=20).text
+        if 'poster' in html:
+            return html
+    except Exception as e:
+        print(f"-> Ana sayfa HTTP ile alınamadı, Selenium deneniyor: {e}")
+    driver = pool.get_driver()
     if not driver:
-        return
+        return ""
+    with metrics.timer("selenium_page_load"):
+        driver.get(TARGET_URL)
+    return driver.page_source
+
+def parse_film_card(kart):
+    """Ana sayfadaki film kartından başlık, yıl, tür ve poster bilgilerini çıkarır."""
+    # A. Film URL'si ve Başlıklar
+    film_url_path = kart.get('href')
+    film_url = f"https://www.hdfilmizle.to{film_url_path}"
+    film_adi = kart.select_one('h2.title').get_text(strip=True) if kart.select_one('h2.title') else "N/A"
+    film_yili = kart.select_one('.poster-year').get_text(strip=True) if kart.select_one('.poster-year') else "N/A"
+    film_turleri = kart.select_one('.poster-genres').get_text(strip=True) if kart.select_one('.poster-genres') else "N/A"
+    
+    # B. Poster Linkini Çekme
+    # <img ... data-src="/v/502074/poster/thumb/fantastik-dortlu-ilk-adimlar.jpg" ...>
+    # 'lazyloaded' sınıfı sadece JS çalışınca eklenir; HTTP ile gelen sayfada ilk img kullanılır.
+    poster_img = kart.select_one('img.lazyloaded') or kart.select_one('img')
+    poster_link = None
+    if poster_img:
+        # Poster URL'sini data-src veya src özelliklerinden al
+        img_path = poster_img.get('data-src') or poster_img.get('src')
+        if img_path and img_path.startswith('/'):
+            poster_link = f"https://www.hdfilmizle.to{img_path}"
+        else:
+            poster_link = img_path # Tam URL ise olduğu gibi al
+
+    return {
+        "Adı": film_adi,
+        "Yılı": film_yili,
+        "Türleri": film_turleri,
+        "URL": film_url,
+        "Poster": poster_link,
+        "Video_Link": None,
+        "Altyazı_Link": None
+    }
+
+@metrics.timed("process_film")
+def process_film(pool, film, http_first=True):
+    """Tek bir filmin linklerini önce HTTP ile, olmazsa havuzdaki tarayıcıyla çözer."""
+    video_link, subtitle_link = (None, None)
+    method = "HTTP"
+    if http_first:
+        video_link, subtitle_link = find_player_links_http(film["URL"])
+    if not video_link:
+        method = "Selenium"
+        driver = pool.get_driver()
+        if driver:
+            video_link, subtitle_link = find_player_links(driver, film["URL"], capture=pool.capture)
+
+    film["Video_Link"] = video_link
+    film["Altyazı_Link"] = subtitle_link
+    metrics.count(f"films_{method.lower()}_{'ok' if video_link else 'failed'}")
+    print(f"\n--- {film['Adı']} ({method}) ---")
+    print(f"  -> Sonuç: {'BAŞARILI' if video_link else 'BAŞARISIZ'}")
+    print(f"  -> Video Linki: {video_link or 'Bulunamadı'}")
+    print(f"  -> Altyazı Linki: {subtitle_link or 'Bulunamadı'}")
+    return film
+
+def main_scraper(limit=None, pool_size=3, http_first=True, capture=True):
+    """
+    Ana kazıma sürecini yönetir.
+    limit: İşlenecek en fazla film sayısı (None ise hepsi)
+    pool_size: Aynı anda çalışan tarayıcı/işçi sayısı
+    http_first: Önce Selenium'suz HTTP hızlı yolunu dene
+    capture: Selenium'da gereksiz kaynakları engelle ve linkleri ağ trafiğinden yakala
+    """
+    pool = BrowserPool(capture=capture)
+    start = time.perf_counter()
 
     try:
         # 1. Ana Sayfadan Film Listesini Çekme
         print(f"\n[ADIM 1] Ana Sayfa Filmleri Çekiliyor: {TARGET_URL}")
-        driver.get(TARGET_URL)
 
         # HTML'i al ve Beautiful Soup ile ayrıştır
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        soup = BeautifulSoup(fetch_homepage_html(pool), 'html.parser')
         
         # Her bir film kartını seçmek için benzersiz seçiciyi kullan
         film_kartlari = soup.select('a.poster.col-6.col-sm-3')
@@ -146,60 +394,39 @@ def main_scraper():
         if not film_kartlari:
             print("HATA: Ana sayfadan film kartı bulunamadı. Seçiciyi kontrol edin.")
             return
-            
-        print(f"-> Ana sayfada {len(film_kartlari)} film kartı bulundu. (İlk 5 film işleniyor.)")
-
-        kazinan_filmler = []
         
-        # Sadece ilk 5 filmi test etmek için
-        for i, kart in enumerate(film_kartlari[:5]): 
-            print(f"\n--- Film {i+1}/{len(film_kartlari[:5])} İşleniyor: {kart.get('title')} ---")
-            
-            # Veri çekme (Poster linki buraya eklendi)
-            
-            # A. Film URL'si ve Başlıklar
-            film_url_path = kart.get('href')
-            film_url = f"https://www.hdfilmizle.to{film_url_path}"
-            film_adi = kart.select_one('h2.title').get_text(strip=True) if kart.select_one('h2.title') else "N/A"
-            film_yili = kart.select_one('.poster-year').get_text(strip=True) if kart.select_one('.poster-year') else "N/A"
-            film_turleri = kart.select_one('.poster-genres').get_text(strip=True) if kart.select_one('.poster-genres') else "N/A"
-            
-            # B. Poster Linkini Çekme
-            # <img ... data-src="/v/502074/poster/thumb/fantastik-dortlu-ilk-adimlar.jpg" ...>
-            poster_img = kart.select_one('img.lazyloaded') # veya img.ls-is-cached.lazyloaded
-            poster_link = None
-            if poster_img:
-                # Poster URL'sini data-src veya src özelliklerinden al
-                img_path = poster_img.get('data-src') or poster_img.get('src')
-                if img_path and img_path.startswith('/'):
-                    poster_link = f"https://www.hdfilmizle.to{img_path}"
-                else:
-                    poster_link = img_path # Tam URL ise olduğu gibi al
-            
-            # 2. Video ve Altyazı Linklerini Çekme
-            video_link, subtitle_link = find_player_links(driver, film_url)
-            
-            kazinan_filmler.append({
-                "Adı": film_adi,
-                "Yılı": film_yili,
-                "Türleri": film_turleri,
-                "URL": film_url,
-                "Poster": poster_link,
-                "Video_Link": video_link,
-                "Altyazı_Link": subtitle_link
-            })
-            
-            print(f"  -> Sonuç: {'BAŞARILI' if video_link else 'BAŞARISIZ'}")
-            print(f"  -> Video Linki: {video_link or 'Bulunamadı'}")
-            print(f"  -> Altyazı Linki: {subtitle_link or 'Bulunamadı'}")
-            # time.sleep(1) # Örtülü bekleme kullanıldığı için bu satıra gerek kalmadı
+        secilenler = film_kartlari[:limit] if limit else film_kartlari
+        print(f"-> Ana sayfada {len(film_kartlari)} film kartı bulundu. "
+              f"({len(secilenler)} film, {pool_size} işçi ile işleniyor.)")
+
+        # 2. Video ve Altyazı Linklerini Çekme (iş kuyruğu + tarayıcı havuzu)
+        filmler = [parse_film_card(kart) for kart in secilenler]
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            kazinan_filmler = list(executor.map(lambda film: process_film(pool, film, http_first), filmler))
+
+        elapsed = time.perf_counter() - start
+        print(f"\n-> {len(kazinan_filmler)} film {elapsed:.1f} sn'de işlendi "
+              f"({len(kazinan_filmler) / elapsed:.2f} film/sn).")
 
         # 3. M3U Dosyasını Hazırlama
         print("\n[ADIM 3] M3U Dosyası Hazırlanıyor...")
         create_m3u_file(kazinan_filmler)
 
     finally:
-        driver.quit()
+        pool.close()
 
 if __name__ == "__main__":
-    main_scraper()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="hdfilmizle.to ana sayfasındaki filmleri M3U listesine aktarır.")
+    parser.add_argument("--limit", type=int, default=None, help="İşlenecek en fazla film sayısı")
+    parser.add_argument("--pool-size", type=int, default=3, help="Tarayıcı havuzundaki sürücü/işçi sayısı")
+    parser.add_argument("--no-http-first", action="store_true",
+                        help="HTTP hızlı yolunu atla, doğrudan Selenium kullan")
+    parser.add_argument("--no-capture", action="store_true",
+                        help="Ağ trafiği yakalama ve kaynak engellemeyi kapat")
+    http_transport.add_arguments(parser)
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+    http_transport.apply_arguments(args, http, workers=args.pool_size)
+    metrics.run(args, main_scraper, limit=args.limit, pool_size=args.pool_size,
+                http_first=not args.no_http_first, capture=not args.no_capture)
@@ -0,0 +1,107 @@
+"""
+Derlenmiş XPath seçicileriyle HTML'den veri ayıklama.
+
+Her site sayfasından ne çıkarılacağı SITES tablosunda bildirimsel olarak
+tanımlanır (Spec). Seçiciler modül yüklenirken bir kez derlenir
+(etree.XPath); sayfa başına yeniden çözümlenmez. BeautifulSoup'un aksine
+Python nesne ağacı kurulmaz, ağaç lxml'in C yapılarında kalır ve sadece
+istenen metinler Python'a çıkar.
+
+'stop_after' verilen şablonlarda sayfa parça parça ayrıştırılır ve o eleman
+kapanınca durulur: gereken bilgiler sayfanın başındaysa yorumlar, betikler
+vb. hiç ayrıştırılmaz.
+"""
+from lxml import etree
+
+# Akış halinde ayrıştırmada parça boyu (karakter)
+CHUNK_SIZE = 512
+
+
+def has_class(name):
+    """
+    CSS '.name' seçicisinin XPath karşılığı (sınıf listesinde 'name' geçiyor mu).
+    Ucuz contains(@class) ön kontrolü, çoğu elemanda concat/normalize-space'i atlatır.
+    """
+    return f"(contains(@class, '{name}') and contains(concat(' ', normalize-space(@class), ' '), ' {name} '))"
+
+
+class Spec:
+    """
+    Bir sayfa türünün ayıklama şablonu.
+    fields: Alan adı -> XPath ifadesi (metin döndürmesi için string(...) kullanılır).
+            'items' verilirse ifadeler her öğeye göredir (.//...).
+    items: Tekrarlanan öğeleri seçen XPath (ör. liste sayfasındaki her dizi kartı).
+    required: Boş kalırsa öğenin atlandığı alanlar (varsayılan: hepsi).
+    stop_after: (etiket, sınıf) çifti; bu eleman kapanınca ayrıştırma durur.
+                Sadece istenen tüm alanlar o elemandan önce geliyorsa verilmelidir.
+    """
+
+    def __init__(self, fields, items=None, required=None, stop_after=None):
+        self.fields = [(name, etree.XPath(expr, smart_strings=False)) for name, expr in fields.items()]
+        self.items = etree.XPath(items) if items else None
+        self.required = tuple(fields) if required is None else tuple(required)
+        self.stop_after = stop_after
+
+    def parse(self, html):
+        """HTML metnini lxml ağacına çevirir. Boş sayfada None döner."""
+        if not html:
+            return None
+        if not self.stop_after:
+            return etree.HTML(html)
+        tag, cls = self.stop_after
+        parser = etree.HTMLPullParser(events=("end",), tag=tag)
+        for start in range(0, len(html), CHUNK_SIZE):
+            parser.feed(html[start:start + CHUNK_SIZE])
+            if any(cls in (elem.get("class") or "").split() for _, elem in parser.read_events()):
+                break
+        return parser.close()
+
+    def values(self, node):
+        return {name: xpath(node).strip() for name, xpath in self.fields}
+
+    def extract(self, html):
+        """
+        'items' yoksa tek sözlük (bulunamayan alanlar boş metin), varsa zorunlu
+        alanları dolu öğelerin listesini döndürür.
+        """
+        root = self.parse(html)
+        if self.items is None:
+            return self.values(root) if root is not None else {name: "" for name, _ in self.fields}
+        if root is None:
+            return []
+        records = []
+        for node in self.items(root):
+            record = self.values(node)
+            if all(record[name] for name in self.required):
+                records.append(record)
+        return records
+
+
+SITES = {
+    "fullhdfilmizlesene": {
+        # Başlık, poster ve tür sayfanın başında; yorumlar ve betikler ayrıştırılmaz
+        "film": Spec({
+            "title": f"string(//div[{has_class('izle-titles')}]//h1)",
+            "poster": f"string((//div[{has_class('film-poster')}]//img/@data-src)[1])",
+            "genre": "string(//span[@class='dt'][normalize-space()='Tür']/following::a[1])",
+        }, stop_after=("ul", "film-info")),
+    },
+    "cizgimax": {
+        "listing": Spec({
+            "title": f"string(.//h2[{has_class('truncate')}])",
+            "url": f"string((.//div[{has_class('poster-subject')}]//a/@href)[1])",
+        }, items=f"//ul[{has_class('filter-results')}]//li"),
+        "series": Spec({
+            "name": f"string(.//span[{has_class('episode-names')}])",
+            "url": "string((.//a/@href)[1])",
+        }, items=f"//div[{has_class('asisotope')}]//div[{has_class('ajax_post')}]"),
+        "episode": Spec({
+            "frame": "string(@data-frame)",
+        }, items=f"//ul[{has_class('linkler')}]//li//a"),
+    },
+}
+
+
+def extract(site, page, html):
+    """SITES tablosundaki şablonla sayfayı ayıklar: extract("cizgimax", "listing", html)."""
+    return SITES[site][page].extract(html)
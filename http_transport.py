@@ -0,0 +1,464 @@
+"""
+Tüm betiklerin kullandığı ortak HTTP taşıma katmanı.
+
+create_session / configure_session bir requests (veya cloudscraper)
+oturumuna ResilientAdapter takar:
+- Bağlantı havuzu işçi sayısına göre boyutlanır, bağlantılar açık tutulur
+  (keep-alive). 'httpx' ve 'h2' kuruluysa istenirse HTTP/2 kullanılır.
+- Bağlantı hatası, zaman aşımı ve 429/500/502/503/504 cevaplarında istek,
+  rastgele dağıtılmış (jitter) üstel bekleme ile tekrar denenir. Sunucu
+  Retry-After gönderirse o süre beklenir.
+- Her sunucunun hızı ayrı tutulur: 429/503 gelince o sunucunun istek hızı
+  yarıya iner, başarılı isteklerle yavaşça geri yükselir.
+- Arka arkaya hata veren sunucu için devre kesici (circuit breaker) açılır;
+  bekleme süresi boyunca o sunucuya giden istekler beklemeden
+  CircuitOpenError ile reddedilir. Süre dolunca tek bir deneme isteği
+  gönderilir, başarılı olursa devre kapanır.
+
+Sunucu durumları süreç genelinde paylaşılır (modül düzeyindeki 'transport');
+aynı sunucuya giden farklı oturumlar aynı hız ve devre bilgisini kullanır.
+Zaman aşımı verilmeyen isteklere DEFAULT_TIMEOUT uygulanır.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+try:
+    import httpx
+except ImportError:  # HTTP/2 isteğe bağlıdır: pip install "httpx[http2]"
+    httpx = None
+
+# (bağlantı kurma, okuma) saniye
+DEFAULT_TIMEOUT = (10, 30)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+# Bu depodaki POST istekleri (trstx API) veri değiştirmez, tekrar denenebilir
+RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "POST"})
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Sunucunun devresi açık; istek gönderilmeden reddedildi."""
+
+
+def host_key(url):
+    """Sunucu anahtarı: 'alan.adi' veya standart dışı portta 'alan.adi:port'."""
+    return urlsplit(url).netloc.rpartition("@")[2].lower()
+
+
+def parse_retry_after(value):
+    """Retry-After başlığını (saniye veya HTTP tarihi) saniyeye çevirir."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_challenge(response):
+    """Cloudflare doğrulama cevabı mı (403/503)? Bunları cloudscraper çözer, tekrar denenmez."""
+    return response.status_code in (403, 503) and response.headers.get("Server", "").startswith("cloudflare")
+
+
+class HostState:
+    """
+    Tek bir sunucunun uyarlanabilir hız sınırı ve devre kesicisi.
+    acquire() beklenecek süreyi döndürür (beklemeyi çağıran yapar; böylece
+    aynı durum hem iş parçacıklarında hem asyncio'da kullanılabilir).
+    """
+
+    def __init__(self, host, rate=None, failure_threshold=5, reset_timeout=60.0,
+                 min_rate=0.2, recovery=0.05):
+        self.host = host
+        self.lock = threading.Lock()
+        # Ayarlanan üst sınır (None: sınırsız) ve şu anki hız (istek/sn)
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        # Her başarılı istekte hızın artacağı oran
+        self.recovery = recovery
+        self.next_time = 0.0
+        self.blocked_until = 0.0
+        # Son isteklerin ortalama aralığı ve sınırsız sunucunun kısılmadan önceki hızı
+        self.interval_ewma = None
+        self.ceiling = None
+        self.last_request = None
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.probing else "open"
+
+    def acquire(self):
+        """İstek için yer ayırır ve beklenmesi gereken süreyi döndürür. Devre açıksa hata fırlatır."""
+        with self.lock:
+            now = time.monotonic()
+            if self.opened_at is not None:
+                if now - self.opened_at < self.reset_timeout or self.probing:
+                    metrics.count("http.circuit_rejected")
+                    raise CircuitOpenError(f"{self.host}: devre açık, istek gönderilmedi")
+                # Bekleme süresi doldu: tek bir deneme isteğine izin ver
+                self.probing = True
+            if self.last_request is not None:
+                interval = now - self.last_request
+                self.interval_ewma = interval if self.interval_ewma is None else \
+                    0.8 * self.interval_ewma + 0.2 * interval
+            self.last_request = now
+            delay = max(0.0, self.blocked_until - now)
+            if self.rate:
+                start = max(now + delay, self.next_time)
+                self.next_time = start + 1.0 / self.rate
+                delay = start - now
+            return delay
+
+    def on_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                print(f"  [http] {self.host}: devre kapandı, sunucu yeniden yanıt veriyor.")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+            if self.rate and self.rate != self.max_rate:
+                self.rate *= 1 + self.recovery
+                if self.max_rate and self.rate >= self.max_rate:
+                    self.rate = self.max_rate
+                elif not self.max_rate and self.rate >= (self.ceiling or 0):
+                    # Sınırsız sunucu kısılmadan önceki hızına döndü: sınırı kaldır
+                    self.rate = self.ceiling = None
+
+    def on_throttle(self, retry_after=None):
+        """
+        429/503: Hızı yarıya indirir, Retry-After kadar yeni istek göndermez.
+        Yarı açık deneme isteği kısıtlanırsa devre hata durumundaki gibi yeniden açılır.
+        """
+        with self.lock:
+            current = self.rate or (1.0 / self.interval_ewma if self.interval_ewma else 10.0)
+            if not self.max_rate and self.ceiling is None:
+                self.ceiling = current
+            self.rate = max(self.min_rate, current / 2)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            reopened = self.probing
+            if reopened:
+                self.opened_at = time.monotonic()
+            self.probing = False
+        metrics.count("http.throttled")
+        if reopened:
+            metrics.count("http.circuit_opened")
+            print(f"  [http] {self.host}: deneme isteği kısıtlandı, devre "
+                  f"{self.reset_timeout:.0f} sn yeniden açık.")
+
+    def release(self):
+        """
+        Sonucu bilinmeyen istek (ör. iptal edilen görev): Deneme isteği hakkı
+        geri verilir, böylece devre yarı açık durumda takılı kalmaz.
+        """
+        with self.lock:
+            self.probing = False
+
+    def on_failure(self):
+        """Bağlantı hatası, zaman aşımı veya 5xx: Eşik aşılırsa devre açılır."""
+        with self.lock:
+            self.failures += 1
+            if self.probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self.probing = False
+                metrics.count("http.circuit_opened")
+                print(f"  [http] {self.host}: {self.failures} ardışık hata, devre "
+                      f"{self.reset_timeout:.0f} sn açık.")
+
+
+class Transport:
+    """
+    Sunucu durumlarının (HostState) ve tekrar deneme ayarlarının kaydı.
+    rates: Sunucu adı -> saniyedeki en fazla istek (ör. {"cizgimax.online": 2.0}).
+    """
+
+    def __init__(self, rates=None, max_retries=3, backoff=0.5, max_backoff=20.0, max_retry_after=120.0,
+                 failure_threshold=5, reset_timeout=60.0):
+        self.rates = dict(rates or {})
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def host(self, url):
+        key = host_key(url)
+        state = self.hosts.get(key)
+        if state is None:
+            with self.lock:
+                state = self.hosts.get(key)
+                if state is None:
+                    state = self.hosts[key] = HostState(key, self.rates.get(key), self.failure_threshold,
+                                                        self.reset_timeout)
+        return state
+
+    def set_rate(self, host, rate):
+        """Sunucunun hız üst sınırını ayarlar (mevcut durum varsa o da güncellenir)."""
+        self.rates[host] = rate
+        state = self.hosts.get(host)
+        if state:
+            with state.lock:
+                state.max_rate = state.rate = rate
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Tam rastgele (full jitter) üstel bekleme; Retry-After varsa en az o kadar."""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if retry_after is not None:
+            delay = retry_after + delay / 4
+        return delay
+
+    def summary(self):
+        states = [f"{state.host} ({state.state}, " + (f"{state.rate:.2f} istek/sn)" if state.rate else "sınırsız)")
+                  for state in self.hosts.values() if state.state != "closed" or state.rate != state.max_rate]
+        return "HTTP: " + (", ".join(states) if states else "tüm sunucular normal")
+
+
+transport = Transport()
+
+
+class _Http2Backend:
+    """ResilientAdapter'ın HTTP/2 arka ucu: istekleri httpx.Client(http2=True) ile gönderir."""
+
+    def __init__(self, pool_size):
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.clients = {}
+        self.limits = limits
+        self.lock = threading.Lock()
+
+    def client(self, verify):
+        with self.lock:
+            client = self.clients.get(verify)
+            if client is None:
+                client = self.clients[verify] = httpx.Client(http2=True, limits=self.limits, verify=verify)
+            return client
+
+    def send(self, request, stream=False, timeout=None, verify=True, **kwargs):
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        try:
+            reply = self.client(verify).request(
+                request.method, request.url, headers=dict(request.headers), content=request.body,
+                timeout=httpx.Timeout(read, connect=connect), follow_redirects=False)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e), request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e), request=request)
+        response = requests.Response()
+        response.status_code = reply.status_code
+        response.reason = reply.reason_phrase
+        response.headers = requests.structures.CaseInsensitiveDict(reply.headers)
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        # httpx gövdeyi zaten açmış olarak verir; Content-Encoding tekrar uygulanmasın
+        response.headers.pop("Content-Encoding", None)
+        response._content = reply.content
+        response._content_consumed = True
+        return response
+
+    def close(self):
+        for client in self.clients.values():
+            client.close()
+
+
+class ResilientAdapter(HTTPAdapter):
+    """
+    İşçi sayısına göre boyutlanmış bağlantı havuzu + tekrar deneme, sunucu
+    bazında uyarlanabilir hız ve devre kesici. requests ve cloudscraper
+    oturumlarına mount ile takılır. 'ssl_context' verilirse (cloudscraper'ın
+    şifre takımı) bağlantılar onunla kurulur.
+    """
+
+    def __init__(self, transport=transport, pool_size=10, http2=False, ssl_context=None):
+        self.transport = transport
+        self.ssl_context = ssl_context
+        self.http2 = None
+        if http2:
+            if httpx is None:
+                print("Uyarı: HTTP/2 için 'httpx[http2]' kurulu değil, HTTP/1.1 kullanılıyor.")
+            else:
+                self.http2 = _Http2Backend(pool_size)
+        super().__init__(pool_connections=max(10, pool_size), pool_maxsize=pool_size, max_retries=0)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.ssl_context:
+            kwargs['ssl_context'] = self.ssl_context
+        return super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, *args, **kwargs):
+        if self.ssl_context:
+            kwargs['ssl_context'] = self.ssl_context
+        return super().proxy_manager_for(*args, **kwargs)
+
+    def _send_once(self, request, **kwargs):
+        if self.http2:
+            return self.http2.send(request, **kwargs)
+        return super().send(request, **kwargs)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        kwargs = {"stream": stream, "timeout": timeout or DEFAULT_TIMEOUT, "verify": verify,
+                  "cert": cert, "proxies": proxies}
+        transport = self.transport
+        state = transport.host(request.url)
+        retries = transport.max_retries if request.method in RETRY_METHODS else 0
+        attempt = 0
+        while True:
+            delay = state.acquire()
+            try:
+                if delay:
+                    time.sleep(delay)
+                response = self._send_once(request, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                state.on_failure()
+                if attempt >= retries:
+                    raise
+                attempt += 1
+                metrics.count("http.retries")
+                time.sleep(transport.backoff_delay(attempt))
+                continue
+            except Exception:
+                # Beklenmeyen hata (ör. kod çözme, yönlendirme döngüsü) de hata sayılır
+                state.on_failure()
+                raise
+            except BaseException:
+                state.release()
+                raise
+
+            status = response.status_code
+            if status not in RETRY_STATUSES or is_challenge(response):
+                # Cloudflare doğrulama sayfası (503) cloudscraper'a olduğu gibi verilir
+                state.on_success()
+                return response
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if status in THROTTLE_STATUSES:
+                state.on_throttle(retry_after)
+            if status != 429:
+                state.on_failure()
+            if attempt >= retries or (retry_after or 0) > transport.max_retry_after:
+                return response
+            attempt += 1
+            metrics.count("http.retries")
+            response.close()
+            time.sleep(transport.backoff_delay(attempt, retry_after))
+
+    def close(self):
+        if self.http2:
+            self.http2.close()
+        super().close()
+
+
+def configure_session(session, workers=10, http2=False, transport=transport):
+    """
+    Oturuma (requests.Session veya cloudscraper) ResilientAdapter takar.
+    Havuz boyutu en az işçi sayısı kadardır. İşçi sayısı değişince tekrar
+    çağrılabilir. Oturumun kendi TLS ayarları (cloudscraper) korunur.
+    """
+    ssl_context = getattr(session.get_adapter("https://"), "ssl_context", None)
+    adapter = ResilientAdapter(transport, pool_size=max(1, workers), http2=http2, ssl_context=ssl_context)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.setdefault("Connection", "keep-alive")
+    return session
+
+
+def create_session(workers=10, headers=None, http2=False, transport=transport):
+    """Ortak taşıma katmanını kullanan yeni bir requests oturumu döndürür."""
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    return configure_session(session, workers, http2, transport)
+
+
+def add_arguments(parser):
+    """Betiklerin argparse ayrıştırıcısına ortak HTTP seçeneklerini ekler."""
+    group = parser.add_argument_group("HTTP")
+    group.add_argument("--http2", action="store_true",
+                       help="HTTP/2 kullan ('httpx[http2]' kurulu olmalı)")
+    group.add_argument("--retries", type=int, default=transport.max_retries,
+                       help="Başarısız istek için en fazla tekrar deneme sayısı")
+    group.add_argument("--breaker-timeout", type=float, default=transport.reset_timeout,
+                       help="Yanıt vermeyen sunucunun atlanacağı süre (sn)")
+
+
+def apply_arguments(args, *sessions, workers=10):
+    """add_arguments seçeneklerini ortak taşıma katmanına ve verilen oturumlara uygular."""
+    transport.max_retries = args.retries
+    transport.reset_timeout = args.breaker_timeout
+    for session in sessions:
+        configure_session(session, workers, args.http2)
+
+
+# --- asyncio (aiohttp) için ---
+
+async def async_request(http, method, url, read, transport=transport, **kwargs):
+    """
+    aiohttp oturumuyla ResilientAdapter ile aynı kurallarda istek atar.
+    'read' cevabı alan bir coroutine fonksiyonudur (ör. lambda r: r.text());
+    gövde bağlantı kapanmadan okunur ve sonucu döndürülür.
+    """
+    import asyncio
+    import aiohttp
+
+    state = transport.host(url)
+    retries = transport.max_retries if method in RETRY_METHODS else 0
+    attempt = 0
+    while True:
+        delay = state.acquire()
+        settled = False
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            async with http.request(method, url, **kwargs) as response:
+                status = response.status
+                if status not in RETRY_STATUSES:
+                    state.on_success()
+                    settled = True
+                    response.raise_for_status()
+                    return await read(response)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if status in THROTTLE_STATUSES:
+                    state.on_throttle(retry_after)
+                if status != 429:
+                    state.on_failure()
+                settled = True
+                if attempt >= retries or (retry_after or 0) > transport.max_retry_after:
+                    response.raise_for_status()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            state.on_failure()
+            if attempt >= retries:
+                raise
+            retry_after = None
+        except Exception:
+            # Beklenmeyen hata (ör. TooManyRedirects, ClientPayloadError) de hata sayılır
+            if not settled:
+                state.on_failure()
+            raise
+        except BaseException:
+            # İptal (CancelledError): deneme isteği hakkı geri verilir
+            if not settled:
+                state.release()
+            raise
+        attempt += 1
+        metrics.count("http.retries")
+        await asyncio.sleep(transport.backoff_delay(attempt, retry_after))
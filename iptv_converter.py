@@ -1,7 +1,21 @@
-import requests
 import yaml
 import sys
+import os
+import tempfile
+import argparse
+import hashlib
+import json
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+from m3u import iter_entries, format_extinf, parse_extinf
+from playlist_outputs import ENCODINGS, write_derived_outputs
+import epg
+import http_transport
+import metrics
+
+# Kaynak liste isteklerinin ortak oturumu (tekrar deneme, devre kesici: http_transport.py)
+http = metrics.instrument_session(http_transport.create_session(workers=2, headers={'User-Agent': 'Mozilla/5.0'}))
 
 # --- Yardımcı Fonksiyonlar ---
 
@@ -13,11 +27,11 @@ def load_config(config_path='config.yml'):
         print(f"HATA: Config dosyası okunamadı: {e}")
         sys.exit(1)
 
+@metrics.timed("fetch_playlist")
 def fetch_playlist(url):
     try:
         print(f"Kaynak liste indiriliyor...")
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, timeout=30, headers=headers)
+        response = http.get(url, timeout=30)
         response.raise_for_status()
         response.encoding = 'utf-8'
         return response.text
@@ -25,6 +39,52 @@ def fetch_playlist(url):
         print(f"HATA: Liste indirilemedi: {e}")
         sys.exit(1)
 
+@metrics.timed("open_playlist")
+def open_playlist(url, state=None, stream=False):
+    """
+    Kaynak listeye koşullu istek atar. Önceki çalışmadan kalan ETag /
+    Last-Modified bilgisi varsa gönderilir; sunucu 304 dönerse içerik
+    indirilmez.
+    """
+    try:
+        print("Kaynak liste kontrol ediliyor...")
+        headers = {}
+        if state:
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+        response = http.get(url, timeout=30, headers=headers, stream=stream)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+    except Exception as e:
+        print(f"HATA: Liste indirilemedi: {e}")
+        sys.exit(1)
+
+def iter_playlist_lines(response, hasher=None):
+    """
+    Kaynak listeyi tek seferde hafızaya almadan satır satır okur (akış modu).
+    'hasher' verilirse ham baytlar okunurken özet (hash) de hesaplanır.
+    """
+    try:
+        pending = b''
+        for chunk in response.iter_content(chunk_size=65536):
+            if hasher:
+                hasher.update(chunk)
+            pending += chunk
+            lines = pending.split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line.decode('utf-8', errors='replace').rstrip('\r')
+        if pending:
+            yield pending.decode('utf-8', errors='replace').rstrip('\r')
+    except Exception as e:
+        print(f"HATA: Liste indirilemedi: {e}")
+        sys.exit(1)
+    finally:
+        response.close()
+
 def extract_stream_id(url):
     """
     URL'den sadece ID numarasını çeker (Örn: 714).
@@ -34,57 +94,155 @@ def extract_stream_id(url):
     # En sondaki parça ID'dir
     return clean.split('/')[-1]
 
+def extract_group_name(entry):
+    """Kanal kaydının kategori adını (group-title) döndürür."""
+    if entry.group_title is not None:
+        return entry.group_title.strip()
+    return "DIGER" # Kategori bulunamazsa
+
+@metrics.timed("parse")
 def parse_and_group_channels(source_content):
     """
     Kanalları kategorilerine (group-title) göre gruplandırır.
     Döndürdüğü yapı: { 'Spor Kanallari': [kanal1, kanal2], 'Ulusal': [kanal3] ... }
+    Her kanal, m3u modülündeki M3UEntry kaydıdır.
     """
     print("--- Liste Analiz Ediliyor ve Kategorileniyor ---")
     
     # Kategorileri tutacak sözlük
     grouped_channels = {}
     
-    # Satırları işle
-    lines = source_content.splitlines()
-    last_extinf = None
-    
     count = 0
-    for line in lines:
-        line = line.strip()
-        if not line: continue
+    # Satırları işle: EXTINF özellikleri tek geçişte ayrıştırılır
+    for channel in iter_entries(source_content.splitlines()):
+        # 1. Kategori Adını (group-title) bul
+        group_name = extract_group_name(channel)
         
-        if line.startswith('#EXTINF:'):
-            last_extinf = line
-        elif last_extinf and not line.startswith('#'):
-            # Bu bir URL satırı ve öncesinde EXTINF var
-            
-            # 1. Kategori Adını (group-title) bul
-            # Regex hem tırnaklı (group-title="X") hem tırnaksız (group-title=X) yakalar
-            group_match = re.search(r'group-title=["\']?(.*?)["\']?([,;]|$)', last_extinf, re.IGNORECASE)
-            
-            if group_match:
-                group_name = group_match.group(1).strip()
-            else:
-                group_name = "DIGER" # Kategori bulunamazsa
-            
-            # 2. Kanal objesini oluştur
-            channel_obj = {
-                'extinf': last_extinf,
-                'url': line
-            }
-            
-            # 3. Gruba ekle
-            if group_name not in grouped_channels:
-                grouped_channels[group_name] = []
-            
-            grouped_channels[group_name].append(channel_obj)
-            
-            last_extinf = None
-            count += 1
+        # 2. Gruba ekle
+        if group_name not in grouped_channels:
+            grouped_channels[group_name] = []
+        
+        grouped_channels[group_name].append(channel)
+        count += 1
             
     print(f"Toplam {count} kanal, {len(grouped_channels)} farklı kategori altında toplandı.")
     return grouped_channels
 
+# --- Sıralama ---
+
+# Türkçe (ve yabancı kelimeler için q, w, x) ile Kiril alfabelerindeki harf sırası.
+# Python'un varsayılan sıralaması kod noktasına göredir; Ç, Ğ, Ş, Ü ... Z'den sonra,
+# Ё ise Я'dan sonra gelir.
+_LATIN_ALPHABET = "aâbcçdefgğhıiîjklmnoöpqrsştuûüvwxyz"
+_CYRILLIC_ALPHABET = "аәбвгғґдђеєёжзѕиіїйјкқлљмнңњоөпрстћуүұўфхһцчџшщъыьэюя"
+
+def _collation_weights():
+    weights = {}
+    for position, char in enumerate("0123456789"):
+        weights[char] = 10 + position
+    for position, char in enumerate(_LATIN_ALPHABET):
+        weights[char] = 100 + position
+    for position, char in enumerate(_CYRILLIC_ALPHABET):
+        weights[char] = 200 + position
+    return weights
+
+_COLLATION_WEIGHTS = _collation_weights()
+
+def collation_key(text):
+    """
+    Türkçe/Kiril alfabe sırasına göre sıralama anahtarı. Boşluk ve noktalama
+    harflerden önce gelir, tablo dışındaki harfler kod noktasına göre sona
+    eklenir. Eşitlikte orijinal metin belirleyicidir.
+    """
+    lowered = text.replace('I', 'ı').replace('İ', 'i').lower()
+    return (tuple(_COLLATION_WEIGHTS.get(char, 1000 + ord(char) if char.isalnum() else 0)
+                  for char in lowered), text)
+
+# Ayardaki 'collation' değeri -> sıralama anahtarı
+COLLATIONS = {
+    'tr': collation_key,
+    'codepoint': str,
+}
+
+# Varsayılan öncelik kuralı: Türk grupları önce
+DEFAULT_PRIORITY_GROUPS = ['turk|türk|tr ']
+
+class GroupOrder:
+    """
+    Grup sıralama motoru. Öncelik kuralları (düzenli ifadeler) bir kez tek
+    bir regex'te derlenir; bir grup ilk eşleşen kuralın sırasını alır, hiçbir
+    kurala uymayanlar en sona kalır. Aynı öncelikteki gruplar 'collation'
+    ile alfabetik sıralanır.
+
+    mode='priority'    : Önce kurallar, sonra alfabetik
+    mode='alphabetical': Sadece alfabetik
+    mode='source'      : Kaynak listedeki sıra
+    """
+
+    MODES = ('priority', 'alphabetical', 'source')
+
+    def __init__(self, priority=None, collation='tr', mode='priority'):
+        if mode not in self.MODES:
+            raise ValueError(f"Geçersiz sıralama: {mode}")
+        if collation not in COLLATIONS:
+            raise ValueError(f"Geçersiz collation: {collation}")
+        self.mode = mode
+        self.collate = COLLATIONS[collation]
+        self.rules = list(DEFAULT_PRIORITY_GROUPS if priority is None else priority)
+        # ^(?:.*?(?P<r0>kural0)|.*?(?P<r1>kural1)|...) : Alternatifler sırayla
+        # denendiği için ilk eşleşen grup en öncelikli kuraldır.
+        self.pattern = None
+        if self.rules:
+            self.pattern = re.compile(
+                '|'.join(f'.*?(?P<r{number}>{rule})' for number, rule in enumerate(self.rules)),
+                re.IGNORECASE | re.DOTALL,
+            )
+
+    def rank(self, group_name):
+        if self.pattern is not None:
+            match = self.pattern.match(group_name)
+            if match:
+                return int(match.lastgroup[1:])
+        return len(self.rules)
+
+    def order(self, group_names):
+        if self.mode == 'source':
+            return list(group_names)
+        if self.mode == 'alphabetical':
+            return sorted(group_names, key=self.collate)
+        return sorted(group_names, key=lambda name: (self.rank(name), self.collate(name)))
+
+DEFAULT_GROUP_ORDER = GroupOrder()
+
+def order_groups(group_names):
+    """
+    Grup isimlerini yazım sırasına koyar: Önce Türk grupları, sonra diğerleri
+    (her biri kendi içinde Türkçe alfabe sırasıyla).
+    """
+    return DEFAULT_GROUP_ORDER.order(group_names)
+
+# Ayardaki 'channel_sort' alanları: Grup içindeki kanal sırası
+CHANNEL_SORT_FIELDS = ('tvg_rec', 'name')
+
+def _archive_days(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+def sort_channels(channels, fields, collate):
+    """
+    Grup içindeki (EXTINF satırı, yayın ID'si) çiftlerini sıralar.
+    tvg_rec: Arşiv günü çok olan önce, name: Kanal adına göre alfabetik.
+    Eşitlikte kaynak sırası korunur.
+    """
+    def key(channel):
+        entry = parse_extinf(channel[0])
+        return tuple(-_archive_days(entry.tvg_rec) if field == 'tvg_rec' else collate(entry.name)
+                     for field in fields)
+    return sorted(channels, key=key)
+
+@metrics.timed("build_playlist")
 def build_new_playlist(grouped_channels, base_url):
     """
     Gruplanmış kanalları yeni URL yapısıyla birleştirir.
@@ -95,42 +253,24 @@ def build_new_playlist(grouped_channels, base_url):
     base_url = base_url.rstrip('/')
     output_lines = ['#EXTM3U']
     
-    # 1. Grup isimlerini ayır: Türk içerenler ve Diğerleri
-    turkish_groups = []
-    other_groups = []
-    
-    for group_name in grouped_channels.keys():
-        # Küçük harfe çevirip kontrol et (case insensitive)
-        lower_name = group_name.lower()
-        if 'turk' in lower_name or 'türk' in lower_name or 'tr ' in lower_name:
-            turkish_groups.append(group_name)
-        else:
-            other_groups.append(group_name)
-            
-    # Grupları kendi içinde alfabetik sırala (İsteğe bağlı, düzenli görünür)
-    turkish_groups.sort()
-    other_groups.sort()
-    
-    # 2. Listeyi oluşturma sırası: Önce Türk grupları, Sonra Diğerleri
-    final_group_order = turkish_groups + other_groups
-    
-    for group_name in final_group_order:
+    # Sıralama: Önce Türk grupları, Sonra Diğerleri
+    for group_name in order_groups(grouped_channels.keys()):
         channels = grouped_channels[group_name]
         
         for channel in channels:
             # ID'yi ayıkla
-            stream_id = extract_stream_id(channel['url'])
+            stream_id = extract_stream_id(channel.url)
             
             if stream_id and stream_id.isdigit():
                 # Orijinal EXTINF satırını aynen yaz (Kategori bilgisi burada saklı)
-                output_lines.append(channel['extinf'])
+                output_lines.append(channel.line or format_extinf(channel))
                 
                 # Yeni URL'yi oluştur: Base + ID + index.m3u8
                 new_url = f"{base_url}/{stream_id}/index.m3u8"
                 output_lines.append(new_url)
             else:
                 # ID bulunamazsa güvenli mod: Orijinal URL'yi yaz (veya atla)
-                # print(f"Uyarı: ID okunamadı, atlanıyor: {channel['url']}")
+                # print(f"Uyarı: ID okunamadı, atlanıyor: {channel.url}")
                 pass
 
     return "\n".join(output_lines)
@@ -140,18 +280,576 @@ def save_playlist(content, output_file):
         f.write(content)
     print(f"İşlem tamam! '{output_file}' dosyası oluşturuldu.")
 
+# --- Çıktı Profilleri ---
+
+def compile_group_filter(patterns):
+    """Grup filtresi listesini büyük/küçük harf duyarsız tek bir regex'e derler."""
+    if not patterns:
+        return None
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+
+def load_profiles(config):
+    """
+    Ayarlardaki 'profiles' listesini okur. Liste yoksa üst düzeydeki
+    'base_url' / 'output_file' tek bir profil olarak kullanılır.
+    Her profil: name, base_url, output_file, include_groups, exclude_groups,
+    order, priority_groups, collation, channel_sort, group_index, compress,
+    split_groups, manifest. Bu ayarlar profilde yoksa üst düzeydeki değerler
+    kullanılır.
+    """
+    epg_config = config.get('epg') or {}
+    raw_profiles = config.get('profiles') or [{
+        'base_url': config.get('base_url'),
+        'output_file': config.get('output_file'),
+    }]
+    profiles = []
+    seen_outputs = set()
+    for number, raw in enumerate(raw_profiles, start=1):
+        profile = {
+            'name': raw.get('name') or f"profil{number}",
+            'base_url': raw.get('base_url') or config.get('base_url'),
+            'output_file': raw.get('output_file'),
+            'include_groups': raw.get('include_groups') or [],
+            'exclude_groups': raw.get('exclude_groups') or [],
+            'order': raw.get('order', config.get('order', 'priority')),
+            'priority_groups': raw.get('priority_groups', config.get('priority_groups', DEFAULT_PRIORITY_GROUPS)),
+            'collation': raw.get('collation', config.get('collation', 'tr')),
+            'channel_sort': raw.get('channel_sort', config.get('channel_sort')) or [],
+            'group_index': raw.get('group_index', config.get('group_index', True)),
+            'compress': raw.get('compress', config.get('compress')) or [],
+            'split_groups': raw.get('split_groups', config.get('split_groups', False)),
+            'manifest': raw.get('manifest', config.get('manifest', False)),
+            'url_tvg': raw.get('url_tvg', epg_config.get('url_tvg')) if epg_config.get('enabled') else None,
+        }
+        # Eski ayar adı
+        if profile['order'] == 'turk_first':
+            profile['order'] = 'priority'
+        if not profile['base_url'] or not profile['output_file']:
+            print(f"HATA: '{profile['name']}' profilinde base_url veya output_file eksik.")
+            sys.exit(1)
+        invalid_encodings = [encoding for encoding in profile['compress'] if encoding not in ENCODINGS]
+        if invalid_encodings:
+            print(f"HATA: '{profile['name']}' profilinde geçersiz sıkıştırma: {invalid_encodings}")
+            sys.exit(1)
+        if profile['split_groups'] and not profile['group_index']:
+            print(f"HATA: '{profile['name']}' profilinde split_groups için group_index açık olmalı.")
+            sys.exit(1)
+        invalid_fields = [field for field in profile['channel_sort'] if field not in CHANNEL_SORT_FIELDS]
+        if invalid_fields:
+            print(f"HATA: '{profile['name']}' profilinde geçersiz channel_sort alanı: {invalid_fields}")
+            sys.exit(1)
+        if profile['output_file'] in seen_outputs:
+            print(f"HATA: '{profile['output_file']}' birden fazla profilde kullanılmış.")
+            sys.exit(1)
+        seen_outputs.add(profile['output_file'])
+        try:
+            profile['include_re'] = compile_group_filter(profile['include_groups'])
+            profile['exclude_re'] = compile_group_filter(profile['exclude_groups'])
+            profile['group_order'] = GroupOrder(profile['priority_groups'], profile['collation'],
+                                                profile['order'])
+        except (re.error, ValueError) as e:
+            print(f"HATA: '{profile['name']}' profilindeki sıralama/filtre ayarı geçersiz: {e}")
+            sys.exit(1)
+        profile['index_file'] = f"{profile['output_file']}.index.json" if profile['group_index'] else None
+        root = os.path.splitext(profile['output_file'])[0]
+        profile['split_dir'] = f"{root}_gruplar" if profile['split_groups'] else None
+        profile['manifest_file'] = f"{profile['output_file']}.manifest.json" if profile['manifest'] else None
+        profiles.append(profile)
+    return profiles
+
+def profile_settings(profile):
+    """Durum dosyasında saklanan, base_url dışındaki çıktıyı etkileyen ayarlar."""
+    return {
+        'include_groups': profile['include_groups'],
+        'exclude_groups': profile['exclude_groups'],
+        'order': profile['order'],
+        'priority_groups': profile['priority_groups'],
+        'collation': profile['collation'],
+        'channel_sort': profile['channel_sort'],
+        'group_index': profile['group_index'],
+        'compress': profile['compress'],
+        'split_groups': profile['split_groups'],
+        'manifest': profile['manifest'],
+        'url_tvg': profile['url_tvg'],
+    }
+
+def select_groups(group_names, profile):
+    """Profilin filtrelerinden geçen grupları profilin sıralamasıyla döndürür."""
+    include_re = profile['include_re']
+    exclude_re = profile['exclude_re']
+    selected = [
+        group_name for group_name in group_names
+        if (include_re is None or include_re.search(group_name))
+        and not (exclude_re and exclude_re.search(group_name))
+    ]
+    return profile['group_order'].order(selected)
+
+# --- Ortak Ayrıştırma ve Yazma ---
+
+class GroupSpool:
+    """
+    Kanalları gruplara göre (EXTINF satırı, yayın ID'si) çiftleri halinde
+    biriktirir. Hafızadaki satır sayısı 'max_buffered_lines' sınırını aşınca
+    tüm tamponlar gruplara ait geçici dosyalara boşaltılır (spill). Böylece
+    akış modunda hafızada sadece grup isimleri ve küçük bir tampon kalır.
+    'max_buffered_lines' None ise hiç diske yazılmaz.
+    """
+
+    def __init__(self, max_buffered_lines=20000, temp_dir=None):
+        self.max_buffered_lines = max_buffered_lines
+        self.base_temp_dir = temp_dir
+        self.temp_dir = None
+        self.buffers = {}
+        self.spill_files = {}
+        self.buffered_lines = 0
+        self.channel_count = 0
+
+    def add(self, group_name, extinf, stream_id):
+        self.buffers.setdefault(group_name, []).extend((extinf, stream_id))
+        self.buffered_lines += 2
+        self.channel_count += 1
+        if self.max_buffered_lines and self.buffered_lines >= self.max_buffered_lines:
+            self.spill()
+
+    def spill(self):
+        """Hafızadaki tamponları grup dosyalarının sonuna ekler."""
+        if self.temp_dir is None:
+            self.temp_dir = tempfile.mkdtemp(prefix='iptv_spool_', dir=self.base_temp_dir)
+        for group_name, lines in self.buffers.items():
+            if not lines: continue
+            path = self.spill_files.get(group_name)
+            if path is None:
+                path = os.path.join(self.temp_dir, f"{len(self.spill_files)}.part")
+                self.spill_files[group_name] = path
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines))
+                f.write("\n")
+            lines.clear()
+        self.buffered_lines = 0
+
+    def group_names(self):
+        """Grup isimleri, kaynak listedeki ilk görülme sırasıyla."""
+        return list(self.buffers)
+
+    def iter_lines(self, group_name):
+        """Bir grubun satırlarını önce diskteki, sonra hafızadaki sırayla verir."""
+        path = self.spill_files.get(group_name)
+        if path:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    yield line.rstrip('\n')
+        yield from self.buffers.get(group_name, [])
+
+    def iter_group(self, group_name):
+        """Bir grubun (EXTINF satırı, yayın ID'si) çiftleri."""
+        lines = self.iter_lines(group_name)
+        return zip(lines, lines)
+
+    def close(self):
+        for path in self.spill_files.values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if self.temp_dir:
+            try:
+                os.rmdir(self.temp_dir)
+            except OSError:
+                pass
+
+@metrics.timed("parse")
+def spool_channels(lines, spool, epg_index=None):
+    """
+    Kaynak listeyi bir kez ayrıştırır; ID'si sayısal olan kanalları
+    EXTINF satırı hazırlanmış olarak gruplara ekler. Tüm profiller bu
+    ortak sonuçtan yazılır. 'epg_index' verilirse eşleşen kanallara
+    rehberdeki tvg-id eklenir. Sadece EPG ile değişen kanalların EXTINF
+    satırı yeniden üretilir, diğerleri kaynaktaki gibi yazılır.
+    """
+    print("--- Liste Analiz Ediliyor ve Kategorileniyor ---")
+    for channel in iter_entries(lines):
+        stream_id = extract_stream_id(channel.url)
+        if stream_id and stream_id.isdigit():
+            extinf = channel.line
+            if epg_index and epg_index.attach(channel):
+                extinf = format_extinf(channel)
+            spool.add(extract_group_name(channel), extinf, stream_id)
+    print(f"Toplam {spool.channel_count} kanal, {len(spool.buffers)} farklı kategori altında toplandı.")
+    if epg_index:
+        print(epg_index.summary())
+
+def write_group_index(index_file, output_file, groups):
+    """
+    Çıktının yanına grup -> bayt aralığı / satır aralığı dizinini yazar.
+    'offset' ve 'length' ile grup, dosyanın tamamı okunmadan (ör. HTTP Range
+    isteğiyle) alınabilir; aralık ilk EXTINF satırından son URL'ye kadardır.
+    """
+    tmp_file = f"{index_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'file': os.path.basename(output_file), 'groups': groups},
+                  f, ensure_ascii=False, indent=1)
+    os.replace(tmp_file, index_file)
+
+def write_profile(profile, spool):
+    """
+    Profilin çıktısını parça parça geçici bir dosyaya yazar ve sonunda
+    atomik olarak yerine taşır. Grup dizini açıksa yazarken her grubun bayt
+    ve satır aralığı da kaydedilir. Yazılan kanal sayısını döndürür.
+    """
+    base_url = profile['base_url'].rstrip('/')
+    output_file = profile['output_file']
+    tmp_file = f"{output_file}.tmp"
+    collate = COLLATIONS[profile['collation']]
+    groups = []
+    written = 0
+    line_number = 1
+    try:
+        # Bayt konumları için ikili modda yazılır (f.tell() gerçek bayt sayısını verir)
+        with open(tmp_file, 'wb') as f:
+            header = f'#EXTM3U url-tvg="{profile["url_tvg"]}"' if profile['url_tvg'] else '#EXTM3U'
+            f.write(header.encode('utf-8'))
+            for group_name in select_groups(spool.group_names(), profile):
+                channels = spool.iter_group(group_name)
+                if profile['channel_sort']:
+                    channels = sort_channels(channels, profile['channel_sort'], collate)
+                offset = f.tell() + 1
+                count = 0
+                for extinf, stream_id in channels:
+                    f.write(f"\n{extinf}\n{base_url}/{stream_id}/index.m3u8".encode('utf-8'))
+                    count += 1
+                if count:
+                    groups.append({
+                        'name': group_name,
+                        'offset': offset,
+                        'length': f.tell() - offset,
+                        'first_line': line_number + 1,
+                        'last_line': line_number + 2 * count,
+                        'channels': count,
+                    })
+                    line_number += 2 * count
+                    written += count
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    if profile['index_file']:
+        write_group_index(profile['index_file'], output_file, groups)
+    print(f"İşlem tamam! [{profile['name']}] {written} kanal '{output_file}' dosyasına yazıldı.")
+    write_profile_extras(profile, groups)
+    return written
+
+@metrics.timed("write_extras")
+def write_profile_extras(profile, groups):
+    """Profilde istenmişse sıkıştırılmış kopyaları, grup dosyalarını ve manifest'i yazar."""
+    if profile['compress'] or profile['split_dir'] or profile['manifest_file']:
+        write_derived_outputs(profile['output_file'], groups, profile['compress'],
+                              profile['split_dir'], profile['manifest_file'])
+
+_worker_spool = None
+
+def _init_profile_worker(spool):
+    global _worker_spool
+    _worker_spool = spool
+
+def _write_profile_in_worker(profile):
+    return write_profile(profile, _worker_spool)
+
+@metrics.timed("write_profiles")
+def write_profiles(profiles, spool, workers=1):
+    """
+    Tüm profilleri aynı ayrıştırma sonucundan yazar. 'workers' > 1 ve
+    birden fazla profil varsa yazma işi süreç havuzuna dağıtılır.
+    """
+    print(f"--- {len(profiles)} Profil Yazılıyor ---")
+    if workers > 1 and len(profiles) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(profiles)),
+                                 initializer=_init_profile_worker, initargs=(spool,)) as executor:
+            return list(executor.map(_write_profile_in_worker, profiles))
+    return [write_profile(profile, spool) for profile in profiles]
+
+# --- Artımlı Çalışma (Durum Dosyası) ---
+
+def load_state(state_file):
+    """Önceki çalışmanın ETag / Last-Modified / içerik özeti bilgilerini okur."""
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state_file, state):
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, state_file)
+
+def state_matches_profiles(state, profiles):
+    """
+    Önceki durum ancak her profilin çıktı dosyası mevcutsa ve filtre/sıralama
+    ayarları değişmemişse kullanılabilir. base_url farkı sonradan uygulanır.
+    """
+    saved = state.get('profiles') or {}
+    for profile in profiles:
+        previous = saved.get(profile['output_file'])
+        if (previous is None or previous.get('settings') != profile_settings(profile)
+                or not os.path.exists(profile['output_file'])
+                or (profile['index_file'] and not os.path.exists(profile['index_file']))):
+            return False
+    return True
+
+def build_state(response, content_sha256, profiles, previous=None, epg_state=None):
+    # 304 cevabında ETag / Last-Modified tekrar gönderilmeyebilir
+    previous = previous or {}
+    return {
+        'epg': epg_state,
+        'etag': response.headers.get('ETag') or previous.get('etag'),
+        'last_modified': response.headers.get('Last-Modified') or previous.get('last_modified'),
+        'content_sha256': content_sha256,
+        'profiles': {
+            profile['output_file']: {'base_url': profile['base_url'], 'settings': profile_settings(profile)}
+            for profile in profiles
+        },
+    }
+
+@metrics.timed("rebase")
+def rebase_playlist(output_file, base_url, index_file=None):
+    """
+    Mevcut çıktı dosyasındaki URL'leri yeni 'base_url' ile yeniden yazar.
+    Çıktı dosyası zaten gruplanmış ve sıralanmış kanal listesini tuttuğu için
+    kaynağı yeniden indirmeye veya ayrıştırmaya gerek kalmaz. URL uzunluğu
+    değiştiği için grup dizinindeki bayt aralıkları da güncellenir.
+    """
+    print(f"--- '{output_file}': Sadece base_url değişmiş, URL'ler yeniden yazılıyor ---")
+    base_url = base_url.rstrip('/')
+    groups = []
+    if index_file:
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                groups = json.load(f).get('groups', [])
+        except (OSError, ValueError):
+            groups = []
+    # Satır numarası -> yeni dosyadaki başlangıç / bitiş bayt konumu (sadece grup sınırları)
+    first_lines = {group['first_line'] for group in groups}
+    last_lines = {group['last_line'] for group in groups}
+    line_starts = {}
+    line_ends = {}
+
+    tmp_file = f"{output_file}.tmp"
+    with open(output_file, 'r', encoding='utf-8') as src, open(tmp_file, 'wb') as dst:
+        for line_number, line in enumerate(src, start=1):
+            line = line.rstrip('\n')
+            if line and not line.startswith('#'):
+                line = f"{base_url}/{extract_stream_id(line)}/index.m3u8"
+            if line_number > 1:
+                dst.write(b"\n")
+            if line_number in first_lines:
+                line_starts[line_number] = dst.tell()
+            dst.write(line.encode('utf-8'))
+            if line_number in last_lines:
+                line_ends[line_number] = dst.tell()
+    os.replace(tmp_file, output_file)
+
+    if groups:
+        for group in groups:
+            group['offset'] = line_starts[group['first_line']]
+            group['length'] = line_ends[group['last_line']] - group['offset']
+        write_group_index(index_file, output_file, groups)
+    print(f"İşlem tamam! '{output_file}' dosyası yeni adrese göre güncellendi.")
+    return groups
+
+def rebased_profiles(profiles, state):
+    """Kaynak değişmediğinde base_url'i değişmiş olan profiller."""
+    saved = state.get('profiles') or {}
+    return [profile for profile in profiles
+            if saved.get(profile['output_file'], {}).get('base_url') != profile['base_url']]
+
+def finish_unchanged(profiles, state):
+    """Kaynak değişmediğinde sadece base_url farklarını uygular."""
+    changed = rebased_profiles(profiles, state)
+    for profile in changed:
+        groups = rebase_playlist(profile['output_file'], profile['base_url'], profile['index_file'])
+        write_profile_extras(profile, groups)
+    if not changed:
+        print("Kaynak liste ve ayarlar değişmemiş, işlem atlandı.")
+
 # --- Ana Fonksiyon ---
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="IPTV listesini yeni sunucu adresine dönüştürür.")
+    parser.add_argument('--config', default='config.yml', help="Ayar dosyasının yolu")
+    parser.add_argument('--stream', action='store_true',
+                        help="Listeyi hafızaya almadan akış modunda dönüştür")
+    parser.add_argument('--force', action='store_true',
+                        help="Durum dosyasını yok say, listeyi baştan indir ve oluştur")
+    parser.add_argument('--probe', action='store_true',
+                        help="Çıktıdaki yayınları kontrol et, çalışanları ayrı dosyaya yaz")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Profilleri paralel yazacak süreç sayısı")
+    parser.add_argument('--epg', action='store_true',
+                        help="Kanalları XMLTV rehberiyle eşleştir ve kırpılmış EPG yaz")
+    parser.add_argument('--serve', action='store_true',
+                        help="Dosya yazmak yerine listeleri HTTP sunucusu olarak ver (playlist_server.py)")
+    parser.add_argument('--host', default=None, help="Sunucu modunda dinlenecek adres")
+    parser.add_argument('--port', type=int, default=None, help="Sunucu modunda dinlenecek port")
+    http_transport.add_arguments(parser)
+    metrics.add_arguments(parser)
+    return parser.parse_args(argv)
+
+def convert(config, force=False, stream=False, workers=1):
+    """
+    Kaynak listeyi indirir (değiştiyse), bir kez ayrıştırır ve tüm
+    profillerin çıktı dosyalarını oluşturur.
+    """
+    profiles = load_profiles(config)
+    state_file = config.get('state_file', 'converter_state.json')
+    epg_config = config.get('epg') or {}
+    epg_state = epg_signature(epg_config)
+
+    # Bir profilin çıktısı yoksa, ayarları veya EPG rehberi değiştiyse tam çalışma yapılır.
+    state = {}
+    if not force:
+        state = load_state(state_file)
+        if not state_matches_profiles(state, profiles) or state.get('epg') != epg_state:
+            state = {}
+
+    response = open_playlist(config['source_playlist_url'], state, stream=stream)
+    if response.status_code == 304:
+        response.close()
+        print("Kaynak liste sunucuda değişmemiş (304).")
+        finish_unchanged(profiles, state)
+        save_state(state_file, build_state(response, state.get('content_sha256'), profiles, state, epg_state))
+        return
+
+    hasher = hashlib.sha256()
+    if stream:
+        lines = iter_playlist_lines(response, hasher)
+    else:
+        body = response.content
+        hasher.update(body)
+        if state and hasher.hexdigest() == state.get('content_sha256'):
+            print("Kaynak içerik bayt bayt aynı, ayrıştırma atlandı.")
+            finish_unchanged(profiles, state)
+            save_state(state_file, build_state(response, hasher.hexdigest(), profiles, epg_state=epg_state))
+            return
+        lines = body.decode('utf-8', errors='replace').splitlines()
+
+    spool = GroupSpool(config.get('stream_buffer_lines', 20000) if stream else None)
+    try:
+        epg_index = None
+        if epg_state and epg_state['mtime'] is not None:
+            with metrics.timer("epg_index"):
+                epg_index = epg.build_index(epg_config['xmltv_file'], epg_config.get('overwrite_ids', False))
+        spool_channels(lines, spool, epg_index)
+        targets = profiles
+        # Akış modunda içerik özeti ancak liste okunduktan sonra bilinir
+        if state and hasher.hexdigest() == state.get('content_sha256'):
+            targets = rebased_profiles(profiles, state)
+            print("Kaynak içerik değişmemiş, sadece base_url'i değişen profiller yazılacak.")
+        if targets:
+            write_profiles(targets, spool, workers)
+    finally:
+        spool.close()
+
+    save_state(state_file, build_state(response, hasher.hexdigest(), profiles, epg_state=epg_state))
+
+def epg_signature(epg_config):
+    """
+    EPG açıksa rehber dosyasının yolunu, değişiklik zamanını ve boyutunu
+    döndürür. Rehber güncellenince kanal eşleşmeleri yenilensin diye
+    durum dosyasında saklanır.
+    """
+    if not epg_config.get('enabled'):
+        return None
+    path = epg_config.get('xmltv_file')
+    if not path or not os.path.exists(path):
+        print(f"Uyarı: EPG rehberi bulunamadı ({path}), kanal eşleştirme atlandı.")
+        return {'xmltv_file': path, 'mtime': None, 'size': None}
+    return {
+        'xmltv_file': path,
+        'mtime': int(os.path.getmtime(path)),
+        'size': os.path.getsize(path),
+        'overwrite_ids': bool(epg_config.get('overwrite_ids')),
+    }
+
+@metrics.timed("epg_trim")
+def run_epg(config):
+    """
+    Profil çıktılarındaki tvg-id'leri toplar ve rehberden sadece bu
+    kanalları ve zaman aralığını içeren kırpılmış EPG'yi yazar. Zaman
+    aralığı her çalışmada kaydığı için kaynak değişmese de çalışır.
+    """
+    epg_config = config.get('epg') or {}
+    path = epg_config.get('xmltv_file')
+    if not path or not os.path.exists(path):
+        return
+    channel_ids = set()
+    for profile in load_profiles(config):
+        if not os.path.exists(profile['output_file']):
+            continue
+        with open(profile['output_file'], 'r', encoding='utf-8') as f:
+            channel_ids.update(entry.tvg_id for entry in iter_entries(f) if entry.tvg_id)
+    epg.write_trimmed_epg(path, epg_config.get('output_file', 'epg.xml.gz'), channel_ids,
+                          past_hours=epg_config.get('past_hours', 6),
+                          future_hours=epg_config.get('future_hours', 48))
+
+@metrics.timed("probe")
+def run_probe(config):
+    """Ayarlardaki 'probe' bölümüne göre çıktıdaki yayınları kontrol eder."""
+    from stream_probe import probe_playlist
+
+    probe = config.get('probe') or {}
+    # Varsayılan olarak ilk profilin çıktısı kontrol edilir
+    output_file = probe.get('input_file') or load_profiles(config)[0]['output_file']
+    root, ext = os.path.splitext(output_file)
+    probe_playlist(
+        output_file,
+        probe.get('live_file', f"{root}_canli{ext}"),
+        dead_file=probe.get('dead_file'),
+        cache_file=probe.get('cache_file', 'probe_cache.json'),
+        ttl_seconds=probe.get('ttl_minutes', 60) * 60,
+        method=str(probe.get('method', 'HEAD')).upper(),
+        concurrency=probe.get('concurrency', 200),
+        per_host=probe.get('per_host', 50),
+        timeout=probe.get('timeout', 5),
+    )
+
+@metrics.timed("serve")
+def run_serve(config, args):
+    """Ayarlardaki 'serve' bölümüne göre liste sunucusunu çalıştırır."""
+    from playlist_server import run_server
+
+    serve = config.get('serve') or {}
+    run_server(
+        args.config,
+        host=args.host or serve.get('host', '127.0.0.1'),
+        port=args.port or serve.get('port', 8080),
+        refresh_minutes=serve.get('refresh_minutes', 30),
+        watch_seconds=serve.get('watch_seconds', 2),
+        session=http,
+    )
+
+def run(args):
+    config = load_config(args.config)
+    http_transport.apply_arguments(args, http, workers=2)
+    if args.serve:
+        run_serve(config, args)
+        return
+    if args.epg:
+        config['epg'] = dict(config.get('epg') or {}, enabled=True)
+
+    convert(config, force=args.force, stream=args.stream or config.get('streaming'),
+            workers=args.workers or config.get('workers', 1))
+
+    if (config.get('epg') or {}).get('enabled'):
+        run_epg(config)
+
+    if args.probe or (config.get('probe') or {}).get('enabled'):
+        run_probe(config)
+
 def main():
-    config = load_config()
-    source_content = fetch_playlist(config['source_playlist_url'])
-    
-    # 1. Aşama: Kanalları kategorilere göre hafızada grupla
-    grouped_data = parse_and_group_channels(source_content)
-    
-    # 2. Aşama: Yeni URL'leri oluştur ve sırala
-    new_content = build_new_playlist(grouped_data, config['base_url'])
-    
-    save_playlist(new_content, config['output_file'])
+    args = parse_args()
+    metrics.run(args, run, args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
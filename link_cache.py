@@ -0,0 +1,145 @@
+"""
+Çözülmüş video linkleri için kalıcı (SQLite) önbellek.
+
+Anahtar olarak film slug'ı veya iframe/oynatıcı adresi kullanılır. Her kayıt
+türünün (trstx, rapidvid, cizgiduo, sibnet, hls, film ...) kendi geçerlilik süresi
+(TTL) vardır. Başarısız çözümlemeler de daha kısa bir süre için saklanır
+(negatif önbellek), böylece bozuk kaynaklar her çalışmada yeniden denenmez.
+Kayıt sayısı 'max_entries' sınırını aşınca en uzun süredir kullanılmayanlar,
+sayı sınırın EVICT_TO oranına inene kadar silinir (LRU). Kayıt sayısı her
+saklamada tabloda sayılmaz, bellekte tutulan üst sınırla takip edilir.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+DAY = 24 * 60 * 60
+
+# Kayıt türü -> saniye cinsinden geçerlilik süresi
+DEFAULT_TTLS = {
+    "film": 3 * DAY,
+    "trstx": 7 * DAY,
+    "rapidvid": 3 * DAY,
+    "cizgiduo": 7 * DAY,
+    "sibnet": 1 * DAY,
+    "hls": 1 * DAY,
+}
+DEFAULT_TTL = 1 * DAY
+NEGATIVE_TTL = 6 * 60 * 60
+# Sınır aşılınca kayıt sayısı 'max_entries'in bu oranına indirilir; böylece
+# silme (ve tablonun sayılması) her saklamada değil, arada bir yapılır
+EVICT_TO = 0.9
+
+
+class LinkCache:
+    """İş parçacıkları arasında paylaşılabilen SQLite tabanlı link önbelleği."""
+
+    def __init__(self, path="link_cache.sqlite", ttls=None, negative_ttl=NEGATIVE_TTL,
+                 max_entries=50000):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.stats = {"hit": 0, "negative_hit": 0, "miss": 0, "expired": 0, "stored": 0, "evicted": 0}
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS links ("
+            " kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT,"
+            " expires_at REAL NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (kind, key))"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS links_last_used ON links (last_used)")
+        self.db.commit()
+        # Kayıt sayısının üst sınırı: yeni kayıtlar ekler, güncellemeler de
+        # eklenmiş sayılır; gerçek sayı sadece sınır aşılınca sorgulanır
+        self.count = self.db.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+
+    def lookup(self, kind, key):
+        """
+        (bulundu_mu, değer) döndürür. Negatif kayıtlarda değer None'dır.
+        Süresi dolmuş kayıtlar bulunmamış sayılır.
+        """
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT value, expires_at FROM links WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            if row is None:
+                self.stats["miss"] += 1
+                return False, None
+            value, expires_at = row
+            if expires_at < now:
+                self.stats["expired"] += 1
+                return False, None
+            self.db.execute(
+                "UPDATE links SET last_used = ? WHERE kind = ? AND key = ?", (now, kind, key)
+            )
+            self.db.commit()
+            if value is None:
+                self.stats["negative_hit"] += 1
+                return True, None
+            self.stats["hit"] += 1
+            return True, json.loads(value)
+
+    def store(self, kind, key, value):
+        """Değeri saklar. Boş değerler (None, [], '') negatif kayıt olarak tutulur."""
+        now = time.time()
+        if value:
+            encoded = json.dumps(value, ensure_ascii=False)
+            expires_at = now + self.ttls.get(kind, DEFAULT_TTL)
+        else:
+            encoded = None
+            expires_at = now + self.negative_ttl
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO links (kind, key, value, expires_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (kind, key, encoded, expires_at, now),
+            )
+            self.stats["stored"] += 1
+            self.count += 1
+            if self.count > self.max_entries:
+                self._evict()
+            self.db.commit()
+
+    def resolve(self, kind, key, resolver):
+        """Önbellekte varsa değeri döndürür, yoksa 'resolver(key)' ile çözüp saklar."""
+        found, value = self.lookup(kind, key)
+        if found:
+            return value
+        value = resolver(key)
+        self.store(kind, key, value)
+        return value
+
+    def _evict(self):
+        self.count = self.db.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+        if self.count <= self.max_entries:
+            return
+        overflow = self.count - int(self.max_entries * EVICT_TO)
+        self.db.execute(
+            "DELETE FROM links WHERE rowid IN"
+            " (SELECT rowid FROM links ORDER BY last_used LIMIT ?)",
+            (overflow,),
+        )
+        self.count -= overflow
+        self.stats["evicted"] += overflow
+
+    def purge_expired(self):
+        """Süresi dolmuş kayıtları siler."""
+        with self.lock:
+            self.db.execute("DELETE FROM links WHERE expires_at < ?", (time.time(),))
+            self.db.commit()
+
+    def summary(self):
+        s = self.stats
+        lookups = s["hit"] + s["negative_hit"] + s["miss"] + s["expired"]
+        ratio = (s["hit"] + s["negative_hit"]) / lookups * 100 if lookups else 0.0
+        return (f"Link önbelleği: {s['hit']} isabet, {s['negative_hit']} negatif isabet, "
+                f"{s['miss']} ıska, {s['expired']} süresi dolmuş "
+                f"(isabet oranı %{ratio:.1f}), {s['stored']} yeni kayıt, {s['evicted']} kayıt silindi.")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,326 @@
+"""
+Ortak M3U yardımcıları.
+
+Tüm betikler EXTINF satırlarını bu modül üzerinden okur ve yazar:
+- parse_extinf / iter_entries: Önceden derlenmiş tek geçişli ayrıştırıcı
+- format_extinf / format_entry: Tırnakları güvenli hale getiren yazıcı
+
+Mikro benchmark için: python m3u.py --bench 100000
+"""
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+HEADER = "#EXTM3U"
+
+# Tek bir özellik: anahtar="değer", anahtar='değer' veya tırnaksız anahtar=değer.
+# Tırnaksız değer bir sonraki özelliğe, virgüle veya noktalı virgüle kadar sürer.
+_ATTR_RE = re.compile(
+    r"""([A-Za-z0-9_-]+)=(?:"([^"]*)"|'([^']*)'|([^,;"']*?)(?=\s+[A-Za-z0-9_-]+=|[,;]|$))"""
+)
+
+# Satırın tamamı tek eşleşmede: süre, özellik bloğu ve görünen ad
+_EXTINF_RE = re.compile(
+    r"""#EXTINF:\s*(-?\d+(?:\.\d+)?)?"""
+    r"""((?:\s*[A-Za-z0-9_-]+=(?:"[^"]*"|'[^']*'|[^,;"']*?(?=\s+[A-Za-z0-9_-]+=|[,;]|$));?)*)"""
+    r"""[^,]*,?(.*)""",
+    re.IGNORECASE,
+)
+
+# Kayıtta ayrı alan olarak tutulan özellikler ve yazılma sırası
+_KNOWN_ATTRS = (
+    ('tvg-id', 'tvg_id'),
+    ('tvg-name', 'tvg_name'),
+    ('tvg-logo', 'tvg_logo'),
+    ('tvg-rec', 'tvg_rec'),
+    ('group-title', 'group_title'),
+)
+_ATTR_SLOTS = dict(_KNOWN_ATTRS)
+
+
+class M3UEntry:
+    """Tek bir kanal / film kaydı. __slots__ sayesinde hafızada küçük yer kaplar."""
+
+    __slots__ = ('name', 'url', 'duration', 'tvg_id', 'tvg_name', 'tvg_logo',
+                 'tvg_rec', 'group_title', 'extra', 'extra_lines', 'line')
+
+    def __init__(self, name='', url=None, duration='-1', tvg_id=None, tvg_name=None,
+                 tvg_logo=None, tvg_rec=None, group_title=None, extra=None, extra_lines=None, line=None):
+        self.name = name
+        self.url = url
+        self.duration = duration
+        self.tvg_id = tvg_id
+        self.tvg_name = tvg_name
+        self.tvg_logo = tvg_logo
+        self.tvg_rec = tvg_rec
+        self.group_title = group_title
+        # Bilinmeyen özellikler (ör. catchup="...") sırası korunarak saklanır
+        self.extra = extra
+        # EXTINF ile URL arasındaki ek satırlar (ör. #EXTVLCOPT:...)
+        self.extra_lines = extra_lines
+        # Ayrıştırılan orijinal EXTINF satırı; kayıt değişmediyse yeniden
+        # üretmek yerine aynen yazılabilir
+        self.line = line
+
+    def __repr__(self):
+        return f"M3UEntry(name={self.name!r}, group_title={self.group_title!r}, url={self.url!r})"
+
+
+def parse_extinf(line):
+    """
+    EXTINF satırını tek geçişte ayrıştırır ve M3UEntry döndürür.
+    Tüm özellikler (tvg-id, tvg-logo, tvg-rec, group-title ...) ve görünen ad
+    aynı taramada alınır.
+    """
+    entry = M3UEntry(line=line)
+    match = _EXTINF_RE.match(line)
+    if not match:
+        return entry
+    duration, attrs, name = match.groups()
+    if duration:
+        entry.duration = duration
+    entry.name = name.strip()
+
+    for key, double_quoted, single_quoted, bare in _ATTR_RE.findall(attrs):
+        key = key.lower()
+        if double_quoted or single_quoted:
+            value = double_quoted or single_quoted
+        else:
+            value = bare.strip()
+        slot = _ATTR_SLOTS.get(key)
+        if slot:
+            setattr(entry, slot, value)
+        else:
+            if entry.extra is None:
+                entry.extra = {}
+            entry.extra[key] = value
+    return entry
+
+
+def iter_entries(lines):
+    """
+    Satır akışından M3UEntry kayıtları üretir (generator).
+    EXTINF ile URL arasındaki '#' satırları 'extra_lines' içinde tutulur.
+    """
+    entry = None
+    for line in lines:
+        line = line.strip()
+        if not line: continue
+
+        if line.startswith('#EXTINF:'):
+            entry = parse_extinf(line)
+        elif line.startswith('#'):
+            if entry is not None and line != HEADER:
+                if entry.extra_lines is None:
+                    entry.extra_lines = []
+                entry.extra_lines.append(line)
+        elif entry is not None:
+            entry.url = line
+            yield entry
+            entry = None
+
+
+def _escape(value):
+    """Özellik değerinde satırı bozacak karakterleri temizler."""
+    return str(value).replace('"', "'").replace('\r', ' ').replace('\n', ' ')
+
+
+def format_extinf(entry):
+    """M3UEntry kaydını EXTINF satırına çevirir (sonunda satır sonu yoktur)."""
+    parts = [f"#EXTINF:{entry.duration}"]
+    for key, slot in _KNOWN_ATTRS:
+        value = getattr(entry, slot)
+        if value is not None:
+            parts.append(f'{key}="{_escape(value)}"')
+    if entry.extra:
+        for key, value in entry.extra.items():
+            parts.append(f'{key}="{_escape(value)}"')
+    name = str(entry.name or '').replace('\r', ' ').replace('\n', ' ')
+    return f"{' '.join(parts)},{name}"
+
+
+def format_entry(entry, keep_line=False):
+    """
+    EXTINF, ek satırlar ve URL'yi içeren tam M3U bloğunu döndürür.
+    keep_line=True ise (kayıt ayrıştırıldıktan sonra değiştirilmediyse)
+    orijinal EXTINF satırı yeniden üretilmeden aynen yazılır.
+    """
+    lines = [entry.line if keep_line and entry.line else format_extinf(entry)]
+    if entry.extra_lines:
+        lines.extend(entry.extra_lines)
+    lines.append(entry.url)
+    return "\n".join(lines) + "\n"
+
+
+# --- Sıralı Yazıcı ---
+
+class OrderedM3UWriter:
+    """
+    Birden çok iş parçacığından gelen kayıtları tek bir yazıcı iş parçacığıyla
+    dosyaya yazar. İşçiler kayıtlarını sınırlı bir kuyruğa bırakıp hemen
+    devam eder; sıralama yazıcı tarafında yapılır.
+
+    order='index': Kayıtlar 'put' ile verilen sıra numarasına göre yazılır.
+                   Sırası gelmeyen kayıtlar bekletilir, gelenler hemen yazılır.
+    order='group': Kayıtlar group-title'a göre gruplanıp sonda yazılır.
+
+    Çıktı önce geçici dosyaya yazılır, 'close' ile atomik olarak taşınır.
+    """
+
+    def __init__(self, output_file, order='index', queue_size=256, buffer_size=1 << 16):
+        if order not in ('index', 'group'):
+            raise ValueError(f"Geçersiz sıralama: {order}")
+        self.output_file = output_file
+        self.order = order
+        self.tmp_file = f"{output_file}.tmp"
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.buffer_size = buffer_size
+        self.written = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._consume, name="m3u-writer", daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+    def start(self):
+        self.thread.start()
+
+    def put(self, index, entry):
+        """
+        Sıra numarasıyla bir kayıt (veya aynı sıradaki kayıtların listesini)
+        bırakır. Atlanan filmler için entry=None verilir.
+        """
+        self.queue.put((index, entry))
+
+    def close(self, commit=True):
+        self.queue.put(None)
+        self.thread.join()
+        if commit and self.error is None:
+            os.replace(self.tmp_file, self.output_file)
+        elif os.path.exists(self.tmp_file):
+            os.remove(self.tmp_file)
+        if self.error is not None:
+            raise self.error
+
+    def _consume(self):
+        pending = {}
+        groups = {}
+        next_index = 0
+        try:
+            with open(self.tmp_file, 'w', encoding='utf-8', buffering=self.buffer_size) as f:
+                f.write(HEADER + "\n")
+                while True:
+                    item = self.queue.get()
+                    if item is None:
+                        break
+                    index, entry = item
+                    if self.order == 'group':
+                        if entry:
+                            first = entry[0] if isinstance(entry, list) else entry
+                            groups.setdefault(first.group_title or '', []).append((index, entry))
+                        continue
+                    pending[index] = entry
+                    while next_index in pending:
+                        self._write(f, pending.pop(next_index))
+                        next_index += 1
+
+                # Eksik sıra numarası kalırsa geri kalanlar sırayla yazılır
+                for index in sorted(pending):
+                    self._write(f, pending[index])
+                for group_name in sorted(groups):
+                    for index, entry in sorted(groups[group_name], key=lambda item: item[0]):
+                        self._write(f, entry)
+        except Exception as e:
+            self.error = e
+            # Üreticiler kilitlenmesin diye kuyruk boşaltılır
+            while self.queue.get() is not None:
+                pass
+
+    def _write(self, f, entry):
+        if isinstance(entry, list):
+            for item in entry:
+                self._write(f, item)
+        elif entry is not None:
+            f.write(format_entry(entry))
+            self.written += 1
+
+
+# --- Mikro Benchmark ---
+
+def _synthetic_playlist(count):
+    groups = ['Spor', 'Türk Ulusal', 'Haber', 'Film', 'Çocuk', 'Музыка']
+    yield HEADER
+    for i in range(count):
+        group = groups[i % len(groups)]
+        yield (f'#EXTINF:-1 tvg-id="ch{i}" tvg-logo="http://logo/{i}.png" '
+               f'tvg-rec="{i % 8}" group-title="{group}",Kanal {i} HD')
+        yield f"http://example.com/live/{i}/index.m3u8"
+
+
+def _legacy_group_titles(lines):
+    """Eski yöntem: Her kanal için derlenmemiş, IGNORECASE re.search."""
+    last_extinf = None
+    for line in lines:
+        if line.startswith('#EXTINF:'):
+            last_extinf = line
+        elif last_extinf and not line.startswith('#'):
+            group_match = re.search(r'group-title=["\']?(.*?)["\']?([,;]|$)', last_extinf, re.IGNORECASE)
+            yield group_match.group(1).strip() if group_match else "DIGER"
+            last_extinf = None
+
+
+def _legacy_all_attributes(lines):
+    """Eski yöntemle tüm özellikler: Her özellik için ayrı re.search."""
+    last_extinf = None
+    for line in lines:
+        if line.startswith('#EXTINF:'):
+            last_extinf = line
+        elif last_extinf and not line.startswith('#'):
+            record = {}
+            for key, _ in _KNOWN_ATTRS:
+                match = re.search(key + r'=["\']?(.*?)["\']?([,;\s]|$)', last_extinf, re.IGNORECASE)
+                record[key] = match.group(1) if match else None
+            record['name'] = last_extinf.rsplit(',', 1)[-1]
+            record['url'] = line
+            yield record
+            last_extinf = None
+
+
+def run_benchmark(count=100000):
+    lines = list(_synthetic_playlist(count))
+    print(f"--- M3U mikro benchmark: {count} kayıt ---")
+
+    start = time.perf_counter()
+    legacy = sum(1 for _ in _legacy_group_titles(lines))
+    legacy_time = time.perf_counter() - start
+    print(f"Eski group-title regex'i : {legacy_time:.3f} sn ({legacy / legacy_time:,.0f} kayıt/sn, sadece grup)")
+
+    start = time.perf_counter()
+    legacy = sum(1 for _ in _legacy_all_attributes(lines))
+    legacy_time = time.perf_counter() - start
+    print(f"Eski yöntem, tüm özellik : {legacy_time:.3f} sn ({legacy / legacy_time:,.0f} kayıt/sn, özellik başına arama)")
+
+    start = time.perf_counter()
+    entries = list(iter_entries(lines))
+    parse_time = time.perf_counter() - start
+    print(f"Tek geçişli ayrıştırıcı  : {parse_time:.3f} sn ({len(entries) / parse_time:,.0f} kayıt/sn, tüm özellikler)")
+
+    start = time.perf_counter()
+    for entry in entries:
+        format_entry(entry)
+    format_time = time.perf_counter() - start
+    print(f"Yazıcı (format_entry)    : {format_time:.3f} sn ({len(entries) / format_time:,.0f} kayıt/sn)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--bench':
+        run_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
+    else:
+        print("Kullanım: python m3u.py --bench [kayıt_sayısı]")
@@ -0,0 +1,368 @@
+"""
+Tüm betikler için ortak ölçüm (metrik) katmanı.
+
+- timer / timed: Bir kod bloğunun veya fonksiyonun süresini "aşama" (stage)
+  adıyla kaydeder. Hata fırlatan çağrılar hata sayılır; count_empty=True
+  verilen fonksiyonlarda boş sonuçlar (None, [], ...) ayrıca sayılır.
+- instrument_session: requests / cloudscraper oturumundaki her isteği sunucu
+  (host) bazında kaydeder: süre, durum kodu, indirilen bayt.
+- trace_config: aiohttp için aynı kayıtlar; ayrıca DNS çözümleme ve bağlantı
+  kurma (TCP + TLS) süreleri ayrı aşamalar olarak tutulur.
+- count: Serbest sayaçlar (önbellek isabeti, yazılan kayıt ...).
+
+Çalışma sonunda write_report ile aşama ve sunucu başına istek sayısı, hata
+oranı, p50 / p95 süreleri ve bayt miktarını içeren bir JSON rapor yazılır.
+GitHub Actions çalışmaları bu raporlar karşılaştırılarak izlenebilir.
+
+Betiklerde kullanım:
+    parser = argparse.ArgumentParser(...)
+    metrics.add_arguments(parser)      # --metrics, --profile, --profile-output
+    args = parser.parse_args()
+    metrics.run(args, main_function, ...)
+"""
+import cProfile
+import functools
+import inspect
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+def percentile(sorted_values, p):
+    """Sıralı listede en yakın sıra (nearest-rank) yöntemiyle yüzdelik değer."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def host_of(url):
+    return urlsplit(url).hostname or "?"
+
+
+def is_empty(result):
+    """Fonksiyon sonucu boş mu? (None, [], {}, "" veya ilk elemanı None olan demet)"""
+    if isinstance(result, tuple):
+        return not result or result[0] is None
+    return not result
+
+
+class Stat:
+    """Tek bir aşamanın veya sunucunun ölçümleri."""
+
+    __slots__ = ('samples', 'errors', 'empty', 'bytes', 'statuses')
+
+    def __init__(self):
+        self.samples = []
+        self.errors = 0
+        self.empty = 0
+        self.bytes = 0
+        self.statuses = {}
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        count = len(ordered)
+        result = {
+            'count': count,
+            'errors': self.errors,
+            'error_rate': round(self.errors / count, 4) if count else 0.0,
+            'p50_ms': percentile(ordered, 50),
+            'p95_ms': percentile(ordered, 95),
+            'max_ms': ordered[-1] if ordered else None,
+            'total_ms': round(sum(ordered), 1),
+        }
+        if self.empty:
+            result['empty'] = self.empty
+        if self.bytes:
+            result['bytes'] = self.bytes
+        if self.statuses:
+            result['statuses'] = dict(sorted(self.statuses.items()))
+        return result
+
+
+class Metrics:
+    """İş parçacığı güvenli ölçüm kaydı. Modül düzeyindeki 'metrics' örneği kullanılır."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Tüm ölçümleri siler (aynı süreçte birden çok ölçüm için, ör. benchmark.py)."""
+        self.started = time.time()
+        self.stages = {}
+        self.hosts = {}
+        self.counters = {}
+
+    def _stat(self, table, name):
+        stat = table.get(name)
+        if stat is None:
+            stat = table[name] = Stat()
+        return stat
+
+    def record(self, stage, elapsed_ms, error=False, empty=False):
+        with self.lock:
+            stat = self._stat(self.stages, stage)
+            stat.samples.append(round(elapsed_ms, 3))
+            stat.errors += error
+            stat.empty += empty
+
+    def record_request(self, url, elapsed_ms, status=None, size=0, error=False):
+        """Tek bir HTTP isteğini sunucu bazında kaydeder. 4xx/5xx cevaplar hata sayılır."""
+        error = error or (status is not None and status >= 400)
+        with self.lock:
+            stat = self._stat(self.hosts, host_of(url))
+            stat.samples.append(round(elapsed_ms, 3))
+            stat.errors += error
+            stat.bytes += size or 0
+            key = f"{status // 100}xx" if status else "hata"
+            stat.statuses[key] = stat.statuses.get(key, 0) + 1
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def count_stats(self, prefix, stats):
+        """Bir istatistik sözlüğünü ('hit': 3, 'miss': 1 ...) 'önek.ad' sayaçları olarak ekler."""
+        for name, value in stats.items():
+            self.count(f"{prefix}.{name}", value)
+
+    @contextmanager
+    def timer(self, stage):
+        """with metrics.timer("aşama"): ... bloğunun süresini kaydeder."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record(stage, (time.perf_counter() - start) * 1000, error=True)
+            raise
+        self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def timed(self, stage=None, count_empty=False):
+        """
+        Fonksiyon süresini ölçen dekoratör (async fonksiyonlar da desteklenir).
+        Aşama adı verilmezse fonksiyon adı kullanılır. count_empty=True ise
+        hata yerine boş sonuç döndüren çözücülerin başarısızlıkları da sayılır.
+        """
+        def decorator(func):
+            name = stage or func.__name__
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        result = await func(*args, **kwargs)
+                    except BaseException:
+                        self.record(name, (time.perf_counter() - start) * 1000, error=True)
+                        raise
+                    self.record(name, (time.perf_counter() - start) * 1000, empty=count_empty and is_empty(result))
+                    return result
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException:
+                    self.record(name, (time.perf_counter() - start) * 1000, error=True)
+                    raise
+                self.record(name, (time.perf_counter() - start) * 1000, empty=count_empty and is_empty(result))
+                return result
+            return wrapper
+        return decorator
+
+    def instrument_session(self, session):
+        """
+        requests.Session (veya cloudscraper) örneğinin her isteğini kaydeder.
+        Süre, gövde okunana kadar geçen süredir; stream=True isteklerde
+        başlıkların gelişine kadar ölçülür ve bayt olarak Content-Length alınır.
+        """
+        request = session.request
+
+        @functools.wraps(request)
+        def timed_request(method, url, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                response = request(method, url, *args, **kwargs)
+            except Exception:
+                self.record_request(url, (time.perf_counter() - start) * 1000, error=True)
+                raise
+            if kwargs.get('stream'):
+                size = int(response.headers.get('Content-Length') or 0)
+            else:
+                size = len(response.content or b'')
+            self.record_request(url, (time.perf_counter() - start) * 1000, response.status_code, size)
+            return response
+
+        session.request = timed_request
+        return session
+
+    def trace_config(self):
+        """
+        aiohttp.ClientSession(trace_configs=[...]) için TraceConfig döndürür.
+        İstekler sunucu bazında, DNS ve bağlantı kurma süreleri 'dns' ve
+        'connect' aşamaları olarak kaydedilir.
+        """
+        import aiohttp
+
+        def elapsed_ms(context):
+            return (time.perf_counter() - context.start) * 1000
+
+        async def on_request_start(_, context, __):
+            context.start = time.perf_counter()
+
+        async def on_request_end(_, context, params):
+            size = int(params.response.headers.get('Content-Length') or 0)
+            self.record_request(str(params.url), elapsed_ms(context), params.response.status, size)
+
+        async def on_request_exception(_, context, params):
+            self.record_request(str(params.url), elapsed_ms(context), error=True)
+
+        async def on_dns_start(_, context, __):
+            context.dns_start = time.perf_counter()
+
+        async def on_dns_end(_, context, __):
+            self.record('dns', (time.perf_counter() - context.dns_start) * 1000)
+
+        async def on_connect_start(_, context, __):
+            context.connect_start = time.perf_counter()
+
+        async def on_connect_end(_, context, __):
+            self.record('connect', (time.perf_counter() - context.connect_start) * 1000)
+
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(on_request_start)
+        config.on_request_end.append(on_request_end)
+        config.on_request_exception.append(on_request_exception)
+        config.on_dns_resolvehost_start.append(on_dns_start)
+        config.on_dns_resolvehost_end.append(on_dns_end)
+        config.on_connection_create_start.append(on_connect_start)
+        config.on_connection_create_end.append(on_connect_end)
+        return config
+
+    def report(self):
+        """Ölçümlerin JSON'a yazılabilir özetini döndürür."""
+        finished = time.time()
+        with self.lock:
+            stages = {name: stat.summary() for name, stat in sorted(self.stages.items())}
+            hosts = {name: stat.summary() for name, stat in sorted(self.hosts.items())}
+            counters = dict(sorted(self.counters.items()))
+        report = {
+            'script': os.path.basename(sys.argv[0]),
+            'started': datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec='seconds'),
+            'finished': datetime.fromtimestamp(finished, timezone.utc).isoformat(timespec='seconds'),
+            'wall_seconds': round(finished - self.started, 2),
+            'requests': sum(stat['count'] for stat in hosts.values()),
+            'bytes': sum(stat.get('bytes', 0) for stat in hosts.values()),
+            'stages': stages,
+            'hosts': hosts,
+            'counters': counters,
+        }
+        # GitHub Actions çalışmalarını karşılaştırmak için
+        github = {key: os.environ[env] for key, env in (('run_id', 'GITHUB_RUN_ID'), ('sha', 'GITHUB_SHA'),
+                                                         ('workflow', 'GITHUB_WORKFLOW'))
+                  if os.environ.get(env)}
+        if github:
+            report['github'] = github
+        return report
+
+    def write_report(self, path):
+        report = self.report()
+        tmp_file = f"{path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_file, path)
+        print(f"Ölçüm raporu '{path}' dosyasına yazıldı: {report['requests']} istek, "
+              f"{len(report['stages'])} aşama, {report['wall_seconds']} sn.")
+        return report
+
+
+metrics = Metrics()
+timer = metrics.timer
+timed = metrics.timed
+count = metrics.count
+count_stats = metrics.count_stats
+record_request = metrics.record_request
+instrument_session = metrics.instrument_session
+trace_config = metrics.trace_config
+
+
+# --- Profil Çıkarma (isteğe bağlı) ---
+
+@contextmanager
+def profiling(mode=None, output_file=None):
+    """
+    mode='cprofile': cProfile ile profil çıkarır, .prof dosyası yazar ve en
+    pahalı 25 fonksiyonu listeler. mode='pyinstrument': pyinstrument kuruluysa
+    HTML rapor yazar. İkisi de yalnızca ana iş parçacığını ölçer; işçi
+    iş parçacıkları için timer/timed kayıtlarına bakılmalıdır.
+    """
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("Uyarı: 'pyinstrument' kurulu değil, cProfile kullanılıyor (pip install pyinstrument).")
+            mode = "cprofile"
+    if not mode:
+        yield
+        return
+
+    name = os.path.splitext(os.path.basename(sys.argv[0]) or "profil")[0]
+    if mode == "pyinstrument":
+        output_file = output_file or f"{name}_profil.html"
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+            print(f"Profil '{output_file}' dosyasına yazıldı.")
+        return
+
+    output_file = output_file or f"{name}_profil.prof"
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_file)
+        print(f"Profil '{output_file}' dosyasına yazıldı (snakeviz / pstats ile açılabilir).")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+
+
+# --- Komut Satırı ---
+
+def add_arguments(parser):
+    """Betiğin argparse ayrıştırıcısına ölçüm ve profil seçeneklerini ekler."""
+    parser.add_argument("--metrics", metavar="DOSYA", default=None,
+                        help="Çalışma sonunda aşama/sunucu ölçümlerini bu JSON dosyasına yaz")
+    parser.add_argument("--profile", choices=PROFILERS, default=None,
+                        help="Çalışmanın profilini çıkar (cprofile veya pyinstrument)")
+    parser.add_argument("--profile-output", default=None, help="Profil çıktısının yazılacağı dosya")
+    return parser
+
+
+def run(args, func, *func_args, **func_kwargs):
+    """
+    func'ı istenirse profil altında çalıştırır; hata veya sys.exit ile
+    bitse de --metrics verilmişse raporu yazar.
+    """
+    try:
+        with profiling(args.profile, args.profile_output):
+            return func(*func_args, **func_kwargs)
+    finally:
+        if args.metrics:
+            metrics.write_report(args.metrics)
@@ -0,0 +1,318 @@
+"""
+Birden çok M3U listesini tek listede birleştirir ve tekrarları ayıklar.
+
+Her kanal için iki anahtar hesaplanır:
+- URL anahtarı: Aynı yayın adresi ikinci kez gelirse doğrudan atlanır.
+- Başlık anahtarı: Ad küçük harfe çevrilip aksanları atılır, kalite
+  (HD, FHD, 4K ...) ve zaman kaydırma (+2, +4 ...) ekleri ayıklanır.
+  Örn. "Первый канал", "Первый канал HD" ve "Первый канал +2" aynı anahtara
+  düşer ve tek bir kanal altında toplanır.
+
+Anahtarlar sözlükte (hash) tutulduğu için birebir eşleşme O(1)'dir.
+Tek harf eksik yazılmış adlar ("Discovery Chanel") için asıl anahtarlar
+ilk ve ikinci yarılarıyla (imza, uzunluk ve ilk/son harfle birlikte)
+sözlüğe eklenir: tek harf farklı iki anahtarın yarılarından biri mutlaka
+aynıdır. Yaklaşık eşleşmede sadece bu küçük kovalardaki adaylar
+karşılaştırılır, O(n²) karşılaştırma yapılmaz.
+Ülke kodu veya numarası farklı adlar hiçbir zaman birleştirilmez.
+Dizi bölümleri ("1. Sezon 2. Bölüm - CizgiDuo") her dizide aynı adı taşıdığı
+için yalnızca aynı grup (dizi adı; grup yoksa aynı liste) içinde birleştirilir.
+
+Her kanalın en iyi kaynağı (zaman kaydırmasız, en yüksek kalite, listelerin
+veriliş sırası) ana kayıt olarak, diğerleri "(Yedek N)" adıyla hemen
+arkasına yazılır.
+
+Kullanım:
+    python playlist_merge.py -o birlesik.m3u donusturulmus_liste.m3u8 yelon.m3u "m3u_playlists/*.m3u"
+"""
+import argparse
+import functools
+import glob
+import os
+import re
+import time
+import unicodedata
+
+from m3u import HEADER, M3UEntry, iter_entries, format_entry
+
+# Kalite eki -> sıralama puanı (büyük olan daha iyi)
+QUALITY_SCORES = {
+    '8k': 6, '4k': 5, 'uhd': 5, '2160p': 5, 'fhd': 4, '1080p': 4, '1080': 4,
+    'hd': 3, '720p': 3, '720': 3, 'hq': 3, 'hevc': 2, 'h265': 2, 'sd': 1, '576p': 1, '480p': 1,
+    'orig': 0,
+}
+_QUALITY_RE = re.compile(r'(?<!\w)(' + '|'.join(sorted(QUALITY_SCORES, key=len, reverse=True)) + r')(?!\w)')
+_TIMESHIFT_RE = re.compile(r'(?<![\w+-])([+-])\s?(\d{1,2})(?!\w)')
+# Parantez içindeki bölge / yayın bilgisi: "Первый канал +4 (Алтай)"
+_BRACKETS_RE = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+# Addaki son kelime ülke kodu olabilir: "Comedy Central HD DE"
+_REGION_RE = re.compile(r'\s([A-Z]{2})\s*$')
+_NOT_REGIONS = {'HD', 'SD', 'HQ', 'TV', 'FM'}
+_NUMBERED_RE = re.compile(r'\w*\d\w*')
+_NON_WORD_RE = re.compile(r'[\W_]+')
+# Dizi bölümü adları: "1. Sezon 2. Bölüm", "Season 1 Episode 2", "S01E02"
+_EPISODE_RE = re.compile(r'(?<!\w)(?:\d+\.?\s*(?:sezon|bölüm)|(?:sezon|bölüm|season|episode)\s*\d+'
+                         r'|s\d{1,2}\s?e\d{1,3})(?!\w)', re.IGNORECASE)
+
+
+def _fold(text):
+    """Küçük harfe çevirir ve aksanları atar (ü -> u, ş -> s, й -> и ...)."""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize('NFKD', text.casefold().replace('ı', 'i'))
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def _keep_timeshift(match):
+    """Parantezi atar; içinde zaman kaydırma varsa ("(+4)") onu bırakır."""
+    shift = _TIMESHIFT_RE.search(match.group(0))
+    return f" {shift.group(1)}{shift.group(2)} " if shift else ' '
+
+
+@functools.lru_cache(maxsize=65536)
+def title_key(name):
+    """
+    Kanal adından (anahtar, imza, kalite puanı, zaman kaydırma saati) üretir.
+    Zaman kaydırma işaretlidir: "+4" -> 4, "-1" -> -1.
+    Anahtar harf ve rakamlardan, varsa '|' ve ülke kodundan oluşur.
+    İmza (ülke kodu, numaralı kelimeler) yaklaşık eşleşmede birebir aranır;
+    böylece "TRT 1" / "TRT 2", "Sky Sport 1" / "Sky Sport F1" veya farklı
+    ülke yayınları birleştirilmez.
+    """
+    name = name or ''
+    region = ''
+    match = _REGION_RE.search(name)
+    if match and match.group(1) not in _NOT_REGIONS:
+        region = match.group(1).lower()
+        name = name[:match.start()]
+    folded = _fold(name)
+    quality = 0
+    for token in _QUALITY_RE.findall(folded):
+        quality = max(quality, QUALITY_SCORES[token])
+    shift = 0
+    folded = _BRACKETS_RE.sub(_keep_timeshift, folded)
+    match = _TIMESHIFT_RE.search(folded)
+    if match:
+        shift = int(match.group(2)) * (-1 if match.group(1) == '-' else 1)
+    stripped = _TIMESHIFT_RE.sub(' ', _QUALITY_RE.sub(' ', folded))
+    key = _NON_WORD_RE.sub('', stripped) or _NON_WORD_RE.sub('', folded)
+    signature = (region, tuple(_NUMBERED_RE.findall(stripped)))
+    if region:
+        key = f"{key}|{region}"
+    return key, signature, quality, shift
+
+
+def series_scope(entry, source_index):
+    """
+    Bölüm adı taşıyan kayıtlar için birleştirme kapsamı: grup adı (dizi),
+    grup yoksa kaynak listenin sırası. Canlı kanal ve filmlerde boştur,
+    bunlar listeler arasında serbestçe birleştirilir.
+    """
+    if not _EPISODE_RE.search(entry.name or ''):
+        return ''
+    group = _NON_WORD_RE.sub(' ', _fold(entry.group_title or '')).strip()
+    return group or f"#{source_index}"
+
+
+class MergedChannel:
+    """Aynı kanala ait tüm kaynaklar. 'sources' sıralanınca ilk eleman ana kayıttır."""
+
+    __slots__ = ('key', 'sources')
+
+    def __init__(self, key):
+        self.key = key
+        # (sıralama anahtarı, M3UEntry)
+        self.sources = []
+
+    def ranked(self):
+        return [entry for _, entry in sorted(self.sources, key=lambda item: item[0])]
+
+
+def _one_letter_apart(a, b):
+    """
+    Anahtarlardan biri diğerine tek harf eklenmiş hali mi? ("discoverychanel" /
+    "discoverychannel"). Harf değiştirme ("Hollywood" / "Bollywood", "Kanal D" /
+    "Kanal V") ve ilk 3 harfteki farklar ("TRT" / "TGRT") ayrı kanal sayılır.
+    """
+    if abs(len(a) - len(b)) != 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return i >= 3 and a[i:] == b[i + 1:]
+
+
+class MergeIndex:
+    """
+    Başlık ve URL anahtarlarıyla kanalları toplar.
+    fuzzy: Tek harf eksik/fazla yazılmış adlar da birleştirilsin mi?
+    """
+
+    # Yaklaşık eşleşme yalnızca bu uzunluktaki ve daha uzun anahtarlarda yapılır
+    FUZZY_MIN_LENGTH = 8
+
+    def __init__(self, fuzzy=True):
+        self.fuzzy = fuzzy
+        self.channels = {}
+        self.urls = set()
+        # Yaklaşık eşleşmeyle bulunan anahtar -> kanalın asıl anahtarı
+        self.aliases = {}
+        # (imza, uzunluk, durum, yarı, harf) -> asıl anahtarlar; bkz. _index_key
+        self.halves = {}
+        self.stats = {'entries': 0, 'url_duplicates': 0, 'exact': 0, 'fuzzy': 0}
+
+    def _index_key(self, key, signature):
+        """
+        Kısa anahtar a (n harf), uzun anahtar b'nin i. harfi silinerek elde
+        edilmişse (i >= 3), h = n // 2 için üç durumdan biri geçerlidir:
+        - h <= i < n: a[:h] == b[:h] ve son harfler aynı ('p')
+        - 3 <= i < h: a[h:] == b[h + 1:] ve ilk 3 harf aynı ('s')
+        - i == n: a == b[:-1] ('e')
+        Anahtar her durum için hem uzun hem kısa (büyük harfli rol) rolüyle eklenir.
+        """
+        halves = self.halves
+        size = len(key)
+        h = (size - 1) // 2
+        for bucket in ((signature, size, 'p', key[:h], key[-1]),
+                       (signature, size, 's', key[h + 1:], key[:3]),
+                       (signature, size, 'e', key[:-1])):
+            halves.setdefault(bucket, []).append(key)
+        h = size // 2
+        for bucket in ((signature, size, 'P', key[:h], key[-1]),
+                       (signature, size, 'S', key[h:], key[:3]),
+                       (signature, size, 'E', key)):
+            halves.setdefault(bucket, []).append(key)
+
+    def _candidates(self, key, signature):
+        """Tek harf eksik/fazla olabilecek asıl anahtarlar (bkz. _index_key)."""
+        halves = self.halves
+        size = len(key)
+        # Bir harf uzun asıl anahtarlar (bu anahtar kısa rolde)
+        h = size // 2
+        yield from halves.get((signature, size + 1, 'p', key[:h], key[-1]), ())
+        yield from halves.get((signature, size + 1, 's', key[h:], key[:3]), ())
+        yield from halves.get((signature, size + 1, 'e', key), ())
+        # Bir harf kısa asıl anahtarlar (bu anahtar uzun rolde)
+        h = (size - 1) // 2
+        yield from halves.get((signature, size - 1, 'P', key[:h], key[-1]), ())
+        yield from halves.get((signature, size - 1, 'S', key[h + 1:], key[:3]), ())
+        yield from halves.get((signature, size - 1, 'E', key[:-1]), ())
+
+    def _find_similar(self, key, signature):
+        """Tek harf eksik veya fazla asıl anahtarı bulur; adaylar _one_letter_apart ile doğrulanır."""
+        for candidate in self._candidates(key, signature):
+            if _one_letter_apart(key, candidate):
+                return candidate
+        return None
+
+    def add(self, entry, source_index, position):
+        self.stats['entries'] += 1
+        if not entry.url or entry.url in self.urls:
+            self.stats['url_duplicates'] += 1
+            return
+        self.urls.add(entry.url)
+
+        key, signature, quality, shift = title_key(entry.name)
+        scope = series_scope(entry, source_index)
+        if scope:
+            # Farklı dizilerin aynı adlı bölümleri ayrı kanal olarak kalır
+            key = f"{scope}/{key}"
+            signature = (scope, signature)
+        key = self.aliases.get(key, key)
+        channel = self.channels.get(key)
+        if channel is not None:
+            self.stats['exact'] += 1
+        elif self.fuzzy and len(key) >= self.FUZZY_MIN_LENGTH:
+            similar = self._find_similar(key, signature)
+            if similar is not None:
+                self.aliases[key] = similar
+                channel = self.channels[similar]
+                self.stats['fuzzy'] += 1
+        if channel is None:
+            channel = MergedChannel(key)
+            self.channels[key] = channel
+            if self.fuzzy and len(key) >= self.FUZZY_MIN_LENGTH:
+                self._index_key(key, signature)
+
+        # Zaman kaydırmasız kaynaklar önce, sonra yüksek kalite, sonra liste sırası
+        rank = (shift != 0, abs(shift), -quality, source_index, position)
+        channel.sources.append((rank, entry))
+
+    def add_file(self, path, source_index):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for position, entry in enumerate(iter_entries(f)):
+                self.add(entry, source_index, position)
+
+
+def alternate_entry(best, source, number):
+    """Yedek kaynak için ana kaydın bilgileriyle "(Yedek N)" adlı kayıt üretir."""
+    return M3UEntry(f"{best.name} (Yedek {number})", source.url, best.duration,
+                    best.tvg_id, best.tvg_name, best.tvg_logo, best.tvg_rec,
+                    best.group_title, best.extra, source.extra_lines)
+
+
+def write_merged(index, output_file, alternates=2):
+    """Her kanalın en iyi kaynağını ve en fazla 'alternates' kadar yedeğini yazar."""
+    tmp_file = f"{output_file}.tmp"
+    written = 0
+    with open(tmp_file, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        f.write(HEADER + "\n")
+        for channel in index.channels.values():
+            ranked = channel.ranked()
+            best = ranked[0]
+            f.write(format_entry(best))
+            for number, source in enumerate(ranked[1:alternates + 1], start=1):
+                f.write(format_entry(alternate_entry(best, source, number)))
+                written += 1
+            written += 1
+    os.replace(tmp_file, output_file)
+    return written
+
+
+def expand_inputs(patterns):
+    """Dosya adlarını ve joker karakterli kalıpları (m3u_playlists/*.m3u) açar."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            print(f"Uyarı: '{pattern}' için dosya bulunamadı.")
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
+
+def merge_playlists(inputs, output_file, alternates=2, fuzzy=True):
+    """Listeleri veriliş sırasına göre önceliklendirerek birleştirir."""
+    print("--- Listeler Birleştiriliyor ---")
+    start = time.perf_counter()
+    index = MergeIndex(fuzzy)
+    for source_index, path in enumerate(expand_inputs(inputs)):
+        before = index.stats['entries']
+        index.add_file(path, source_index)
+        print(f"'{path}': {index.stats['entries'] - before} kayıt okundu.")
+
+    written = write_merged(index, output_file, alternates)
+    s = index.stats
+    elapsed = time.perf_counter() - start
+    print(f"İşlem tamam ({elapsed:.1f} sn)! {s['entries']} kayıt -> {len(index.channels)} kanal, "
+          f"{written} kayıt '{output_file}' dosyasına yazıldı. "
+          f"({s['url_duplicates']} aynı URL, {s['exact']} aynı ad, {s['fuzzy']} benzer ad birleştirildi)")
+    return index
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="M3U listelerini birleştirir ve tekrarları ayıklar.")
+    parser.add_argument('inputs', nargs='+',
+                        help="Birleştirilecek listeler (öncelik sırasıyla, joker karakter kullanılabilir)")
+    parser.add_argument('-o', '--output', default='birlesik_liste.m3u', help="Oluşturulacak M3U dosyası")
+    parser.add_argument('--alternates', type=int, default=2,
+                        help="Her kanal için yazılacak en fazla yedek kaynak sayısı")
+    parser.add_argument('--no-fuzzy', action='store_true',
+                        help="Tek harf eksik/fazla adları birleştirme, sadece birebir eşleşme kullan")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    merge_playlists(args.inputs, args.output, args.alternates, not args.no_fuzzy)
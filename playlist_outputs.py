@@ -0,0 +1,207 @@
+"""
+Dönüştürülmüş listeden türetilen ek çıktılar (iptv_converter.py kullanır).
+
+- Sıkıştırılmış kopyalar: liste.m3u8.gz / liste.m3u8.br. Sunucu/CDN bunları
+  olduğu gibi (Content-Encoding ile) verebilir.
+- Gruplara bölünmüş dosyalar: Her kategori ayrı bir dosyaya, içerik
+  özetini taşıyan bir adla yazılır (ör. spor.3f2a9c1b.m3u8). İçerik
+  değişmedikçe dosya adı da değişmediği için uzun süre önbelleğe alınabilir.
+- Manifest: Ana dosyanın ve grup dosyalarının adı, boyutu, sha256 özeti ve
+  sıkıştırılmış kopyaları. İstemciler önce bu küçük dosyayı indirir.
+
+Hepsi ana çıktı dosyası parça parça okunarak üretilir; liste hiçbir zaman
+tek parça halinde hafızaya alınmaz.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+try:
+    import brotli
+except ImportError:  # Brotli isteğe bağlıdır: pip install brotli
+    brotli = None
+
+CHUNK_SIZE = 1 << 16
+HEADER = b"#EXTM3U\n"
+
+# Kodlama adı -> dosya uzantısı
+ENCODINGS = {
+    'gzip': '.gz',
+    'br': '.br',
+}
+
+
+def available_encodings(encodings):
+    """İstenen kodlamalardan bu ortamda kullanılabilenleri döndürür."""
+    result = []
+    for encoding in encodings:
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Geçersiz sıkıştırma: {encoding}")
+        if encoding == 'br' and brotli is None:
+            print("Uyarı: 'brotli' paketi kurulu değil, .br çıktısı atlandı (pip install brotli).")
+            continue
+        result.append(encoding)
+    return result
+
+
+class CompressedSink:
+    """
+    Aynı bayt akışını istenen sıkıştırılmış kopyalara (ve istenirse düz
+    dosyaya) parça parça yazar, sha256 özetini de hesaplar. Dosyalar önce
+    geçici adlarla yazılır, 'commit' ile son adlarına taşınır.
+    """
+
+    def __init__(self, tmp_path, encodings=(), plain=True):
+        self.tmp_path = tmp_path
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self.plain = open(tmp_path, 'wb') if plain else None
+        self.gzip = None
+        self.brotli = None
+        self.brotli_file = None
+        if 'gzip' in encodings:
+            # mtime=0: Aynı içerik her seferinde aynı .gz baytlarını üretir
+            self.gzip = gzip.GzipFile(f"{tmp_path}.gz", 'wb', compresslevel=9, mtime=0)
+        if 'br' in encodings:
+            self.brotli = brotli.Compressor(quality=11)
+            self.brotli_file = open(f"{tmp_path}.br", 'wb')
+
+    def write(self, data):
+        self.hasher.update(data)
+        self.size += len(data)
+        if self.plain:
+            self.plain.write(data)
+        if self.gzip:
+            self.gzip.write(data)
+        if self.brotli:
+            self.brotli_file.write(self.brotli.process(data))
+
+    def close(self):
+        if self.plain:
+            self.plain.close()
+        if self.gzip:
+            self.gzip.close()
+        if self.brotli:
+            self.brotli_file.write(self.brotli.finish())
+            self.brotli_file.close()
+
+    def commit(self, final_path):
+        """Geçici dosyaları son adlarına taşır ve manifest kaydını döndürür."""
+        self.close()
+        record = {'file': os.path.basename(final_path), 'size': self.size,
+                  'sha256': self.hasher.hexdigest(), 'encodings': {}}
+        if self.plain:
+            os.replace(self.tmp_path, final_path)
+        for encoding, path in (('gzip', self.gzip and f"{self.tmp_path}.gz"),
+                               ('br', self.brotli and f"{self.tmp_path}.br")):
+            if path:
+                os.replace(path, final_path + ENCODINGS[encoding])
+                record['encodings'][encoding] = {
+                    'file': os.path.basename(final_path + ENCODINGS[encoding]),
+                    'size': os.path.getsize(final_path + ENCODINGS[encoding]),
+                }
+        return record
+
+    def discard(self):
+        self.close()
+        for path in (self.tmp_path, f"{self.tmp_path}.gz", f"{self.tmp_path}.br"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def iter_file_range(path, offset=0, length=None):
+    """Dosyanın bir bölümünü CHUNK_SIZE'lık parçalar halinde okur."""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        remaining = length
+        while remaining is None or remaining > 0:
+            size = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+            chunk = f.read(size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+def group_slug(name, number):
+    """Grup adından dosya adına uygun ASCII kısa ad üretir ("Türk Ulusal" -> "turk-ulusal")."""
+    folded = unicodedata.normalize('NFKD', name.replace('ı', 'i').replace('İ', 'I'))
+    folded = ''.join(char for char in folded if not unicodedata.combining(char))
+    slug = re.sub(r'[^a-z0-9]+', '-', folded.lower()).strip('-')
+    return slug or f"grup-{number}"
+
+
+def write_split_groups(output_file, groups, split_dir, encodings=()):
+    """
+    Grup dizinindeki bayt aralıklarını kullanarak her grubu ayrı bir dosyaya
+    yazar. Dosya adı içerik özetinin ilk 8 karakterini içerir. Eski grup
+    dosyaları silinir. Her grup için manifest kaydı döndürür.
+    """
+    os.makedirs(split_dir, exist_ok=True)
+    records = []
+    for number, group in enumerate(groups, start=1):
+        sink = CompressedSink(os.path.join(split_dir, f".grup-{number}.tmp"), encodings)
+        try:
+            sink.write(HEADER)
+            for chunk in iter_file_range(output_file, group['offset'], group['length']):
+                sink.write(chunk)
+            sink.write(b"\n")
+            file_name = f"{group_slug(group['name'], number)}.{sink.hasher.hexdigest()[:8]}.m3u8"
+            record = sink.commit(os.path.join(split_dir, file_name))
+        except BaseException:
+            sink.discard()
+            raise
+        record['name'] = group['name']
+        record['channels'] = group['channels']
+        records.append(record)
+
+    # Artık kullanılmayan (eski içerik özetli) grup dosyalarını temizle
+    keep = set()
+    for record in records:
+        keep.add(record['file'])
+        keep.update(variant['file'] for variant in record['encodings'].values())
+    for file_name in os.listdir(split_dir):
+        if file_name not in keep:
+            os.remove(os.path.join(split_dir, file_name))
+    return records
+
+
+def write_derived_outputs(output_file, groups, encodings=(), split_dir=None, manifest_file=None):
+    """
+    Ana çıktıdan sıkıştırılmış kopyaları, grup dosyalarını ve manifest'i
+    üretir. 'groups' grup dizini kayıtlarıdır (offset, length, channels ...).
+    """
+    encodings = available_encodings(encodings)
+    sink = CompressedSink(f"{output_file}.derived.tmp", encodings, plain=False)
+    try:
+        for chunk in iter_file_range(output_file):
+            sink.write(chunk)
+        main_record = sink.commit(output_file)
+    except BaseException:
+        sink.discard()
+        raise
+
+    split_records = None
+    if split_dir:
+        split_records = write_split_groups(output_file, groups, split_dir, encodings)
+
+    if manifest_file:
+        manifest = dict(main_record)
+        if split_records is not None:
+            manifest['groups_dir'] = os.path.relpath(split_dir, os.path.dirname(os.path.abspath(manifest_file)))
+            manifest['groups'] = split_records
+        tmp_file = f"{manifest_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_file, manifest_file)
+
+    parts = [f"{encoding} ({main_record['encodings'][encoding]['size']} bayt)" for encoding in encodings]
+    if split_records is not None:
+        parts.append(f"{len(split_records)} grup dosyası")
+    if parts:
+        print(f"Ek çıktılar: {', '.join(parts)}.")
+    return main_record
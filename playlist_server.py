@@ -0,0 +1,446 @@
+"""
+iptv_converter.py --serve: Dönüştürülmüş listeleri dosyaya yazıp depoya
+göndermek yerine HTTP üzerinden veren, sürekli çalışan sunucu.
+
+- Kaynak liste bir kez indirilip ayrıştırılır, kanallar hafızada tutulur
+  (iptv_converter.GroupSpool). Kaynak arka planda 'refresh_minutes'
+  aralıkla koşullu istekle (ETag / Last-Modified) yenilenir. İndirme,
+  ayrıştırma ve tam listelerin üretimi bir iş parçacığında yapılır; bitince
+  yeni küme tek atamayla devreye girer, o ana kadar istekler eski kümeden
+  verilir.
+- Listeler (base_url + sıralama/filtre ayarları, grup) anahtarıyla bir kez
+  üretilip bayt olarak saklanır; gzip kopyası da bir kez sıkıştırılır.
+  Aynı ayarlı profiller aynı kaydı paylaşır.
+- ETag (If-None-Match -> 304), gzip (Accept-Encoding) ve tek aralıklı
+  Range / If-Range desteklenir.
+- Ayar dosyasının değişiklik zamanı izlenir. Değişince profiller yeniden
+  okunur; sadece base_url veya profil ayarları değiştiyse kaynak yeniden
+  indirilmez. Hatalı ayar dosyasında eski ayarlarla devam edilir.
+
+Adresler:
+  /                        Profiller, gruplar ve sayaçlar (JSON)
+  /<profil>.m3u8           Profilin tam listesi (profil adı veya çıktı dosyasının adı)
+  /<profil>/<grup>.m3u8    Profilin tek bir grubu
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import signal
+import time
+from email.utils import formatdate
+from urllib.parse import quote
+
+try:
+    from aiohttp import web
+except ImportError:  # Sunucu modu isteğe bağlıdır
+    web = None
+
+import epg
+import iptv_converter as converter
+import metrics
+
+CONTENT_TYPE = 'application/vnd.apple.mpegurl'
+# gzip seviyesi: Tam listeler yenileme sırasında, gruplar ilk istekte sıkıştırılır
+GZIP_LEVEL = 6
+
+
+class Rendered:
+    """Üretilmiş bir liste: düz baytlar, ETag'ler ve bir kez sıkıştırılan gzip kopyası."""
+
+    __slots__ = ('body', 'etag', 'etag_gzip', 'last_modified', '_gzip')
+
+    def __init__(self, body, last_modified):
+        self.body = body
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.etag_gzip = f'"{digest}-gz"'
+        self.last_modified = last_modified
+        self._gzip = None
+
+    def gzipped(self):
+        if self._gzip is None:
+            self._gzip = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+        return self._gzip
+
+
+def render_key(profile):
+    """Aynı çıktıyı üreten profiller için ortak önbellek anahtarı."""
+    return (profile['base_url'].rstrip('/'),
+            json.dumps(converter.profile_settings(profile), sort_keys=True, ensure_ascii=False))
+
+
+def profile_routes(profiles):
+    """
+    Adres adı -> profil tablosu (profil adı ve çıktı dosyasının uzantısız adı).
+    Önbellek anahtarı her istekte yeniden hesaplanmasın diye profile eklenir.
+    """
+    routes = {}
+    for profile in profiles:
+        profile['render_key'] = render_key(profile)
+        routes[profile['name']] = profile
+        routes.setdefault(os.path.splitext(os.path.basename(profile['output_file']))[0], profile)
+    return routes
+
+
+def render(profile, spool, group_names):
+    """Grupları write_profile ile bayt bayt aynı biçimde tek parça listeye çevirir."""
+    base_url = profile['base_url'].rstrip('/')
+    collate = converter.COLLATIONS[profile['collation']]
+    parts = [f'#EXTM3U url-tvg="{profile["url_tvg"]}"' if profile['url_tvg'] else '#EXTM3U']
+    for group_name in group_names:
+        channels = spool.iter_group(group_name)
+        if profile['channel_sort']:
+            channels = converter.sort_channels(channels, profile['channel_sort'], collate)
+        parts.extend(f"{extinf}\n{base_url}/{stream_id}/index.m3u8" for extinf, stream_id in channels)
+    return "\n".join(parts).encode('utf-8')
+
+
+def parse_range(value, size):
+    """
+    'bytes=a-b', 'bytes=a-' veya 'bytes=-n' aralığını (başlangıç, bitiş)
+    olarak döndürür (bitiş dahil). Tanınmayan veya çok aralıklı başlıkta
+    None (tam içerik verilir), karşılanamayan aralıkta False döner.
+    """
+    unit, _, spec = value.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, dash, last = spec.strip().partition('-')
+    if not dash:
+        return None
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                return False
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _etag_matches(header, etags):
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*' or (tag[2:] if tag.startswith('W/') else tag) in etags:
+            return True
+    return False
+
+
+def respond(rendered, headers):
+    """
+    İstek başlıklarına göre (durum kodu, cevap başlıkları, gövde) döndürür.
+    Range isteklerine düz içerikten cevap verilir (aralıklar sıkıştırılmamış
+    baytlara göredir); diğer isteklerde istemci kabul ediyorsa gzip verilir.
+    """
+    size = len(rendered.body)
+    byte_range = None
+    range_header = headers.get('Range')
+    if range_header:
+        if_range = headers.get('If-Range')
+        if if_range is None or if_range in (rendered.etag, rendered.last_modified):
+            byte_range = parse_range(range_header, size)
+    use_gzip = byte_range is None and 'gzip' in headers.get('Accept-Encoding', '')
+
+    response_headers = {
+        'Content-Type': CONTENT_TYPE,
+        'ETag': rendered.etag_gzip if use_gzip else rendered.etag,
+        'Last-Modified': rendered.last_modified,
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+        'Accept-Ranges': 'bytes',
+    }
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match and _etag_matches(if_none_match, (rendered.etag, rendered.etag_gzip)):
+        return 304, response_headers, b''
+    if byte_range is False:
+        response_headers['Content-Range'] = f"bytes */{size}"
+        return 416, response_headers, b''
+    if byte_range:
+        start, end = byte_range
+        response_headers['Content-Range'] = f"bytes {start}-{end}/{size}"
+        # memoryview: Aralık kopyalanmadan gönderilir
+        return 206, response_headers, memoryview(rendered.body)[start:end + 1]
+    if use_gzip:
+        response_headers['Content-Encoding'] = 'gzip'
+        return 200, response_headers, rendered.gzipped()
+    return 200, response_headers, rendered.body
+
+
+class PlaylistServer:
+    """
+    Hafızadaki kanal kümesi, profiller ve üretilmiş liste önbelleği.
+    Tüm alanlar olay döngüsünde değiştirilir; iş parçacığında çalışan
+    yöntemler (load_config, load_source, prerender) sadece yeni nesneler
+    üretip döndürür.
+    """
+
+    def __init__(self, config_path, refresh_seconds=None, watch_seconds=2, session=None):
+        self.config_path = config_path
+        # Kaynak isteklerinin oturumu (varsayılan: iptv_converter.http)
+        self.session = session or converter.http
+        self.refresh_seconds = refresh_seconds
+        self.watch_seconds = watch_seconds
+        self.config = None
+        self.config_mtime = None
+        self.profiles = {}     # adres adı -> profil
+        self.spool = None      # hafızadaki kanallar (GroupSpool)
+        self.source = {}       # etag, last_modified, content_sha256, epg
+        self.loaded_at = None  # Last-Modified başlığı
+        self.cache = {}        # (render_key, grup veya None) -> Rendered
+        self.groups = {}       # render_key -> profilin seçtiği gruplar
+        self.refresh_lock = None
+        self.stats = {'hit': 0, 'miss': 0, 'refresh': 0, 'unchanged': 0, 'reload': 0, 'error': 0}
+
+    # --- İş parçacığında çalışanlar ---
+
+    def load_config(self):
+        """Ayar dosyasını ve profilleri okur. Hatalıysa ValueError fırlatır."""
+        mtime = os.path.getmtime(self.config_path)
+        try:
+            config = converter.load_config(self.config_path) or {}
+            profiles = converter.load_profiles(config)
+        except SystemExit:
+            # load_config / load_profiles hatayı yazdırıp çıkar; sunucu çalışmaya devam eder
+            raise ValueError(f"'{self.config_path}' okunamadı")
+        if not config.get('source_playlist_url'):
+            raise ValueError("source_playlist_url eksik")
+        return config, profile_routes(profiles), mtime
+
+    def load_source(self, config, previous):
+        """
+        Kaynağı koşullu istekle indirir ve ayrıştırır: (GroupSpool, durum).
+        Kaynak değişmemişse GroupSpool yerine None döner.
+        """
+        epg_config = config.get('epg') or {}
+        epg_state = converter.epg_signature(epg_config)
+        headers = {}
+        # EPG rehberi değiştiyse kanallar aynı kaynaktan yeniden eşleştirilmeli
+        if previous.get('epg') == epg_state:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+        response = self.session.get(config['source_playlist_url'], timeout=30, headers=headers)
+        if response.status_code == 304:
+            return None, previous
+        response.raise_for_status()
+        body = response.content
+        state = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_sha256': hashlib.sha256(body).hexdigest(),
+            'epg': epg_state,
+        }
+        if state['content_sha256'] == previous.get('content_sha256') and epg_state == previous.get('epg'):
+            return None, state
+        epg_index = None
+        if epg_state and epg_state['mtime'] is not None:
+            with metrics.timer("epg_index"):
+                epg_index = epg.build_index(epg_config['xmltv_file'], epg_config.get('overwrite_ids', False))
+        spool = converter.GroupSpool(None)
+        converter.spool_channels(body.decode('utf-8', errors='replace').splitlines(), spool, epg_index)
+        return spool, state
+
+    @metrics.timed("serve_prerender")
+    def prerender(self, profiles, spool, loaded_at, cache=None, groups=None):
+        """
+        Profillerin grup seçimlerini ve tam listelerini (gzip kopyasıyla)
+        hazırlar. Verilen önbellekteki kayıtlar yeniden kullanılır.
+        """
+        cache = dict(cache or {})
+        groups = dict(groups or {})
+        keys = set()
+        for profile in profiles.values():
+            key = profile['render_key']
+            keys.add(key)
+            if key not in groups:
+                groups[key] = converter.select_groups(spool.group_names(), profile)
+            if (key, None) not in cache:
+                rendered = Rendered(render(profile, spool, groups[key]), loaded_at)
+                rendered.gzipped()
+                cache[(key, None)] = rendered
+        # Artık hiçbir profilin kullanmadığı kayıtlar atılır
+        cache = {item: value for item, value in cache.items() if item[0] in keys}
+        groups = {key: value for key, value in groups.items() if key in keys}
+        return cache, groups
+
+    # --- Olay döngüsünde çalışanlar ---
+
+    async def _in_thread(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def refresh(self, force=False):
+        """Kaynağı yeniler; değiştiyse yeni kanal kümesini ve önbelleği devreye alır."""
+        async with self.refresh_lock:
+            try:
+                with metrics.timer("serve_refresh"):
+                    spool, state = await self._in_thread(self.load_source, self.config,
+                                                         {} if force else self.source)
+                    if spool is None:
+                        self.source = state
+                        self.stats['unchanged'] += 1
+                        print("Kaynak liste değişmemiş, hafızadaki kanallar kullanılıyor.")
+                        return
+                    loaded_at = formatdate(usegmt=True)
+                    cache, groups = await self._in_thread(self.prerender, self.profiles, spool, loaded_at)
+            except Exception as e:
+                self.stats['error'] += 1
+                print(f"HATA: Kaynak liste yenilenemedi, eski kanallarla devam ediliyor: {e}")
+                return
+            self.spool, self.source, self.loaded_at = spool, state, loaded_at
+            self.cache, self.groups = cache, groups
+            self.stats['refresh'] += 1
+            print(f"Kanal kümesi yenilendi: {spool.channel_count} kanal, {len(spool.buffers)} grup.")
+
+    async def reload_config(self):
+        """Ayar dosyası değiştiyse profilleri yeniden okur ve gerekirse kaynağı yeniler."""
+        try:
+            if os.path.getmtime(self.config_path) == self.config_mtime:
+                return
+            config, profiles, mtime = await self._in_thread(self.load_config)
+        except (OSError, ValueError) as e:
+            self.stats['error'] += 1
+            print(f"HATA: Ayar dosyası yeniden yüklenemedi, eski ayarlarla devam ediliyor: {e}")
+            # Aynı hatalı dosya her kontrolde tekrar okunmasın
+            self.config_mtime = os.path.getmtime(self.config_path) if os.path.exists(self.config_path) else None
+            return
+        source_changed = (config.get('source_playlist_url') != self.config.get('source_playlist_url')
+                          or (config.get('epg') or {}) != (self.config.get('epg') or {}))
+        self.config, self.config_mtime = config, mtime
+        self.stats['reload'] += 1
+        print(f"Ayar dosyası yeniden yüklendi: {len(set(map(id, profiles.values())))} profil.")
+        if source_changed or self.spool is None:
+            self.profiles = profiles
+            await self.refresh(force=True)
+            return
+        async with self.refresh_lock:
+            self.cache, self.groups = await self._in_thread(
+                self.prerender, profiles, self.spool, self.loaded_at, self.cache, self.groups)
+            self.profiles = profiles
+
+    async def refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            await self.refresh()
+
+    async def watch_loop(self):
+        while True:
+            await asyncio.sleep(self.watch_seconds)
+            await self.reload_config()
+
+    async def start(self):
+        self.refresh_lock = asyncio.Lock()
+        try:
+            self.config, self.profiles, self.config_mtime = await self._in_thread(self.load_config)
+        except (OSError, ValueError) as e:
+            raise RuntimeError(f"Ayar dosyası okunamadı: {e}")
+        await self.refresh(force=True)
+
+    def lookup(self, name, group_name=None):
+        """Profilin (veya grubunun) üretilmiş listesi; yoksa None."""
+        profile = self.profiles.get(name)
+        if profile is None or self.spool is None:
+            return None
+        key = profile['render_key']
+        rendered = self.cache.get((key, group_name))
+        if rendered is not None:
+            self.stats['hit'] += 1
+            return rendered
+        groups = self.groups.get(key)
+        if groups is None:
+            groups = self.groups[key] = converter.select_groups(self.spool.group_names(), profile)
+        if group_name is not None and group_name not in groups:
+            return None
+        self.stats['miss'] += 1
+        with metrics.timer("serve_render"):
+            rendered = Rendered(render(profile, self.spool, groups if group_name is None else [group_name]),
+                                self.loaded_at)
+        self.cache[(key, group_name)] = rendered
+        return rendered
+
+    def index(self):
+        """Profiller ve grup adresleri."""
+        profiles = {}
+        for name, profile in self.profiles.items():
+            if name != profile['name']:
+                continue
+            groups = self.groups.get(profile['render_key'], [])
+            profiles[name] = {
+                'url': f"/{quote(name)}.m3u8",
+                'base_url': profile['base_url'],
+                'groups': [{'name': group_name, 'url': f"/{quote(name)}/{quote(group_name, safe='')}.m3u8"}
+                           for group_name in groups],
+            }
+        return {
+            'loaded_at': self.loaded_at,
+            'channels': self.spool.channel_count if self.spool else 0,
+            'profiles': profiles,
+            'stats': self.stats,
+        }
+
+    # --- HTTP ---
+
+    async def handle_index(self, request):
+        return web.json_response(self.index(), dumps=lambda data: json.dumps(data, ensure_ascii=False))
+
+    async def handle_playlist(self, request):
+        if self.spool is None:
+            return web.Response(status=503, text="Kanal listesi henüz yüklenmedi.")
+        rendered = self.lookup(request.match_info['profile'], request.match_info.get('group'))
+        if rendered is None:
+            raise web.HTTPNotFound()
+        status, headers, body = respond(rendered, request.headers)
+        return web.Response(status=status, headers=headers, body=body or None)
+
+    def application(self):
+        app = web.Application()
+        app.router.add_get('/', self.handle_index)
+        app.router.add_get('/{profile}.m3u8', self.handle_playlist)
+        # Grup adlarında '/' olabilir (istemci %2F gönderse de çözülmüş yol eşleştirilir)
+        app.router.add_get('/{profile}/{group:.+}.m3u8', self.handle_playlist)
+        return app
+
+
+async def serve(config_path, host, port, refresh_seconds, watch_seconds=2, session=None):
+    server = PlaylistServer(config_path, refresh_seconds, watch_seconds, session)
+    await server.start()
+    runner = web.AppRunner(server.application(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    refresh = f"kaynak {refresh_seconds / 60:g} dakikada bir yenilenir" if refresh_seconds else "kaynak yenilenmez"
+    print(f"--- Liste sunucusu http://{host}:{port}/ adresinde çalışıyor ({refresh}) ---")
+    tasks = [asyncio.create_task(server.watch_loop())]
+    if refresh_seconds:
+        tasks.append(asyncio.create_task(server.refresh_loop()))
+    # Ctrl+C ve SIGTERM (servis yöneticileri) ile düzgün kapanış
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):  # Windows
+            pass
+    try:
+        await stop.wait()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await runner.cleanup()
+        metrics.count_stats("serve", server.stats)
+
+
+def run_server(config_path, host='127.0.0.1', port=8080, refresh_minutes=30, watch_seconds=2, session=None):
+    """Sunucuyu Ctrl+C veya SIGTERM ile durdurulana kadar çalıştırır."""
+    if web is None:
+        raise RuntimeError("Sunucu modu için 'aiohttp' paketi gerekli: pip install aiohttp")
+    started = time.time()
+    try:
+        asyncio.run(serve(config_path, host, port, int(refresh_minutes * 60), watch_seconds, session))
+    except KeyboardInterrupt:
+        pass
+    print(f"Sunucu durduruldu ({time.time() - started:.0f} sn çalıştı).")
@@ -3,12 +3,16 @@ import re
 import json
 import os
 import time
-from bs4 import BeautifulSoup
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, unquote
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import unpad
-import base64
-import hashlib
+from m3u import M3UEntry, HEADER, format_entry
+from link_cache import LinkCache
+from crawl_journal import CrawlJournal
+import decoders
+import html_extract
+import http_transport
+import metrics
 
 # --- GEREKLİ YARDIMCI FONKSİYONLAR ---
 
@@ -16,32 +20,15 @@ def sanitize_filename(filename):
     """Dosya adlarında geçersiz olan karakterleri temizler."""
     return re.sub(r'[\\/*?:"<>|]', "", filename)
 
-def __md5(data):
-    return hashlib.md5(data).digest()
-
+@metrics.timed("aes_decrypt", count_empty=True)
 def decrypt_cizgiduo(encrypted_data, password):
-    """Kotlin kodundaki AesHelper.cryptoAESHandler fonksiyonunu taklit eder."""
-    try:
-        encrypted_bytes = base64.b64decode(encrypted_data)
-        salt = encrypted_bytes[8:16]
-        key_iv = b''
-        temp = b''
-        while len(key_iv) < 48:
-            temp = __md5(temp + password.encode() + salt)
-            key_iv += temp
-        key = key_iv[:32]
-        iv = key_iv[32:48]
-        cipher_text = encrypted_bytes[16:]
-        cipher = AES.new(key, AES.MODE_CBC, iv)
-        decrypted_padded = cipher.decrypt(cipher_text)
-        decrypted = unpad(decrypted_padded, AES.block_size)
-        return decrypted.decode('utf-8')
-    except Exception:
-        # Hata durumunda None döndürerek programın çökmesini engelle
-        return None
+    """Kotlin kodundaki AesHelper.cryptoAESHandler fonksiyonunu taklit eder (decoders.py)."""
+    # Hata durumunda None döner, program çökmez
+    return decoders.decode("cizgiduo", (encrypted_data, password))
 
 # --- EXTRACTOR'LAR ---
 
+@metrics.timed("cizgiduo", count_empty=True)
 def extract_cizgiduo(scraper, iframe_url):
     """CizgiDuo/CizgiPass iframe'inden M3U8 linkini çeker."""
     try:
@@ -66,6 +53,7 @@ def extract_cizgiduo(scraper, iframe_url):
         print(f"  [!] CizgiDuo Hata: {e}")
         return None
 
+@metrics.timed("sibnet", count_empty=True)
 def extract_sibnet(scraper, iframe_url):
     """SibNet iframe'inden video linkini çeker."""
     try:
@@ -81,12 +69,53 @@ def extract_sibnet(scraper, iframe_url):
         print(f"  [!] SibNet Hata: {e}")
         return None
 
+# --- HIZ SINIRLAMA ---
+
+class RateLimiter:
+    """İş parçacıkları arasında paylaşılan hız sınırlayıcı (saniyede en fazla 'rate' istek)."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+class PoliteScraper:
+    """cloudscraper oturumunu saran, her istekten önce hız sınırlayıcıyı bekleyen sınıf."""
+
+    def __init__(self, scraper, rate_limiter):
+        self.scraper = scraper
+        self.rate_limiter = rate_limiter
+
+    def get(self, *args, **kwargs):
+        with metrics.timer("rate_wait"):
+            self.rate_limiter.wait()
+        return self.scraper.get(*args, **kwargs)
+
 # --- ANA SCRAPER SINIFI ---
 
 class CizgiMaxFullScraper:
-    def __init__(self):
+    def __init__(self, cache_path="link_cache.sqlite", max_workers=4, rate=2.0,
+                 journal_path="crawl_journal.sqlite"):
         self.base_url = "https://cizgimax.online"
-        self.scraper = cloudscraper.create_scraper()
+        # Sabit time.sleep yerine tüm işçilerin paylaştığı hız sınırlayıcı
+        self.rate_limiter = RateLimiter(rate)
+        # Havuz işçi sayısına göre; 429/503 ve ölü sunucular http_transport'ta ele alınır
+        self.session = http_transport.configure_session(cloudscraper.create_scraper(), workers=max_workers)
+        self.scraper = PoliteScraper(metrics.instrument_session(self.session), self.rate_limiter)
+        self.max_workers = max_workers
+        # Sayfa / seri / bölüm ilerlemesini tutan kalıcı günlük (None ise kapalı)
+        self.journal = CrawlJournal(journal_path) if journal_path else None
+        # Çözülmüş iframe linkleri için kalıcı önbellek (None ise kapalı)
+        self.link_cache = LinkCache(cache_path) if cache_path else None
         # Kotlin kodundaki ana sayfa kategorileri
         self.categories = {
             "Son Eklenenler": "/diziler/page/{page}?orderby=date&order=DESC",
@@ -99,58 +128,44 @@ class CizgiMaxFullScraper:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
+    @metrics.timed("listing_page", count_empty=True)
     def get_series_from_page(self, page_url):
         """Belirtilen sayfadaki tüm serilerin adını ve linkini alır."""
         try:
             res = self.scraper.get(page_url, timeout=20)
             res.raise_for_status()
-            soup = BeautifulSoup(res.text, 'lxml')
-            series_list = []
-            # Kotlin kodundaki gibi `ul.filter-results li` seçicisini kullanıyoruz.
-            for item in soup.select("ul.filter-results li"):
-                title_tag = item.select_first("h2.truncate")
-                link_tag = item.select_first("div.poster-subject a")
-                if title_tag and link_tag:
-                    series_list.append({
-                        "title": title_tag.text.strip(),
-                        "url": link_tag.get("href")
-                    })
-            return series_list
+            # Kotlin kodundaki `ul.filter-results li` seçicisi (html_extract.SITES)
+            return html_extract.extract("cizgimax", "listing", res.text)
         except Exception as e:
             print(f" [!] Seri listesi alınırken hata: {page_url} - {e}")
             return []
 
+    @metrics.timed("series_page", count_empty=True)
     def get_episodes(self, show_url):
         """Bir serinin tüm bölümlerini alır."""
         try:
             res = self.scraper.get(show_url, timeout=20)
             res.raise_for_status()
-            soup = BeautifulSoup(res.text, 'lxml')
-            episodes = [
-                {"name": el.find('span', class_='episode-names').text.strip(), "url": el.find('a')['href']}
-                for el in soup.select("div.asisotope div.ajax_post") if el.find('a') and el.find('span', class_='episode-names')
-            ]
+            episodes = html_extract.extract("cizgimax", "series", res.text)
             return list(reversed(episodes))
         except Exception as e:
             print(f"   [!] Bölümler alınamadı: {show_url} - {e}")
             return []
 
+    @metrics.timed("episode_page", count_empty=True)
     def get_video_sources(self, episode_url):
         """Bir bölümün tüm video kaynaklarını (iframe'leri) bulur."""
         sources = []
         try:
             res = self.scraper.get(episode_url, timeout=20)
             res.raise_for_status()
-            soup = BeautifulSoup(res.text, 'lxml')
-            for link in soup.select("ul.linkler li a"):
-                iframe_url = link.get('data-frame')
-                if not iframe_url: continue
-                
+            for link in html_extract.extract("cizgimax", "episode", res.text):
+                iframe_url = link["frame"]
                 source_info = None
                 if 'cizgiduo' in iframe_url or 'cizgipass' in iframe_url:
-                    source_info = extract_cizgiduo(self.scraper, iframe_url)
+                    source_info = self.resolve_iframe("cizgiduo", iframe_url, extract_cizgiduo)
                 elif 'sibnet' in iframe_url:
-                    source_info = extract_sibnet(self.scraper, iframe_url)
+                    source_info = self.resolve_iframe("sibnet", iframe_url, extract_sibnet)
                 
                 if source_info:
                     sources.append(source_info)
@@ -159,64 +174,157 @@ class CizgiMaxFullScraper:
             print(f"     [!] Video kaynağı alınamadı: {episode_url} - {e}")
             return []
 
-    def run(self):
-        """Ana tarama işlemini başlatır."""
+    def resolve_iframe(self, kind, iframe_url, extractor):
+        """Iframe linkini önce önbellekten, yoksa extractor ile ağdan çözer."""
+        if self.link_cache is None:
+            return extractor(self.scraper, iframe_url)
+        return self.link_cache.resolve(kind, iframe_url, lambda url: extractor(self.scraper, url))
+
+    def resolve_episode(self, episode):
+        """Tek bir bölümün kaynaklarını çözer (işçi iş parçacığında çalışır)."""
+        print(f"    -> Bölüm taranıyor: {episode['name']}")
+        video_sources = self.get_video_sources(episode["url"])
+        # M3U formatına bölüm adını da ekliyoruz
+        for source in video_sources:
+            source['name'] = f"{episode['name']} - {source['name']}"
+        return video_sources
+
+    @metrics.timed("write_m3u")
+    def write_series_playlist(self, series, all_sources_for_series):
+        filename = sanitize_filename(f"{series['title']}.m3u")
+        filepath = os.path.join(self.output_dir, filename)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(HEADER + "\n")
+            for item in all_sources_for_series:
+                f.write(format_entry(M3UEntry(
+                    item['name'], item['url'],
+                    tvg_name=item['name'], group_title=series['title'],
+                    extra_lines=[f"#EXTVLCOPT:http-referrer={item['referer']}"],
+                )))
+        print(f"   [+] M3U dosyası oluşturuldu: {filepath}")
+
+    def process_series(self, series, executor, reuse_known=False, episodes=None):
+        """
+        Serinin bölümlerini çözer ve M3U dosyasını yazar. Günlükte kaynağı
+        bulunan bölümler ('reuse_known' veya devam edilen çalışma) yeniden çözülmez.
+        """
+        if episodes is None:
+            episodes = self.get_episodes(series["url"])
+        if not episodes:
+            print(f"   [!] '{series['title']}' için bölüm bulunamadı.")
+            return
+        
+        print(f"   -> {len(episodes)} bölüm bulundu.")
+
+        known = {}
+        if self.journal:
+            known = self.journal.known_episodes(series["url"], this_run_only=not reuse_known)
+        pending = [episode for episode in episodes if episode["url"] not in known]
+        if known:
+            print(f"   -> {len(episodes) - len(pending)} bölüm günlükten alındı, {len(pending)} bölüm çözülecek.")
+        
+        # Bölümler işçi havuzunda paralel çözülür; map sırayı korur.
+        # IP ban yememek için tüm istekler ortak hız sınırlayıcıdan geçer.
+        for episode, video_sources in zip(pending, executor.map(self.resolve_episode, pending)):
+            known[episode["url"]] = video_sources
+            if self.journal:
+                self.journal.record_episode(series["url"], episode, video_sources)
+
+        all_sources_for_series = []
+        for episode in episodes:
+            all_sources_for_series.extend(known.get(episode["url"], []))
+
+        if all_sources_for_series:
+            self.write_series_playlist(series, all_sources_for_series)
+        if self.journal:
+            self.journal.complete_series(series["url"], series["title"], len(episodes))
+
+    def run(self, since_last_run=False, fresh=False):
+        """
+        Ana tarama işlemini başlatır.
+        since_last_run: Bir kategoride daha önce tamamen işlenmiş bir seriye
+                        gelindiğinde o kategorinin sayfalanması durdurulur.
+        fresh: Yarım kalan çalışmaya devam etmek yerine baştan başlar.
+        """
         processed_series_urls = set()
+        start = time.perf_counter()
+        resuming = False
+        if self.journal:
+            run_id, resuming = self.journal.begin_run(fresh=fresh)
+            if resuming:
+                print(f"Yarım kalan tarama (#{run_id}) kaldığı yerden devam ediyor.")
 
-        for category_name, category_path in self.categories.items():
-            print(f"\n--- Kategori Taranıyor: {category_name} ---")
-            page = 1
-            while True:
-                page_url = f"{self.base_url}{category_path.format(page=page)}"
-                print(f"\n -> Sayfa {page} taranıyor: {page_url}")
-                
-                series_on_page = self.get_series_from_page(page_url)
-                if not series_on_page:
-                    print(f" -> Sayfa {page} boş, kategori tamamlandı.")
-                    break
-
-                for series in series_on_page:
-                    if series["url"] in processed_series_urls:
-                        print(f" - '{series['title']}' daha önce işlendi, atlanıyor.")
-                        continue
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for category_name, category_path in self.categories.items():
+                print(f"\n--- Kategori Taranıyor: {category_name} ---")
+                page = self.journal.next_page(category_name) if resuming else 1
+                while True:
+                    page_url = f"{self.base_url}{category_path.format(page=page)}"
+                    print(f"\n -> Sayfa {page} taranıyor: {page_url}")
                     
-                    print(f"  -> Seri işleniyor: {series['title']}")
-                    processed_series_urls.add(series["url"])
+                    series_on_page = self.get_series_from_page(page_url)
+                    if not series_on_page:
+                        print(f" -> Sayfa {page} boş, kategori tamamlandı.")
+                        break
 
-                    episodes = self.get_episodes(series["url"])
-                    if not episodes:
-                        print(f"   [!] '{series['title']}' için bölüm bulunamadı.")
-                        continue
-                    
-                    print(f"   -> {len(episodes)} bölüm bulundu.")
-                    
-                    all_sources_for_series = []
-                    for episode in episodes:
-                        print(f"    -> Bölüm taranıyor: {episode['name']}")
-                        # IP ban yememek için küçük bir bekleme
-                        time.sleep(1) 
-                        video_sources = self.get_video_sources(episode["url"])
-                        if video_sources:
-                            # M3U formatına bölüm adını da ekliyoruz
-                            for source in video_sources:
-                                source['name'] = f"{episode['name']} - {source['name']}"
-                            all_sources_for_series.extend(video_sources)
-
-                    if all_sources_for_series:
-                        filename = sanitize_filename(f"{series['title']}.m3u")
-                        filepath = os.path.join(self.output_dir, filename)
-                        with open(filepath, 'w', encoding='utf-8') as f:
-                            f.write("#EXTM3U\n")
-                            for item in all_sources_for_series:
-                                f.write(f"#EXTINF:-1 tvg-name=\"{item['name']}\" group-title=\"{series['title']}\",{item['name']}\n")
-                                f.write(f"#EXTVLCOPT:http-referrer={item['referer']}\n")
-                                f.write(f"{item['url']}\n")
-                        print(f"   [+] M3U dosyası oluşturuldu: {filepath}")
-                
-                page += 1
-                time.sleep(2) # Sayfalar arası bekleme
+                    reached_known = False
+                    for series in series_on_page:
+                        if series["url"] in processed_series_urls:
+                            print(f" - '{series['title']}' daha önce işlendi, atlanıyor.")
+                            continue
+                        if resuming and self.journal.series_done_in_run(series["url"]):
+                            print(f" - '{series['title']}' yarım kalan çalışmada tamamlanmış, atlanıyor.")
+                            processed_series_urls.add(series["url"])
+                            continue
+                        episodes = None
+                        if since_last_run and self.journal:
+                            episodes = self.get_episodes(series["url"])
+                            if self.journal.series_fully_processed(series["url"], episodes):
+                                print(f" -> '{series['title']}' önceki çalışmada tamamlanmış, kategori burada bitiriliyor.")
+                                reached_known = True
+                                break
+                        
+                        print(f"  -> Seri işleniyor: {series['title']}")
+                        processed_series_urls.add(series["url"])
+                        self.process_series(series, executor, reuse_known=since_last_run, episodes=episodes)
+
+                    if reached_known:
+                        break
+                    if self.journal:
+                        self.journal.complete_page(category_name, page)
+                    page += 1
+
+        if self.journal:
+            self.journal.finish_run()
+        elapsed = time.perf_counter() - start
+        print(f"\nToplam süre: {elapsed:.1f} sn ({self.max_workers} işçi, saniyede en fazla {self.rate_limiter.rate} istek)")
+        print(http_transport.transport.summary())
+        cache = decoders.evp_bytes_to_key.cache_info()
+        metrics.count_stats("evp_key_cache", {"hit": cache.hits, "miss": cache.misses})
+        if self.link_cache:
+            metrics.count_stats("link_cache", self.link_cache.stats)
 
 if __name__ == "__main__":
-    scraper = CizgiMaxFullScraper()
-    scraper.run()
-    print("\nTarama işlemi tamamlandı.")
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="CizgiMax sitesindeki tüm serileri M3U dosyalarına aktarır.")
+    parser.add_argument("--workers", type=int, default=4, help="Bölümleri paralel çözen işçi sayısı")
+    parser.add_argument("--rate", type=float, default=2.0, help="Saniyedeki en fazla istek sayısı (tüm işçiler için)")
+    parser.add_argument("--cache", default="link_cache.sqlite", help="Link önbelleği dosyası")
+    parser.add_argument("--no-cache", action="store_true", help="Link önbelleğini kullanma")
+    parser.add_argument("--journal", default="crawl_journal.sqlite", help="Tarama günlüğü dosyası")
+    parser.add_argument("--since-last-run", action="store_true",
+                        help="Daha önce tamamen işlenmiş serilere gelince kategoriyi bitir (artımlı tarama)")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Yarım kalan taramaya devam etme, baştan başla")
+    http_transport.add_arguments(parser)
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+
+    scraper = CizgiMaxFullScraper(cache_path=None if args.no_cache else args.cache,
+                                  max_workers=args.workers, rate=args.rate,
+                                  journal_path=args.journal)
+    http_transport.apply_arguments(args, scraper.session, workers=args.workers)
+    metrics.run(args, scraper.run, since_last_run=args.since_last_run, fresh=args.fresh)
+    print("\nTarama işlemi tamamlandı.")
+    if scraper.link_cache:
+        print(scraper.link_cache.summary())
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Dönüştürülmüş listedeki yayınların çalışıp çalışmadığını kontrol eder.
+
+Her kanalın master playlist adresine yüksek eşzamanlılıkla HEAD (veya
+Range başlıklı küçük bir GET) isteği atılır. Sonuçlar gecikme süreleriyle
+birlikte bir JSON önbelleğine yazılır; TTL süresi dolmamış kanallar bir
+sonraki çalışmada yeniden kontrol edilmez.
+"""
+import asyncio
+import itertools
+import json
+import os
+import time
+
+try:
+    import aiohttp
+except ImportError:  # Kontrol aşaması isteğe bağlıdır
+    aiohttp = None
+
+from m3u import HEADER, iter_entries, format_entry
+
+
+class ProbeCache:
+    """{url: {alive, status, latency_ms, checked_at}} yapısındaki JSON önbellek."""
+
+    def __init__(self, path, ttl_seconds):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.results = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.results = json.load(f)
+            except (OSError, ValueError):
+                self.results = {}
+
+    def is_fresh(self, url, now=None):
+        result = self.results.get(url)
+        if not result:
+            return False
+        now = now or time.time()
+        return result.get('checked_at', 0) + self.ttl_seconds > now
+
+    def save(self, keep_urls=None):
+        """Önbelleği yazar. 'keep_urls' verilirse listede olmayan kayıtlar atılır."""
+        if not self.path:
+            return
+        if keep_urls is not None:
+            self.results = {url: self.results[url] for url in keep_urls if url in self.results}
+        tmp_file = f"{self.path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, ensure_ascii=False)
+        os.replace(tmp_file, self.path)
+
+
+async def probe_one(http, semaphore, url, method):
+    """Tek bir yayını kontrol eder: (alive, status, latency_ms) döndürür."""
+    async with semaphore:
+        return await _probe(http, url, method)
+
+
+async def _probe(http, url, method):
+    # Gecikme, sıra beklemesi dahil edilmeden isteğin başladığı andan ölçülür
+    start = time.perf_counter()
+    try:
+        if method == 'HEAD':
+            async with http.head(url, allow_redirects=True) as response:
+                status = response.status
+            # HEAD desteklemeyen sunucular için küçük bir GET ile tekrar dene
+            if status in (405, 501):
+                method = 'GET'
+        if method == 'GET':
+            async with http.get(url, headers={'Range': 'bytes=0-1023'}) as response:
+                status = response.status
+                await response.content.read(1024)
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        return status < 400, status, latency_ms
+    except Exception:
+        return False, None, None
+
+
+async def probe_urls(urls, method='HEAD', concurrency=200, per_host=50, timeout=5):
+    """URL listesini eşzamanlı kontrol eder: {url: (alive, status, latency_ms)}."""
+    if aiohttp is None:
+        raise RuntimeError("Yayın kontrolü için 'aiohttp' paketi gerekli: pip install aiohttp")
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ssl=False)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers={'User-Agent': 'Mozilla/5.0'}) as http:
+        semaphore = asyncio.Semaphore(concurrency)
+        results = await asyncio.gather(*(probe_one(http, semaphore, url, method) for url in urls))
+    return dict(zip(urls, results))
+
+
+def probe_playlist(input_file, live_file, dead_file=None, cache_file='probe_cache.json',
+                   ttl_seconds=3600, method='HEAD', concurrency=200, per_host=50, timeout=5):
+    """
+    'input_file' içindeki kanalları kontrol eder. Çalışanlar 'live_file'a,
+    çalışmayanlar (verilmişse) 'dead_file'a yazılır. Giriş dosyası değişmez;
+    başlık satırı (ör. url-tvg="...") ve EXTINF satırları aynen kopyalanır.
+    """
+    print("--- Yayınlar Kontrol Ediliyor ---")
+    start = time.perf_counter()
+    cache = ProbeCache(cache_file, ttl_seconds)
+
+    with open(input_file, 'r', encoding='utf-8') as f:
+        urls = list(dict.fromkeys(entry.url for entry in iter_entries(f)))
+
+    now = time.time()
+    stale = [url for url in urls if not cache.is_fresh(url, now)]
+    print(f"{len(urls)} kanal var, {len(stale)} tanesi kontrol edilecek "
+          f"({len(urls) - len(stale)} tanesi önbellekten).")
+
+    if stale:
+        probed = asyncio.run(probe_urls(stale, method, concurrency, per_host, timeout))
+        for url, (alive, status, latency_ms) in probed.items():
+            cache.results[url] = {'alive': alive, 'status': status,
+                                  'latency_ms': latency_ms, 'checked_at': now}
+    cache.save(keep_urls=urls)
+
+    live_count = dead_count = 0
+    live_tmp = f"{live_file}.tmp"
+    dead_tmp = f"{dead_file}.tmp" if dead_file else None
+    with open(input_file, 'r', encoding='utf-8') as src, \
+         open(live_tmp, 'w', encoding='utf-8') as live:
+        dead = open(dead_tmp, 'w', encoding='utf-8') if dead_tmp else None
+        try:
+            # Rehber adresi (url-tvg) gibi özellikler başlık satırındadır
+            first = src.readline().strip()
+            header = first if first.startswith(HEADER) else HEADER
+            lines = src if first.startswith(HEADER) else itertools.chain([first], src)
+            live.write(header + "\n")
+            if dead:
+                dead.write(header + "\n")
+            for entry in iter_entries(lines):
+                if cache.results.get(entry.url, {}).get('alive'):
+                    live.write(format_entry(entry, keep_line=True))
+                    live_count += 1
+                else:
+                    dead_count += 1
+                    if dead:
+                        dead.write(format_entry(entry, keep_line=True))
+        finally:
+            if dead:
+                dead.close()
+    os.replace(live_tmp, live_file)
+    if dead_tmp:
+        os.replace(dead_tmp, dead_file)
+
+    latencies = sorted(result['latency_ms'] for result in cache.results.values()
+                       if result.get('alive') and result.get('latency_ms') is not None)
+    median = latencies[len(latencies) // 2] if latencies else 0
+    elapsed = time.perf_counter() - start
+    print(f"Kontrol tamam ({elapsed:.1f} sn): {live_count} çalışan, {dead_count} çalışmayan kanal. "
+          f"Ortanca gecikme: {median} ms. Çalışanlar: '{live_file}'")
+    return live_count, dead_count